@@ -1,7 +1,10 @@
 from flask import Flask
 from config import config
 from models import db
+from migrations import check_schema
 from routes import register_blueprints
+from utils.cv_queue import start_cv_workers
+from utils.project_pipeline import start_project_workers
 
 
 def create_app(config_name='development'):
@@ -15,14 +18,27 @@ def create_app(config_name='development'):
     # Register all blueprints (routes)
     register_blueprints(app)
 
-    # Create database tables
+    # One query for the schema version (an empty database is built from
+    # the models); schema changes go through `python migrate.py upgrade`
     with app.app_context():
-        db.create_all()
+        check_schema(db)
+
+    # Background CV processing (uploads are queued by add_employee) and
+    # project analysis pipeline. Started on the first request so scripts
+    # that import the app (migrations, shells) don't spawn workers.
+    @app.before_request
+    def _ensure_workers():
+        start_cv_workers(app)
+        start_project_workers(app)
 
     return app
 
 
-app = create_app()
+# Spawned PDF pool workers (utils/pdf_extraction.py) re-import the main
+# module as __mp_main__ under `python app.py`; they must not build an app
+# (DB connection, schema check) each.
+if __name__ != '__mp_main__':
+    app = create_app()
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,64 @@
+"""
+Benchmark the tiered PDF extractor on a folder of real CVs / specs.
+For each PDF: time with the tiered chain vs pdfplumber only, pages per
+tier, and how close the texts are — to tune the PDF_FAST_* thresholds.
+
+Usage: python benchmark_pdf_extraction.py uploads/cvs
+"""
+
+import os
+import sys
+import time
+import difflib
+from collections import Counter
+import utils.pdf_extraction as pdf_extraction
+
+
+def _plumber_only(pdf_path):
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        return "\n".join(page.extract_text() or "" for page in pdf.pages).strip()
+
+
+def benchmark(folder):
+    # No pool, cache or budgets: measure the extractors themselves
+    pdf_extraction.PDF_EXTRACT_WORKERS = 1
+
+    paths = sorted(
+        os.path.join(folder, name) for name in os.listdir(folder) if name.lower().endswith('.pdf')
+    )
+    if not paths:
+        print(f"❌ No PDF found in {folder}")
+        return
+
+    tiers = Counter()
+    tiered_total = plumber_total = 0.0
+    print(f"{'file':40} {'pages':>5} {'tiered s':>9} {'plumber s':>9} {'similarity':>10}  tiers")
+    for path in paths:
+        started = time.perf_counter()
+        result = pdf_extraction.extract_pdf(path, max_pages=0, max_chars=0, use_cache=False)
+        tiered_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        try:
+            reference = _plumber_only(path)
+        except Exception as e:
+            print(f"⚠️ {os.path.basename(path)}: pdfplumber failed ({e})")
+            continue
+        plumber_time = time.perf_counter() - started
+
+        similarity = difflib.SequenceMatcher(None, result['text'] or "", reference, autojunk=False).quick_ratio()
+        file_tiers = Counter(result['tiers'])
+        tiers.update(file_tiers)
+        tiered_total += tiered_time
+        plumber_total += plumber_time
+        print(f"{os.path.basename(path)[:40]:40} {len(result['tiers']):>5} {tiered_time:>9.2f} "
+              f"{plumber_time:>9.2f} {similarity:>10.3f}  {dict(file_tiers)}")
+
+    print("=" * 60)
+    print(f"Tiered: {tiered_total:.2f}s — pdfplumber only: {plumber_total:.2f}s")
+    print(f"Pages per tier: {dict(tiers)}")
+
+
+if __name__ == '__main__':
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else os.path.join('uploads', 'cvs'))
@@ -0,0 +1,106 @@
+"""
+EXPLAIN check for the hot matching / dashboard queries.
+Fails (exit code 1) if any of them reads one of its tables with a
+sequential scan — or walks a whole index without an index condition,
+which costs the same — i.e. if an index from migration 0006 is
+missing or no longer usable by the query. Walking a partial index is
+fine: it only holds the rows the query wants.
+
+On PostgreSQL sequential scans are disabled for the EXPLAIN
+(enable_seqscan = off): on a small dev database the planner rightly
+prefers scanning a few pages, so a Seq Scan that remains means no index
+can serve the query at all. SQLite (tests) is checked with EXPLAIN
+QUERY PLAN.
+
+Usage: python check_query_plans.py
+"""
+
+import re
+import sys
+import json
+from sqlalchemy import text
+
+# (name, SQL, tables that must be read through an index)
+HOT_QUERIES = [
+    ('open tasks of an assignee (open_task_count refresh)',
+     "SELECT count(tasks.id) FROM tasks JOIN projects ON projects.id = tasks.project_id "
+     "WHERE tasks.assigned_employee_id = :employee_id AND tasks.status <> 'completed' "
+     "AND projects.status <> 'completed'",
+     ['tasks']),
+    ('tasks of a project (project counters refresh)',
+     "SELECT tasks.project_id, count(tasks.id), sum(tasks.duree_estimee_jours) FROM tasks "
+     "WHERE tasks.project_id = :project_id GROUP BY tasks.project_id",
+     ['tasks']),
+    ("an employee's tasks by status",
+     "SELECT id FROM tasks WHERE assigned_employee_id = :employee_id AND status = :status",
+     ['tasks']),
+    ('tasks an employee collaborates on',
+     "SELECT task_id FROM task_collaborators WHERE employee_id = :employee_id",
+     ['task_collaborators']),
+    ('active employees',
+     "SELECT id FROM users WHERE role = 'employee' AND status = 'active'",
+     ['users']),
+    ("a manager's projects, newest first",
+     "SELECT id FROM projects WHERE manager_id = :manager_id ORDER BY created_at DESC",
+     ['projects']),
+]
+
+PARAMS = {'employee_id': 1, 'manager_id': 1, 'project_id': 1, 'status': 'in_progress'}
+
+PARTIAL_INDEXES = {'ix_tasks_open_by_assignee'}
+
+
+def _full_scans_postgres(conn, sql):
+    """Tables read by a Seq Scan (or an Index Scan without Index Cond) anywhere in the plan."""
+    with conn.begin():
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), PARAMS).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    scanned = set()
+    nodes = [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        node_type = node.get('Node Type')
+        if node_type == 'Seq Scan':
+            scanned.add(node.get('Relation Name'))
+        elif (node_type in ('Index Scan', 'Index Only Scan') and 'Index Cond' not in node
+              and node.get('Index Name') not in PARTIAL_INDEXES):
+            scanned.add(node.get('Relation Name'))
+        nodes.extend(node.get('Plans', []))
+    return scanned
+
+
+def _full_scans_sqlite(conn, sql):
+    """Tables SQLite walks entirely: "SCAN t", or "SCAN t USING ... INDEX i" on a full index."""
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), PARAMS).fetchall()
+    scanned = set()
+    for row in rows:
+        match = re.match(r'SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?', row[-1])
+        if match and match.group(2) not in PARTIAL_INDEXES:
+            scanned.add(match.group(1))
+    return scanned
+
+
+def check_query_plans(engine):
+    """Returns [(query name, tables fully scanned)] for every failing hot query."""
+    explain = _full_scans_postgres if engine.dialect.name == 'postgresql' else _full_scans_sqlite
+    failures = []
+    with engine.connect() as conn:
+        for name, sql, tables in HOT_QUERIES:
+            scanned = explain(conn, sql) & set(tables)
+            print(f"{'❌' if scanned else '✅'} {name}" + (f" — full scan of {', '.join(sorted(scanned))}" if scanned else ''))
+            if scanned:
+                failures.append((name, scanned))
+    return failures
+
+
+if __name__ == '__main__':
+    from app import app, db
+    with app.app_context():
+        failures = check_query_plans(db.engine)
+    if failures:
+        print(f"\n❌ {len(failures)} hot quer{'y' if len(failures) == 1 else 'ies'} without a usable index — run `python migrate.py upgrade`")
+        sys.exit(1)
+    print("\n✅ Every hot query is served by an index")
@@ -19,6 +19,9 @@ class Config:
     # n8n webhook URL for project specs analysis
     N8N_PROJECT_WEBHOOK_URL = os.getenv('N8N_PROJECT_WEBHOOK_URL', 'https://toshia-nonfacetious-rachael.ngrok-free.dev/webhook-test/analyse-pdf')
     
+    # n8n workflow taking many CVs per call ({'items': [...]}); empty = one call per CV
+    N8N_CV_BATCH_WEBHOOK_URL = os.getenv('N8N_CV_BATCH_WEBHOOK_URL', '')
+    
     # Your public URL (update this with your current ngrok URL)
     PUBLIC_URL = os.getenv('PUBLIC_URL', 'https://untrumpeted-prenational-celeste.ngrok-free.dev')
     
@@ -27,6 +30,16 @@ class Config:
         'https://toshia-nonfacetious-rachael.ngrok-free.dev/webhook/cv-analysis',
         'http://localhost:5678/webhook/cv-analysis'  # Direct n8n
     ]
+    
+    # Task matching: 'sequential' (one AI call per task), 'parallel', 'batch'
+    # or 'optimal' (no AI, global min-cost assignment)
+    MATCHING_MODE = os.getenv('MATCHING_MODE', 'sequential')
+    
+    # Background workers for CV extraction + n8n dispatch (0 = don't start)
+    CV_QUEUE_WORKERS = int(os.getenv('CV_QUEUE_WORKERS', 2))
+    
+    # Background workers for the project analysis pipeline (0 = don't start)
+    PROJECT_PIPELINE_WORKERS = int(os.getenv('PROJECT_PIPELINE_WORKERS', 1))
 class DevelopmentConfig(Config):
     """Development configuration"""
     SQLALCHEMY_DATABASE_URI = os.getenv(
@@ -44,6 +57,8 @@ class TestingConfig(Config):
     """Testing configuration"""
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     TESTING = True
+    CV_QUEUE_WORKERS = 0
+    PROJECT_PIPELINE_WORKERS = 0
 
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,66 @@
+"""
+Database migrations — versioned revisions in migrations/versions/,
+applied revisions recorded in the schema_version table.
+
+Usage:
+    python migrate.py upgrade [revision]   apply the pending revisions (default: up to head)
+    python migrate.py status               current revision, head, pending revisions
+    python migrate.py stamp [revision]     record revisions as applied without running them
+
+APP_CONFIG selects the configuration (development by default). Run it
+offline: the web app only checks the version at startup and refuses to
+start on an outdated schema.
+"""
+
+import os
+import sys
+from flask import Flask
+from config import config
+from models import db
+from migrations import current_version, head_revision, load_migrations, stamp, upgrade
+
+
+def _make_app():
+    """Bare app (no blueprints, no startup schema check) for the migration commands."""
+    app = Flask(__name__)
+    app.config.from_object(config[os.getenv('APP_CONFIG', 'development')])
+    db.init_app(app)
+    return app
+
+
+def status():
+    with db.engine.connect() as conn:
+        version = current_version(conn)
+    head = head_revision()
+    print(f"📋 Schema version: {'unversioned' if version is None else version} — head: {head}")
+    for module in load_migrations():
+        if version is None or module.revision > version:
+            print(f"   ⏳ {module.revision:04d} {module.description}")
+    return version
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else 'status'
+    revision = int(argv[2]) if len(argv) > 2 else None
+
+    with _make_app().app_context():
+        if command == 'upgrade':
+            print("🔄 Upgrading database schema...")
+            applied = upgrade(db.engine, revision)
+            print(f"✅ Schema at version {revision or head_revision()} ({len(applied)} revision(s) applied)")
+        elif command == 'stamp':
+            print(f"✅ Schema stamped at version {stamp(db.engine, revision)}")
+        elif command == 'status':
+            status()
+        else:
+            print(__doc__)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main(sys.argv))
+    except Exception as e:
+        print(f"❌ Migration error: {e}")
+        raise
@@ -0,0 +1,5 @@
+"""Versioned schema migrations — see migrations/runner.py, run with `python migrate.py`."""
+
+from migrations.runner import (
+    SchemaOutdatedError, check_schema, current_version, head_revision, load_migrations, stamp, upgrade
+)
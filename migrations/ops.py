@@ -0,0 +1,32 @@
+"""Small idempotent DDL helpers for revision modules (work on PostgreSQL and SQLite)."""
+
+from sqlalchemy import inspect, text
+
+
+def table_exists(conn, table):
+    return inspect(conn).has_table(table)
+
+
+def column_exists(conn, table, column):
+    return any(c['name'] == column for c in inspect(conn).get_columns(table))
+
+
+def add_column(conn, table, column, ddl_type):
+    """ALTER TABLE ... ADD COLUMN unless it is already there. Returns True if added."""
+    if column_exists(conn, table, column):
+        return False
+    conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl_type}'))
+    return True
+
+
+def drop_column(conn, table, column):
+    if not column_exists(conn, table, column):
+        return False
+    cascade = ' CASCADE' if conn.dialect.name == 'postgresql' else ''
+    conn.execute(text(f'ALTER TABLE {table} DROP COLUMN {column}{cascade}'))
+    return True
+
+
+def constraint_exists(conn, table, name):
+    inspector = inspect(conn)
+    return any(c['name'] == name for c in inspector.get_unique_constraints(table))
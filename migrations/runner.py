@@ -0,0 +1,168 @@
+"""
+Versioned schema migrations.
+
+Each module in migrations/versions/ is one revision:
+
+    revision = 7                 # increasing integer, unique
+    description = 'Add ...'
+    transactional = True         # False for CREATE INDEX CONCURRENTLY & co
+    def upgrade(conn): ...       # conn: SQLAlchemy Connection
+
+Applied revisions are recorded in the schema_version table. Migrations run
+offline with `python migrate.py upgrade`, never from the web app: create_app
+only reads the version (check_schema, one query) and refuses to start on
+an outdated schema.
+
+A transactional revision runs in one transaction together with its
+schema_version row — it is applied entirely or not at all. A
+non-transactional one runs in autocommit mode (PostgreSQL forbids
+CREATE INDEX CONCURRENTLY inside a transaction), so it must be idempotent
+(IF NOT EXISTS...) to be safely re-run after an interruption; its version
+row is written once it has finished.
+"""
+
+import time
+import pkgutil
+import importlib
+from datetime import datetime
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, inspect, select, func, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+ADVISORY_LOCK_KEY = 73_615_001  # serializes concurrent `migrate.py upgrade` runs (PostgreSQL)
+
+_metadata = MetaData()
+schema_version = Table(
+    'schema_version', _metadata,
+    Column('version', Integer, primary_key=True),
+    Column('description', String(200)),
+    Column('applied_at', DateTime, default=datetime.utcnow),
+    Column('duration_ms', Integer),
+)
+
+
+class SchemaOutdatedError(RuntimeError):
+    """The database is behind the code: run `python migrate.py upgrade`."""
+
+
+def load_migrations():
+    """Revision modules sorted by revision number."""
+    from migrations import versions
+    modules = [
+        importlib.import_module(f'{versions.__name__}.{name}')
+        for _, name, _ in pkgutil.iter_modules(versions.__path__)
+    ]
+    modules.sort(key=lambda m: m.revision)
+    revisions = [m.revision for m in modules]
+    if len(set(revisions)) != len(revisions):
+        raise RuntimeError(f'Duplicate migration revisions: {revisions}')
+    return modules
+
+
+def head_revision():
+    migrations = load_migrations()
+    return migrations[-1].revision if migrations else 0
+
+
+def current_version(conn):
+    """Highest applied revision, 0 if none, None if the database is unversioned."""
+    try:
+        return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        conn.rollback()
+        return None
+
+
+def _record(conn, module, duration_ms):
+    conn.execute(schema_version.insert().values(
+        version=module.revision,
+        description=getattr(module, 'description', module.__name__),
+        applied_at=datetime.utcnow(),
+        duration_ms=duration_ms
+    ))
+
+
+def stamp(engine, revision=None):
+    """Mark the database as being at `revision` (default: head) without running anything."""
+    revision = head_revision() if revision is None else revision
+    _metadata.create_all(engine)
+    with engine.begin() as conn:
+        applied = {row[0] for row in conn.execute(select(schema_version.c.version))}
+        for module in load_migrations():
+            if module.revision <= revision and module.revision not in applied:
+                _record(conn, module, 0)
+    return revision
+
+
+def upgrade(engine, target=None, log=print):
+    """Apply every pending revision up to `target` (default: head). Returns the revisions applied."""
+    migrations = load_migrations()
+    if target is None:
+        target = migrations[-1].revision if migrations else 0
+    _metadata.create_all(engine)
+
+    # Session-level lock on an autocommit connection: an open transaction
+    # here would make CREATE INDEX CONCURRENTLY wait for ourselves.
+    lock_conn = None
+    if engine.dialect.name == 'postgresql':
+        lock_conn = engine.connect().execution_options(isolation_level='AUTOCOMMIT')
+    try:
+        if lock_conn is not None:
+            lock_conn.execute(text('SELECT pg_advisory_lock(:key)'), {'key': ADVISORY_LOCK_KEY})
+
+        with engine.connect() as conn:
+            applied = {row[0] for row in conn.execute(select(schema_version.c.version))}
+
+        done = []
+        for module in migrations:
+            if module.revision in applied or module.revision > target:
+                continue
+            label = f"{module.revision:04d} {getattr(module, 'description', module.__name__)}"
+            log(f"📝 Applying {label}...")
+            started = time.perf_counter()
+            if getattr(module, 'transactional', True):
+                with engine.begin() as conn:
+                    module.upgrade(conn)
+                    _record(conn, module, round((time.perf_counter() - started) * 1000))
+            else:
+                with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                    module.upgrade(conn)
+                with engine.begin() as conn:
+                    _record(conn, module, round((time.perf_counter() - started) * 1000))
+            log(f"✅ {label} ({time.perf_counter() - started:.2f}s)")
+            done.append(module.revision)
+        return done
+    finally:
+        if lock_conn is not None:
+            lock_conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': ADVISORY_LOCK_KEY})
+            lock_conn.close()
+
+
+def check_schema(db, log=print):
+    """
+    Startup check: one query for the schema version. An empty database is
+    built from the models and stamped at head; an outdated one raises
+    SchemaOutdatedError instead of being migrated by the web process.
+    """
+    head = head_revision()
+    with db.engine.connect() as conn:
+        version = current_version(conn)
+    if version == head:
+        return version
+
+    if version is None:
+        if inspect(db.engine).get_table_names():
+            raise SchemaOutdatedError(
+                'Database has no schema_version table — run `python migrate.py upgrade` once '
+                '(revisions are idempotent on databases built by the old migrate_*.py scripts).'
+            )
+        db.create_all()
+        stamp(db.engine, head)
+        log(f"✅ Empty database built from the models (schema version {head})")
+        return head
+
+    if version < head:
+        raise SchemaOutdatedError(
+            f'Database schema is at version {version}, the code needs {head} — run `python migrate.py upgrade`.'
+        )
+    log(f"⚠️ Database schema version {version} is newer than this code ({head})")
+    return version
@@ -0,0 +1 @@
+"""One module per schema revision (vNNNN_<name>.py), applied in revision order."""
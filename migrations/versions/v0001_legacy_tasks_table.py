@@ -0,0 +1,18 @@
+"""
+Set aside a pre-task-management `tasks` table (was fix_tasks_table.py).
+Databases from before the AI task breakdown have a tasks table without
+task_id; it is renamed to tasks_old (kept as a backup) so the baseline
+revision can create the current one.
+"""
+
+from sqlalchemy import text
+from migrations.ops import table_exists, column_exists
+
+revision = 1
+description = 'Rename a legacy tasks table to tasks_old'
+
+
+def upgrade(conn):
+    if table_exists(conn, 'tasks') and not column_exists(conn, 'tasks', 'task_id'):
+        print("📝 Renaming old tasks table to tasks_old...")
+        conn.execute(text('ALTER TABLE tasks RENAME TO tasks_old'))
@@ -0,0 +1,14 @@
+"""
+Create every table missing from the database, from the models.
+Existing tables are left untouched — the following revisions bring their
+columns, constraints and indexes up to date.
+"""
+
+from models import db
+
+revision = 2
+description = 'Create missing tables'
+
+
+def upgrade(conn):
+    db.metadata.create_all(bind=conn, checkfirst=True)
@@ -0,0 +1,33 @@
+"""
+Project columns for the AI specification analysis
+(was migrate_projects.py + the projects part of migrate_tasks.py).
+"""
+
+from migrations.ops import add_column, drop_column
+
+revision = 3
+description = 'Add project specs / AI analysis columns'
+
+COLUMNS = [
+    ('specs_file', 'VARCHAR(200)'),
+    ('project_type', 'VARCHAR(100)'),
+    ('complexity', 'VARCHAR(20)'),
+    ('estimated_duration', 'VARCHAR(50)'),
+    ('required_skills', 'JSON'),
+    ('tech_stack', 'JSON'),
+    ('key_features', 'JSON'),
+    ('specs_data', 'JSON'),
+    ('nom_projet', 'VARCHAR(300)'),
+    ('resume', 'TEXT'),
+    ('livrables_attendus', 'JSON'),
+    ('besoins', 'JSON'),
+    ('taches_techniques', 'JSON'),
+    ('analyse_ressources', 'JSON'),
+    ('estimation_globale', 'JSON'),
+]
+
+
+def upgrade(conn):
+    drop_column(conn, 'projects', 'cv_path')
+    for column, ddl_type in COLUMNS:
+        add_column(conn, 'projects', column, ddl_type)
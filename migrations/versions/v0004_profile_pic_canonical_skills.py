@@ -0,0 +1,50 @@
+"""
+users.profile_pic (was migrate_profile_pic.py) and the canonical skill id
+columns of users / tasks, backfilled from technical_skills / sous_taches
+(was migrate_canonical_skills.py).
+"""
+
+import json
+from sqlalchemy import text
+from migrations.ops import add_column
+from utils.skills import canonicalize_skills
+
+revision = 4
+description = 'Add users.profile_pic and canonical_skills columns'
+
+
+def _flatten(skills):
+    """Same as User.get_all_skills: technical_skills is {category: [skills]}."""
+    if not isinstance(skills, dict):
+        return []
+    return [s for values in skills.values() if isinstance(values, list) for s in values]
+
+
+def _required(sous_taches):
+    """Same as Task.get_required_skills."""
+    return list({s for st in sous_taches or [] if isinstance(st, dict) for s in st.get('competences_requises', [])})
+
+
+def _load(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def upgrade(conn):
+    add_column(conn, 'users', 'profile_pic', 'VARCHAR(255)')
+    add_column(conn, 'users', 'canonical_skills', 'JSON')
+    add_column(conn, 'tasks', 'canonical_skills', 'JSON')
+
+    users = conn.execute(text(
+        "SELECT id, technical_skills FROM users WHERE role = 'employee' AND canonical_skills IS NULL"
+    )).fetchall()
+    for user_id, skills in users:
+        conn.execute(text("UPDATE users SET canonical_skills = :skills WHERE id = :id"), {
+            'id': user_id, 'skills': json.dumps(canonicalize_skills(_flatten(_load(skills))))
+        })
+
+    tasks = conn.execute(text("SELECT id, sous_taches FROM tasks WHERE canonical_skills IS NULL")).fetchall()
+    for task_id, sous_taches in tasks:
+        conn.execute(text("UPDATE tasks SET canonical_skills = :skills WHERE id = :id"), {
+            'id': task_id, 'skills': json.dumps(canonicalize_skills(_required(_load(sous_taches))))
+        })
+    print(f"📝 Backfilled canonical skills of {len(users)} employees and {len(tasks)} tasks")
@@ -0,0 +1,27 @@
+"""
+One task per (project_id, task_id) — target of the callback's ON CONFLICT
+upsert (was migrate_task_unique.py). Duplicates left by the old
+delete-and-recreate callback are removed first, keeping the oldest row.
+"""
+
+from sqlalchemy import text
+from migrations.ops import constraint_exists
+
+revision = 5
+description = 'Add the (project_id, task_id) unique constraint on tasks'
+
+
+def upgrade(conn):
+    if constraint_exists(conn, 'tasks', '_project_task_uc'):
+        return
+    duplicates = conn.execute(text("""
+        DELETE FROM tasks
+        WHERE id NOT IN (SELECT min(id) FROM tasks GROUP BY project_id, task_id)
+    """)).rowcount
+    if duplicates:
+        print(f"📝 Removed {duplicates} duplicate task rows")
+    if conn.dialect.name == 'sqlite':
+        # SQLite cannot add a constraint to an existing table; a unique index enforces the same
+        conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS _project_task_uc ON tasks (project_id, task_id)"))
+    else:
+        conn.execute(text("ALTER TABLE tasks ADD CONSTRAINT _project_task_uc UNIQUE (project_id, task_id)"))
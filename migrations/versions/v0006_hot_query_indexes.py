@@ -0,0 +1,52 @@
+"""
+Composite and partial indexes for the matching and dashboard queries
+(was migrate_indexes.py) — check them with check_query_plans.py.
+Built with CREATE INDEX CONCURRENTLY on PostgreSQL so the tables stay
+writable meanwhile, hence non-transactional and idempotent: an index left
+INVALID by an interrupted build is dropped and rebuilt.
+"""
+
+from sqlalchemy import text
+
+revision = 6
+description = 'Add hot query indexes (tasks, collaborators, users, projects)'
+transactional = False
+
+# name → (table, columns, partial WHERE) — same definitions as the models
+INDEXES = {
+    'ix_tasks_assignee_status': ('tasks', 'assigned_employee_id, status', None),
+    'ix_tasks_open_by_assignee': ('tasks', 'assigned_employee_id', "status <> 'completed' AND assigned_employee_id IS NOT NULL"),
+    'ix_task_collaborators_employee_id': ('task_collaborators', 'employee_id', None),
+    'ix_users_role_status': ('users', 'role, status', None),
+    'ix_projects_manager_created': ('projects', 'manager_id, created_at', None),
+    'ix_projects_status': ('projects', 'status', None),
+}
+
+SUPERSEDED = ['idx_tasks_assigned_employee_id']  # covered by ix_tasks_assignee_status
+
+
+def _is_invalid(conn, name):
+    row = conn.execute(text("""
+        SELECT NOT i.indisvalid
+        FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = :name
+    """), {'name': name}).fetchone()
+    return bool(row and row[0])
+
+
+def upgrade(conn):
+    postgres = conn.dialect.name == 'postgresql'
+    concurrently = ' CONCURRENTLY' if postgres else ''
+
+    for name, (table, columns, where) in INDEXES.items():
+        if postgres and _is_invalid(conn, name):
+            print(f"⚠️ {name} is INVALID (interrupted build) — rebuilding")
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        ddl = f"CREATE INDEX{concurrently} IF NOT EXISTS {name} ON {table} ({columns})"
+        conn.execute(text(ddl + (f" WHERE {where}" if where else '')))
+
+    for name in SUPERSEDED:
+        conn.execute(text(f"DROP INDEX{concurrently} IF EXISTS {name}"))
+
+    if postgres:
+        conn.execute(text("ANALYZE tasks, task_collaborators, users, projects"))
@@ -0,0 +1,36 @@
+"""
+Denormalized task counters on projects and users (see
+utils/task_counters.py), backfilled from the tasks table.
+"""
+
+from sqlalchemy import text
+from migrations.ops import add_column
+
+revision = 7
+description = 'Add project task counters and users.open_task_count'
+
+PROJECT_COUNTERS = {
+    'task_count': "count(*)",
+    'tasks_in_progress': "count(CASE WHEN status = 'in_progress' THEN 1 END)",
+    'tasks_completed': "count(CASE WHEN status = 'completed' THEN 1 END)",
+    'tasks_assigned': "count(assigned_employee_id)",
+    'estimated_days': "coalesce(sum(duree_estimee_jours), 0)",
+}
+
+
+def upgrade(conn):
+    for column in PROJECT_COUNTERS:
+        add_column(conn, 'projects', column, 'INTEGER NOT NULL DEFAULT 0')
+    add_column(conn, 'users', 'open_task_count', 'INTEGER NOT NULL DEFAULT 0')
+
+    for column, aggregate in PROJECT_COUNTERS.items():
+        conn.execute(text(
+            f"UPDATE projects SET {column} = "
+            f"(SELECT {aggregate} FROM tasks WHERE tasks.project_id = projects.id)"
+        ))
+    conn.execute(text(
+        "UPDATE users SET open_task_count = ("
+        "SELECT count(*) FROM tasks JOIN projects ON projects.id = tasks.project_id "
+        "WHERE tasks.assigned_employee_id = users.id AND tasks.status <> 'completed' "
+        "AND projects.status <> 'completed')"
+    ))
@@ -0,0 +1,16 @@
+"""
+Drop ix_projects_status (added by revision 6): the dashboard now counts
+projects by status with one GROUP BY over the whole table, and no query
+filters projects on status, so the index only cost writes.
+"""
+
+from sqlalchemy import text
+
+revision = 8
+description = 'Drop the unused ix_projects_status index'
+transactional = False
+
+
+def upgrade(conn):
+    concurrently = ' CONCURRENTLY' if conn.dialect.name == 'postgresql' else ''
+    conn.execute(text(f"DROP INDEX{concurrently} IF EXISTS ix_projects_status"))
@@ -4,4 +4,11 @@ db = SQLAlchemy()
 
 # Import models after db is created to avoid circular imports
 from models.user import User
-from models.project import Project, TaskCollaborator
\ No newline at end of file
+from models.project import Project, TaskCollaborator
+from models.match_cache import MatchCache
+from models.cv_job import CVJob
+from models.callback_receipt import CallbackReceipt
+from models.project_pipeline import ProjectPipeline
+
+# Session hooks keeping the task counters in sync (after the models they read)
+import utils.task_counters  # noqa: E402,F401
@@ -0,0 +1,20 @@
+from datetime import datetime
+from models import db
+
+
+class CallbackReceipt(db.Model):
+    """Project analysis callbacks accepted (queued or applied), keyed by project + SHA-256 of the payload.
+    Dropped when applying the payload fails, so a retry of it goes through."""
+    __tablename__ = 'callback_receipts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False)
+    payload_hash = db.Column(db.String(64), nullable=False)  # SHA-256 hex of the canonical JSON
+    response = db.Column(db.JSON, nullable=True)  # what the first call answered, replayed to retries
+    hits = db.Column(db.Integer, default=0)  # duplicates acknowledged
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.UniqueConstraint('project_id', 'payload_hash', name='_project_payload_uc'),)
+
+    def __repr__(self):
+        return f'<CallbackReceipt project={self.project_id} {self.payload_hash[:12]}>'
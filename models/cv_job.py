@@ -0,0 +1,42 @@
+from datetime import datetime
+from models import db
+
+
+class CVJob(db.Model):
+    """One uploaded CV waiting for (or going through) extraction + n8n dispatch."""
+    __tablename__ = 'cv_jobs'
+
+    # queued → extracting → sending → sent → done (employee created by the n8n callback)
+    # failed when extraction fails or every dispatch attempt is used up
+    STATUSES = ('queued', 'extracting', 'sending', 'sent', 'done', 'failed')
+    ACTIVE_STATUSES = ('queued', 'extracting', 'sending')
+
+    id = db.Column(db.Integer, primary_key=True)
+    original_filename = db.Column(db.String(255), nullable=False)
+    stored_filename = db.Column(db.String(255), nullable=False, index=True)
+    cv_path = db.Column(db.String(500), nullable=False)
+    content_hash = db.Column(db.String(64))  # SHA-256 of the file, key of the extraction cache
+    status = db.Column(db.String(20), default='queued', nullable=False, index=True)
+    attempts = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text)
+    employee_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'))
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'))
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'filename': self.original_filename,
+            'status': self.status,
+            'attempts': self.attempts,
+            'error': self.error,
+            'employee_id': self.employee_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    def __repr__(self):
+        return f'<CVJob {self.id} {self.original_filename} {self.status}>'
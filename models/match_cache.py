@@ -0,0 +1,17 @@
+from datetime import datetime
+from models import db
+
+
+class MatchCache(db.Model):
+    """AI match decisions, keyed by a hash of the task requirements + candidate roster."""
+    __tablename__ = 'match_cache'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), unique=True, nullable=False, index=True)  # SHA-256 hex
+    matches = db.Column(db.JSON, nullable=False)  # [{employee_id, confidence_score, reasoning}]
+    hits = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # for LRU eviction
+
+    def __repr__(self):
+        return f'<MatchCache {self.cache_key[:12]} hits={self.hits}>'
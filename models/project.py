@@ -1,5 +1,6 @@
 from datetime import datetime
 from models import db
+from utils.skills import canonicalize_skills
 
 
 class Project(db.Model):
@@ -33,13 +34,29 @@ class Project(db.Model):
     key_features = db.Column(db.JSON, nullable=True)
     specs_data = db.Column(db.JSON, nullable=True)
 
+    # Task counters, kept up to date on every task change (utils/task_counters.py)
+    task_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    tasks_in_progress = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    tasks_completed = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    tasks_assigned = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    estimated_days = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # sum of duree_estimee_jours
+
     # Relationships
     manager = db.relationship('User', backref=db.backref('projects', lazy='dynamic'))
     tasks = db.relationship('Task', backref='project', lazy='dynamic', cascade='all, delete-orphan')
 
+    # Manager's project list (newest first) — see migrations/versions/v0006_hot_query_indexes.py
+    __table_args__ = (
+        db.Index('ix_projects_manager_created', 'manager_id', 'created_at'),
+    )
+
     def __repr__(self):
         return f'<Project {self.name}>'
 
+    @property
+    def tasks_not_started(self):
+        return self.task_count - self.tasks_in_progress - self.tasks_completed
+
 
 class Task(db.Model):
     __tablename__ = 'tasks'
@@ -53,6 +70,7 @@ class Task(db.Model):
     duree_estimee_jours = db.Column(db.Integer, nullable=True)
     status = db.Column(db.String(50), default='not started')  # not started, in_progress, completed
     sous_taches = db.Column(db.JSON, nullable=True)  # Array of sub-tasks
+    canonical_skills = db.Column(db.JSON, nullable=True)  # Canonical ids of the required skills
     
     # Employee assignment
     assigned_employee_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
@@ -65,6 +83,19 @@ class Task(db.Model):
     # Relationships
     assigned_employee = db.relationship('User', backref=db.backref('assigned_tasks', lazy='dynamic'))
 
+    __table_args__ = (
+        # One row per id_tache in a project (target of the callback's ON CONFLICT upsert)
+        db.UniqueConstraint('project_id', 'task_id', name='_project_task_uc'),
+        # An employee's tasks by status (employee pages, reassignment)
+        db.Index('ix_tasks_assignee_status', 'assigned_employee_id', 'status'),
+        # Open tasks per assignee (capacity check, workload snapshot) — partial, only open rows
+        db.Index(
+            'ix_tasks_open_by_assignee', 'assigned_employee_id',
+            postgresql_where=db.text("status <> 'completed' AND assigned_employee_id IS NOT NULL"),
+            sqlite_where=db.text("status <> 'completed' AND assigned_employee_id IS NOT NULL")
+        ),
+    )
+
     def __repr__(self):
         return f'<Task {self.task_id}: {self.nom}>'
     
@@ -77,6 +108,16 @@ class Task(db.Model):
                     skills.update(st['competences_requises'])
         return list(skills)
 
+    def sync_canonical_skills(self):
+        """Recompute canonical required-skill ids — call whenever sous_taches is written."""
+        self.canonical_skills = canonicalize_skills(self.get_required_skills())
+
+    def get_canonical_skills(self):
+        """Stored canonical skill ids (computed on the fly for rows not yet backfilled)."""
+        if self.canonical_skills is not None:
+            return self.canonical_skills
+        return canonicalize_skills(self.get_required_skills())
+
     def get_all_assignees(self):
         """Get primary + all collaborators for this task."""
         assignees = []
@@ -111,8 +152,12 @@ class TaskCollaborator(db.Model):
     task = db.relationship('Task', backref=db.backref('collaborators', lazy='select', cascade='all, delete-orphan'))
     employee = db.relationship('User', backref=db.backref('collaborating_tasks', lazy='dynamic'))
 
-    # Prevent duplicate collaborator entries
-    __table_args__ = (db.UniqueConstraint('task_id', 'employee_id', name='_task_employee_uc'),)
+    __table_args__ = (
+        # Prevent duplicate collaborator entries
+        db.UniqueConstraint('task_id', 'employee_id', name='_task_employee_uc'),
+        # Tasks an employee helps on (the unique constraint only covers task_id lookups)
+        db.Index('ix_task_collaborators_employee_id', 'employee_id'),
+    )
 
     def __repr__(self):
         return f'<TaskCollaborator task={self.task_id} emp={self.employee_id} role={self.role}>'
@@ -0,0 +1,74 @@
+from datetime import datetime
+from models import db
+
+
+class ProjectPipeline(db.Model):
+    """Background analysis of one uploaded specification, step by step."""
+    __tablename__ = 'project_pipelines'
+
+    # uploaded → extracted → sent → analyzed → matched
+    # uploaded / extracted / analyzed are picked up by the pipeline workers,
+    # sent waits for the n8n callback. failed after a permanent error or
+    # once every attempt of a step is used up.
+    STATES = ('uploaded', 'extracted', 'sent', 'analyzed', 'matched', 'failed')
+    RUNNABLE_STATES = ('uploaded', 'extracted', 'analyzed')
+
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False, unique=True)
+    state = db.Column(db.String(20), default='uploaded', nullable=False, index=True)
+    running = db.Column(db.Boolean, default=False, nullable=False)  # claimed by a worker
+    claimed_at = db.Column(db.DateTime)
+    specs_hash = db.Column(db.String(64))  # SHA-256 of the specs PDF, key of the extraction cache
+    specs_text = db.Column(db.Text)
+    text_truncated = db.Column(db.Boolean, default=False)
+    analysis = db.Column(db.JSON)  # callback payload waiting to be applied
+    payload_hash = db.Column(db.String(64))
+    result = db.Column(db.JSON)  # task changes + matches of the last applied analysis
+    attempts = db.Column(db.Integer, default=0)  # of the current step
+    error = db.Column(db.Text)
+    failed_step = db.Column(db.String(20))
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    history = db.Column(db.JSON, default=list)  # [{state, at, seconds in previous state, step_seconds}]
+    state_changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    project = db.relationship('Project', backref=db.backref('pipeline', uselist=False, cascade='all, delete-orphan'))
+
+    def transition(self, state, step_seconds=None, error=None):
+        """Move to `state`, recording how long the previous one lasted."""
+        now = datetime.utcnow()
+        entry = {
+            'state': state,
+            'at': now.isoformat(),
+            'seconds': round((now - self.state_changed_at).total_seconds(), 3) if self.state_changed_at else None,
+        }
+        if step_seconds is not None:
+            entry['step_seconds'] = round(step_seconds, 3)
+        if error:
+            entry['error'] = error[:300]
+        self.history = (self.history or []) + [entry]  # reassign so the JSON change is saved
+        if state == 'failed':
+            self.failed_step = self.state
+        self.state = state
+        self.state_changed_at = now
+        self.attempts = 0
+        self.error = error
+        self.next_attempt_at = now
+
+    def to_dict(self):
+        return {
+            'project_id': self.project_id,
+            'state': self.state,
+            'running': self.running,
+            'attempts': self.attempts,
+            'error': self.error,
+            'failed_step': self.failed_step,
+            'text_truncated': self.text_truncated,
+            'result': self.result,
+            'history': self.history or [],
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    def __repr__(self):
+        return f'<ProjectPipeline project={self.project_id} {self.state}>'
@@ -4,6 +4,7 @@ from werkzeug.security import generate_password_hash, check_password_hash
 import secrets
 import string
 import json
+from utils.skills import canonicalize_skills
 
 
 class User(db.Model):
@@ -23,9 +24,11 @@ class User(db.Model):
     
     # Critical fields for task matching
     technical_skills = db.Column(db.JSON, nullable=True)  # Store as JSON object
+    canonical_skills = db.Column(db.JSON, nullable=True)  # Canonical skill ids (see utils/skills.py)
     certifications = db.Column(db.JSON, nullable=True)    # List of certifications
     languages = db.Column(db.JSON, nullable=True)         # Language proficiency
     years_of_experience = db.Column(db.Integer, nullable=True)  # Calculate from work_experience
+    open_task_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Capacity check (utils/task_counters.py)
     
     # Full CV data (for reference)
     cv_data = db.Column(db.JSON, nullable=True)  # Store complete CV analysis
@@ -35,14 +38,20 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Active-employee roster (matching, dashboards) — see migrations/versions/v0006_hot_query_indexes.py
+    __table_args__ = (db.Index('ix_users_role_status', 'role', 'status'),)
+
+    @staticmethod
+    def _username_base(name):
+        if not name:
+            return "employee"
+        base = name.lower().replace(' ', '_')
+        return ''.join(c for c in base if c.isalnum() or c == '_')
+
     @staticmethod
     def generate_username(name):
         """Generate a unique username from the full name."""
-        if not name:
-            base = "employee"
-        else:
-            base = name.lower().replace(' ', '_')
-            base = ''.join(c for c in base if c.isalnum() or c == '_')
+        base = User._username_base(name)
         
         username = base
         counter = 1
@@ -51,6 +60,33 @@ class User(db.Model):
             counter += 1
         return username
 
+    @staticmethod
+    def generate_usernames(names):
+        """
+        Unique usernames for many names at once (same scheme as
+        generate_username): one query for every taken name sharing a base,
+        and names in the batch don't collide with each other.
+        """
+        bases = [User._username_base(name) for name in names]
+        taken = set()
+        if bases:
+            # '_' is a LIKE wildcard: this over-matches, the exact check below doesn't
+            rows = db.session.query(User.username).filter(
+                db.or_(*[User.username.like(f'{base}%') for base in set(bases)])
+            ).all()
+            taken = {row[0] for row in rows}
+        
+        usernames = []
+        for base in bases:
+            username = base
+            counter = 1
+            while username in taken:
+                username = f"{base}_{counter}"
+                counter += 1
+            taken.add(username)
+            usernames.append(username)
+        return usernames
+
     @staticmethod
     def generate_password(length=10):
         """Generate a random secure password."""
@@ -77,6 +113,16 @@ class User(db.Model):
                     all_skills.extend(skills)
         return all_skills
 
+    def sync_canonical_skills(self):
+        """Recompute canonical skill ids — call whenever technical_skills is written."""
+        self.canonical_skills = canonicalize_skills(self.get_all_skills())
+
+    def get_canonical_skills(self):
+        """Stored canonical skill ids (computed on the fly for rows not yet backfilled)."""
+        if self.canonical_skills is not None:
+            return self.canonical_skills
+        return canonicalize_skills(self.get_all_skills())
+
     @property
     def competencies(self):
         """Return skills as comma-separated string (for template compatibility)."""
@@ -88,14 +134,12 @@ class User(db.Model):
         Calculate how well this employee matches required skills.
         Returns a score between 0 and 100.
         """
-        if not required_skills or not self.technical_skills:
+        required_ids = canonicalize_skills(required_skills)
+        if not required_ids or not self.technical_skills:
             return 0
         
-        employee_skills = [s.lower() for s in self.get_all_skills()]
-        required_skills_lower = [s.lower() for s in required_skills]
-        
-        matched = sum(1 for skill in required_skills_lower if skill in employee_skills)
-        score = (matched / len(required_skills_lower)) * 100
+        matched = len(set(required_ids) & set(self.get_canonical_skills()))
+        score = (matched / len(required_ids)) * 100
         
         return round(score, 2)
 
@@ -8,6 +8,7 @@ from models import db
 from models.project import Project, Task, TaskCollaborator
 from models.user import User
 from utils.decorators import employee_required
+from utils.scheduling import apply_task_edit
 
 employee_bp = Blueprint('employee', __name__, url_prefix='/employee')
 
@@ -208,19 +209,14 @@ def project_detail(project_id):
         ).all()]
     )
 
-    total_tasks = len(tasks)
-    completed = sum(1 for t in tasks if t.status == 'completed')
-    in_progress = sum(1 for t in tasks if t.status == 'in_progress')
-    assigned_to_me = sum(1 for t in tasks if t.id in mine_task_ids)
-    total_days = sum(t.duree_estimee_jours or 0 for t in tasks)
-
+    # Project-wide figures come from the task counters (utils/task_counters.py)
     stats = {
-        'total_tasks': total_tasks,
-        'completed': completed,
-        'in_progress': in_progress,
-        'not_started': total_tasks - completed - in_progress,
-        'assigned_to_me': assigned_to_me,
-        'total_days': total_days,
+        'total_tasks': project.task_count,
+        'completed': project.tasks_completed,
+        'in_progress': project.tasks_in_progress,
+        'not_started': project.tasks_not_started,
+        'assigned_to_me': len(mine_task_ids),
+        'total_days': project.estimated_days,
     }
 
     return render_template(
@@ -261,6 +257,8 @@ def update_task_status(task_id):
     task.status = new_status
     task.updated_at = datetime.utcnow()
     db.session.commit()
+    # Keep the cached schedule (readiness used by auto-matching) in step
+    apply_task_edit(task)
 
     status_labels = {'not_started': 'Not Started', 'in_progress': 'In Progress', 'completed': 'Done'}
     flash(f'Task "{task.nom}" marked as {status_labels.get(new_status, new_status)}.', 'success')
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, session, jsonify, current_app
 import requests
 from datetime import datetime
+from utils.webhook_client import post_json
 
 main_bp = Blueprint('main', __name__)
 
@@ -40,15 +41,11 @@ def public_webhook_debug():
     
     try:
         # Test connection to n8n
-        response = requests.post(
-            n8n_url,
-            json={
-                'test': 'connection from Flask', 
-                'timestamp': str(datetime.now()),
-                'source': 'public-debug-endpoint'
-            },
-            timeout=10
-        )
+        response = post_json(n8n_url, {
+            'test': 'connection from Flask', 
+            'timestamp': str(datetime.now()),
+            'source': 'public-debug-endpoint'
+        })
         
         return jsonify({
             'success': True,
@@ -2,14 +2,29 @@ import os
 import json
 import re
 import requests
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask import Blueprint, request, render_template, redirect, url_for, flash, session, jsonify, current_app
+from sqlalchemy.exc import IntegrityError
 from werkzeug.utils import secure_filename
 from models import db
 from models.user import User
 from models.project import Project, Task, TaskCollaborator
+from models.cv_job import CVJob
+from models.callback_receipt import CallbackReceipt
+from models.project_pipeline import ProjectPipeline
 from utils.decorators import manager_required
-from utils.matching import auto_match_tasks, auto_reassign_employee
+from utils.matching import auto_match_tasks, reassign_after_completion
+from utils.skill_index import skill_index
+from utils.cv_queue import enqueue_cv, notify_workers, mark_cv_done, mark_cv_jobs_done
+from utils.pdf_extraction import extraction_stats
+from utils.file_store import save_upload
+from utils.webhook_client import post_json
+from utils.circuit_breaker import endpoint_health
+from utils.task_sync import payload_hash
+from utils.project_pipeline import start_pipeline, receive_analysis, notify_workers as notify_pipeline
+from utils.scheduling import (
+    get_project_schedule, invalidate_schedule, apply_task_edit, apply_task_removal
+)
 
 manager_bp = Blueprint('manager', __name__, url_prefix='/manager')
 
@@ -35,33 +50,6 @@ def allowed_cv_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_CV_EXTENSIONS
 
 
-def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF file using pdfplumber (better extraction quality)."""
-    try:
-        import pdfplumber
-        text = ""
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text.strip()
-    except Exception as e:
-        current_app.logger.error(f"Error extracting PDF text with pdfplumber: {e}")
-        # Fallback to PyPDF2 if pdfplumber fails
-        try:
-            import PyPDF2
-            text = ""
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() or ""
-            return text.strip()
-        except Exception as e2:
-            current_app.logger.error(f"Error extracting PDF text with PyPDF2: {e2}")
-            return None
-
-
 # ─────────────────────────────────────────────
 # Dashboard / Overview
 # ─────────────────────────────────────────────
@@ -72,23 +60,22 @@ def dashboard():
     employees = User.query.filter_by(role='employee').order_by(User.created_at.desc()).all()
     managers = User.query.filter_by(role='manager').all()
     
-    # Get projects
-    all_projects = Project.query.order_by(Project.created_at.desc()).all()
-    pending_projects = Project.query.filter_by(status='pending').count()
-    in_progress_projects = Project.query.filter_by(status='in_progress').count()
-    completed_projects = Project.query.filter_by(status='completed').count()
+    # Project counts by status in one grouped query; only the recent ones are loaded
+    project_counts = dict(
+        db.session.query(Project.status, db.func.count(Project.id)).group_by(Project.status).all()
+    )
     
     # Recent items
-    recent_projects = all_projects[:5]
+    recent_projects = Project.query.order_by(Project.created_at.desc()).limit(5).all()
     recent_employees = employees[:5]
 
     stats = {
         'total_employees': len(employees),
         'total_managers': len(managers),
-        'total_projects': len(all_projects),
-        'pending_projects': pending_projects,
-        'in_progress_projects': in_progress_projects,
-        'completed_projects': completed_projects,
+        'total_projects': sum(project_counts.values()),
+        'pending_projects': project_counts.get('pending', 0),
+        'in_progress_projects': project_counts.get('in_progress', 0),
+        'completed_projects': project_counts.get('completed', 0),
     }
     
     return render_template('manager/dashboard.html', 
@@ -106,11 +93,12 @@ def dashboard():
 def add_employee():
     """
     New workflow: Manager uploads one or multiple CVs.
-    For each CV:
-    1. Save CV file
-    2. Extract text from PDF
-    3. Send to n8n for AI analysis
-    4. n8n will call back /api/employee/create with the analyzed data
+    The request only saves the files and queues one CVJob per CV; the
+    background workers (utils/cv_queue.py) then, for each CV:
+    1. Extract text from PDF
+    2. Send to n8n for AI analysis (with retries)
+    3. n8n will call back /api/employee/create with the analyzed data
+    Progress is polled by the employees page via /api/cv-jobs.
     """
     cv_files = request.files.getlist('cv_files')
     
@@ -133,83 +121,80 @@ def add_employee():
     cv_folder = current_app.config.get('CV_UPLOAD_FOLDER', os.path.join(current_app.root_path, 'uploads', 'cvs'))
     os.makedirs(cv_folder, exist_ok=True)
     
-    # n8n URLs
-    n8n_url = current_app.config.get('N8N_WEBHOOK_URL')
-    backup_urls = current_app.config.get('N8N_BACKUP_URLS', [])
-    urls_to_try = [n8n_url] + backup_urls if backup_urls else [n8n_url]
-    
-    success_count = 0
-    fail_count = 0
-    
+    reused = 0
     for cv_file in valid_files:
-        # Save CV file with unique name
+        # Content-addressed: a CV uploaded before reuses the stored file (and its cached text)
         filename = secure_filename(cv_file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-        unique_filename = f"{timestamp}_{filename}"
-        cv_path = os.path.join(cv_folder, unique_filename)
-        cv_file.save(cv_path)
+        stored_filename, cv_path, sha, reused_file = save_upload(cv_file, cv_folder)
+        reused += int(reused_file)
         
-        # Extract text from PDF
-        cv_text = extract_text_from_pdf(cv_path)
-        
-        if not cv_text:
-            current_app.logger.warning(f"❌ Could not extract text from {filename}")
-            flash(f'⚠️ Could not extract text from {filename}. Skipping.', 'warning')
-            os.remove(cv_path)
-            fail_count += 1
-            continue
-        
-        # Send to n8n for analysis with retry logic
-        sent = False
-        for attempt, url in enumerate(urls_to_try, 1):
-            if not url:
-                continue
-            try:
-                current_app.logger.info(f"🔄 [{filename}] Attempt {attempt}: Trying {url}")
-                
-                public_url = current_app.config.get('PUBLIC_URL', 'http://localhost:5000')
-                callback_url = f"{public_url}/manager/api/employee/create"
-                
-                response = requests.post(
-                    url,
-                    json={
-                        'cv_text': cv_text,
-                        'cv_filename': unique_filename,
-                        'callback_url': callback_url,
-                        'retry_count': attempt
-                    },
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    success_count += 1
-                    sent = True
-                    break
-                else:
-                    current_app.logger.warning(f"❌ [{filename}] Attempt {attempt} failed: {response.status_code}")
-            except requests.exceptions.RequestException as e:
-                current_app.logger.error(f"❌ [{filename}] Attempt {attempt} connection error: {e}")
-                continue
-        
-        if not sent:
-            fail_count += 1
-            current_app.logger.error(f"❌ All n8n attempts failed for {filename}")
+        enqueue_cv(filename, stored_filename, cv_path, created_by=session.get('user_id'), content_hash=sha)
+    
+    if reused:
+        current_app.logger.info(f"♻️ {reused} CV(s) were already on disk — reusing stored file and extracted text")
+    
+    db.session.commit()
+    notify_workers()
     
-    # Summary flash messages
     total = len(valid_files)
-    if success_count == total:
-        if total == 1:
-            flash('✅ CV uploaded successfully! The AI is analyzing it. The employee will be added shortly.', 'success')
-        else:
-            flash(f'✅ All {success_count} CVs uploaded successfully! The AI is analyzing them. Employees will be added shortly.', 'success')
-    elif success_count > 0:
-        flash(f'⚠️ {success_count}/{total} CVs sent to AI successfully. {fail_count} failed.', 'warning')
+    if total == 1:
+        flash('✅ CV uploaded! It is queued for AI analysis — the employee will be added shortly.', 'success')
     else:
-        flash(f'❌ All {total} CV uploads failed to reach n8n.', 'error')
-        flash('💡 Solutions: 1) Ask friend to restart ngrok, 2) Get new URL, 3) Use test endpoint', 'warning')
+        flash(f'✅ {total} CVs uploaded! They are queued for AI analysis — employees will be added shortly.', 'success')
     
     return redirect(url_for('manager.employees'))
 
+
+@manager_bp.route('/api/cv-jobs', methods=['GET'])
+@manager_required
+def cv_jobs_status():
+    """Per-CV processing status. ?ids=1,2,3 for specific jobs, else the last 24h."""
+    ids = request.args.get('ids', '')
+    query = CVJob.query
+    if ids:
+        job_ids = [int(i) for i in ids.split(',') if i.strip().isdigit()]
+        query = query.filter(CVJob.id.in_(job_ids))
+    else:
+        since = datetime.utcnow() - timedelta(hours=24)
+        query = query.filter(CVJob.created_at >= since)
+    
+    jobs = query.order_by(CVJob.id.desc()).limit(100).all()
+    return jsonify({
+        'jobs': [job.to_dict() for job in jobs],
+        'active': sum(1 for job in jobs if job.status in CVJob.ACTIVE_STATUSES)
+    })
+
+
+@manager_bp.route('/api/project-pipelines', methods=['GET'])
+@manager_required
+def project_pipelines_status():
+    """Analysis pipeline state + timed transitions. ?ids=1,2,3 for specific projects, else all of this manager's."""
+    query = ProjectPipeline.query.join(Project).filter(Project.manager_id == session.get('user_id'))
+    ids = request.args.get('ids', '')
+    if ids:
+        project_ids = [int(i) for i in ids.split(',') if i.strip().isdigit()]
+        query = query.filter(ProjectPipeline.project_id.in_(project_ids))
+    
+    pipelines = query.order_by(ProjectPipeline.project_id.desc()).limit(100).all()
+    return jsonify({
+        'pipelines': [pipeline.to_dict() for pipeline in pipelines],
+        'active': sum(1 for p in pipelines if p.state not in ('matched', 'failed'))
+    })
+
+
+@manager_bp.route('/api/webhook-health', methods=['GET'])
+@manager_required
+def webhook_health():
+    """Circuit-breaker state, latency and error counts per n8n endpoint (this process)."""
+    return jsonify({'endpoints': endpoint_health.snapshot()})
+
+
+@manager_bp.route('/api/pdf-extraction-stats', methods=['GET'])
+@manager_required
+def pdf_extraction_stats():
+    """Cumulative PDF extraction timings of this worker process."""
+    return jsonify(extraction_stats())
+
 # ─────────────────────────────────────────────
 # TEMPORARY: Test Employee Creation Without n8n
 # ─────────────────────────────────────────────
@@ -267,9 +252,11 @@ def test_create_employee():
         cv_file='test_manual_entry.pdf'
     )
     employee.set_password(password)
+    employee.sync_canonical_skills()
     
     db.session.add(employee)
     db.session.commit()
+    skill_index.add_employee(employee)
     
     flash(f'✅ Test employee created! Username: {username}, Password: {password}', 'success')
     return redirect(url_for('manager.employees'))
@@ -300,6 +287,7 @@ def create_hind_employee():
         existing.status = 'active'
         existing.set_password(fixed_password)
         db.session.commit()
+        skill_index.add_employee(existing)
         flash(
             f'Employee "hind" already existed. Username: {existing.username}, Password reset to: {fixed_password}',
             'info'
@@ -316,9 +304,11 @@ def create_hind_employee():
         cv_file='hind_demo.pdf'
     )
     employee.set_password(fixed_password)
+    employee.sync_canonical_skills()
 
     db.session.add(employee)
     db.session.commit()
+    skill_index.add_employee(employee)
 
     flash(f'✅ Employee "hind" created! Username: {username}, Password: {fixed_password}', 'success')
     return redirect(url_for('manager.employees'))
@@ -331,11 +321,7 @@ def debug_webhook():
     
     try:
         # Test connection to n8n
-        response = requests.post(
-            n8n_url,
-            json={'test': 'connection', 'timestamp': str(datetime.now())},
-            timeout=10
-        )
+        response = post_json(n8n_url, {'test': 'connection', 'timestamp': str(datetime.now())})
         
         return jsonify({
             'success': True,
@@ -419,6 +405,150 @@ def debug_analyze():
 # ─────────────────────────────────────────────
 # API Endpoint for n8n to create employee
 # ─────────────────────────────────────────────
+def _parse_cv_analysis(data):
+    """
+    Turn one n8n CV analysis JSON into User fields.
+    Returns (fields, None) or (None, error message).
+    """
+    # ─── Extract from metadata ───
+    metadata = data.get('metadata', {})
+    cv_filename = metadata.get('cv_filename', '')
+    
+    # ─── Extract from personal_info ───
+    personal_info = data.get('personal_info', {})
+    name = personal_info.get('full_name', '').strip()
+    email = personal_info.get('email', '').strip() or None
+    phone = personal_info.get('phone', '').strip() or None
+    professional_headline = personal_info.get('professional_headline', '').strip() or None
+    
+    # Location: combine city + country
+    location_data = personal_info.get('location', {})
+    city = location_data.get('city', '')
+    country = location_data.get('country', '')
+    location = f"{city}, {country}".strip(', ') or None
+    
+    # ─── Validate required fields ───
+    if not name:
+        return None, 'Name (full_name) is required'
+    
+    if not email:
+        return None, 'Email is required'
+    
+    # ─── Extract technical_skills (keep as JSON object) ───
+    technical_skills = data.get('technical_skills', {})
+    
+    # Log what we're receiving from n8n for debugging
+    current_app.logger.info(f"📊 Received from n8n - technical_skills: {technical_skills}")
+    current_app.logger.info(f"📊 Full received data keys: {list(data.keys())}")
+    
+    # If skills is empty, try alternative keys that n8n might send
+    if not technical_skills or technical_skills == {}:
+        # Try common alternative key names
+        alternative_keys = ['skills', 'competences', 'competencies', 'abilities']
+        for key in alternative_keys:
+            if key in data and data[key]:
+                technical_skills = data[key]
+                current_app.logger.info(f"✅ Found skills under key '{key}': {technical_skills}")
+                break
+    
+    # ─── Calculate years of experience from work_experience ───
+    work_experience = data.get('work_experience', [])
+    years_of_experience = 0
+    
+    for exp in work_experience:
+        start_date = exp.get('start_date', '')
+        end_date = exp.get('end_date', '')
+        is_current = exp.get('is_current', False)
+        
+        # Parse start year (handles formats like "Mars 2022" or "2022-03")
+        start_year = None
+        if start_date:
+            year_match = re.search(r'(\d{4})', start_date)
+            if year_match:
+                start_year = int(year_match.group(1))
+        
+        # Parse end year
+        end_year = datetime.now().year  # Default to current year
+        if not is_current and end_date and end_date.lower() not in ['présent', 'present', '']:
+            year_match = re.search(r'(\d{4})', end_date)
+            if year_match:
+                end_year = int(year_match.group(1))
+        
+        # Calculate duration
+        if start_year:
+            years_of_experience += (end_year - start_year)
+    
+    return {
+        'name': name,
+        'email': email,
+        'phone': phone,
+        'location': location,
+        'professional_headline': professional_headline,
+        'technical_skills': technical_skills,
+        'certifications': data.get('certifications', []),
+        'languages': data.get('languages', []),
+        'years_of_experience': years_of_experience,
+        'cv_data': data,  # Store complete CV analysis for reference
+        'cv_file': cv_filename
+    }, None
+
+
+def _build_employee(fields, username, password):
+    employee = User(username=username, role='employee', status='active', **fields)
+    employee.set_password(password)
+    employee.sync_canonical_skills()
+    return employee
+
+
+def _employee_payload(employee, password):
+    return {
+        'id': employee.id,
+        'username': employee.username,
+        'password': password,  # ⚠️ Send back so manager can give to employee
+        'name': employee.name,
+        'email': employee.email,
+        'phone': employee.phone,
+        'location': employee.location,
+        'professional_headline': employee.professional_headline,
+        'technical_skills': employee.get_all_skills(),
+        'years_of_experience': employee.years_of_experience,
+        'status': 'active'
+    }
+
+
+def _send_welcome_emails(accounts):
+    """accounts: [(name, email, username, password)] — one SMTP session for all of them."""
+    try:
+        from email.mime.text import MIMEText
+        import smtplib
+        
+        smtp_server = os.environ.get('SMTP_SERVER', 'smtp.gmail.com')
+        smtp_port = int(os.environ.get('SMTP_PORT', 587))
+        smtp_user = os.environ.get('SMTP_USER')
+        smtp_pass = os.environ.get('SMTP_PASS')
+        
+        accounts = [account for account in accounts if account[1]]
+        if not accounts:
+            return
+        
+        if smtp_user and smtp_pass:
+            with smtplib.SMTP(smtp_server, smtp_port) as server:
+                server.starttls()
+                server.login(smtp_user, smtp_pass)
+                for name, email, username, password in accounts:
+                    msg = MIMEText(f"Hello {name},\n\nWelcome to OrchestrAi! Your account has been created.\n\nUsername: {username}\nPassword: {password}\n\nPlease log in and change your password.\n\nBest,\nOrchestrAi Team")
+                    msg['Subject'] = 'Welcome to OrchestrAi'
+                    msg['From'] = smtp_user
+                    msg['To'] = email
+                    server.send_message(msg)
+                    current_app.logger.info(f"📧 Welcome email sent to {email}")
+        else:
+            for name, email, username, password in accounts:
+                current_app.logger.info(f"📧 [DEV MODE] Welcome email would be sent to {email}.\nUsername: {username}\nPassword: {password}\n(Configure SMTP_USER and SMTP_PASS env vars to send real emails)")
+    except Exception as email_err:
+        current_app.logger.error(f"Failed to send welcome email: {email_err}")
+
+
 @manager_bp.route('/api/employee/create', methods=['POST'])
 def api_create_employee():
     """
@@ -432,162 +562,41 @@ def api_create_employee():
         if not data:
             return jsonify({'success': False, 'error': 'No data provided'}), 400
         
-        # ─── Extract from metadata ───
-        metadata = data.get('metadata', {})
-        cv_filename = metadata.get('cv_filename', '')
-        
-        # ─── Extract from personal_info ───
-        personal_info = data.get('personal_info', {})
-        name = personal_info.get('full_name', '').strip()
-        email = personal_info.get('email', '').strip() or None
-        phone = personal_info.get('phone', '').strip() or None
-        professional_headline = personal_info.get('professional_headline', '').strip() or None
-        
-        # Location: combine city + country
-        location_data = personal_info.get('location', {})
-        city = location_data.get('city', '')
-        country = location_data.get('country', '')
-        location = f"{city}, {country}".strip(', ') or None
-        
-        # ─── Validate required fields ───
-        if not name:
-            return jsonify({'success': False, 'error': 'Name (full_name) is required'}), 400
-        
-        if not email:
-            return jsonify({'success': False, 'error': 'Email is required'}), 400
+        fields, error = _parse_cv_analysis(data)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
         
         # Check if email already exists
-        if User.query.filter_by(email=email).first():
-            return jsonify({'success': False, 'error': f'Email "{email}" already exists'}), 400
+        if User.query.filter_by(email=fields['email']).first():
+            return jsonify({'success': False, 'error': f'Email "{fields["email"]}" already exists'}), 400
         
         # ─── Generate username and password automatically ───
-        username = User.generate_username(name)
+        username = User.generate_username(fields['name'])
         password = User.generate_password()
         
-        # ─── Extract technical_skills (keep as JSON object) ───
-        technical_skills = data.get('technical_skills', {})
-        
-        # Log what we're receiving from n8n for debugging
-        current_app.logger.info(f"📊 Received from n8n - technical_skills: {technical_skills}")
-        current_app.logger.info(f"📊 Full received data keys: {list(data.keys())}")
-        
-        # If skills is empty, try alternative keys that n8n might send
-        if not technical_skills or technical_skills == {}:
-            # Try common alternative key names
-            alternative_keys = ['skills', 'competences', 'competencies', 'abilities']
-            for key in alternative_keys:
-                if key in data and data[key]:
-                    technical_skills = data[key]
-                    current_app.logger.info(f"✅ Found skills under key '{key}': {technical_skills}")
-                    break
-        
-        # ─── Extract certifications ───
-        certifications = data.get('certifications', [])
-        
-        # ─── Extract languages ───
-        languages = data.get('languages', [])
-        
-        # ─── Calculate years of experience from work_experience ───
-        work_experience = data.get('work_experience', [])
-        years_of_experience = 0
-        
-        for exp in work_experience:
-            start_date = exp.get('start_date', '')
-            end_date = exp.get('end_date', '')
-            is_current = exp.get('is_current', False)
-            
-            # Parse start year
-            start_year = None
-            if start_date:
-                # Handle formats like "Mars 2022" or "2022-03"
-                import re
-                year_match = re.search(r'(\d{4})', start_date)
-                if year_match:
-                    start_year = int(year_match.group(1))
-            
-            # Parse end year
-            end_year = datetime.now().year  # Default to current year
-            if not is_current and end_date and end_date.lower() not in ['présent', 'present', '']:
-                year_match = re.search(r'(\d{4})', end_date)
-                if year_match:
-                    end_year = int(year_match.group(1))
-            
-            # Calculate duration
-            if start_year:
-                years_of_experience += (end_year - start_year)
-        
         # ─── Create the employee ───
-        employee = User(
-            username=username,
-            name=name,
-            email=email,
-            phone=phone,
-            location=location,
-            professional_headline=professional_headline,
-            role='employee',
-            status='active',
-            technical_skills=technical_skills,
-            certifications=certifications,
-            languages=languages,
-            years_of_experience=years_of_experience,
-            cv_data=data,  # Store complete CV analysis for reference
-            cv_file=cv_filename
-        )
-        employee.set_password(password)
+        employee = _build_employee(fields, username, password)
         
         db.session.add(employee)
+        db.session.flush()
+        if fields['cv_file']:
+            mark_cv_done(fields['cv_file'], employee.id)
         db.session.commit()
+        skill_index.add_employee(employee)
         
         # ─── Send Welcome Email ───
-        try:
-            from email.mime.text import MIMEText
-            import smtplib
-            import os
-            
-            smtp_server = os.environ.get('SMTP_SERVER', 'smtp.gmail.com')
-            smtp_port = int(os.environ.get('SMTP_PORT', 587))
-            smtp_user = os.environ.get('SMTP_USER')
-            smtp_pass = os.environ.get('SMTP_PASS')
-            
-            if smtp_user and smtp_pass and email:
-                msg = MIMEText(f"Hello {name},\n\nWelcome to OrchestrAi! Your account has been created.\n\nUsername: {username}\nPassword: {password}\n\nPlease log in and change your password.\n\nBest,\nOrchestrAi Team")
-                msg['Subject'] = 'Welcome to OrchestrAi'
-                msg['From'] = smtp_user
-                msg['To'] = email
-                
-                with smtplib.SMTP(smtp_server, smtp_port) as server:
-                    server.starttls()
-                    server.login(smtp_user, smtp_pass)
-                    server.send_message(msg)
-                current_app.logger.info(f"📧 Welcome email sent to {email}")
-            else:
-                current_app.logger.info(f"📧 [DEV MODE] Welcome email would be sent to {email}.\nUsername: {username}\nPassword: {password}\n(Configure SMTP_USER and SMTP_PASS env vars to send real emails)")
-        except Exception as email_err:
-            current_app.logger.error(f"Failed to send welcome email: {email_err}")
+        _send_welcome_emails([(employee.name, employee.email, username, password)])
         
-
         # ─── Return success with credentials ───
         return jsonify({
             'success': True,
-            'message': f'Employee "{name}" created successfully',
+            'message': f'Employee "{employee.name}" created successfully',
             'debug': {
-                'skills_received': technical_skills,
+                'skills_received': fields['technical_skills'],
                 'skills_stored_in_db': employee.technical_skills,
                 'skills_extracted': employee.get_all_skills()
             },
-            'employee': {
-                'id': employee.id,
-                'username': username,
-                'password': password,  # ⚠️ Send back so manager can give to employee
-                'name': name,
-                'email': email,
-                'phone': phone,
-                'location': location,
-                'professional_headline': professional_headline,
-                'technical_skills': employee.get_all_skills(),
-                'years_of_experience': years_of_experience,
-                'status': 'active'
-            }
+            'employee': _employee_payload(employee, password)
         }), 201
         
     except Exception as e:
@@ -596,6 +605,89 @@ def api_create_employee():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@manager_bp.route('/api/employee/create-batch', methods=['POST'])
+def api_create_employees_batch():
+    """
+    Batched form of /api/employee/create for the n8n batch workflow.
+    Body: {"items": [{"item_id": ..., <CV analysis JSON>}, ...]} — item_id is
+    the id sent with each CV (the CV job id). Every valid item is created in
+    one transaction; invalid ones are reported per item without blocking
+    the others.
+    """
+    try:
+        data = request.get_json()
+        items = data.get('items') if isinstance(data, dict) else data
+        
+        if not items or not isinstance(items, list):
+            return jsonify({'success': False, 'error': 'No items provided'}), 400
+        
+        results = []
+        valid = []  # (result, fields)
+        seen_emails = set()
+        for index, item in enumerate(items):
+            item_id = item.get('item_id') if isinstance(item, dict) else None
+            result = {'item_id': item_id if item_id is not None else index}
+            results.append(result)
+            
+            fields, error = _parse_cv_analysis(item) if isinstance(item, dict) else (None, 'Item must be an object')
+            if not error and fields['email'] in seen_emails:
+                error = f'Email "{fields["email"]}" appears twice in the batch'
+            if error:
+                result.update(success=False, error=error)
+                continue
+            seen_emails.add(fields['email'])
+            valid.append((result, fields))
+        
+        # One query for every email already in use
+        taken = {
+            row[0] for row in db.session.query(User.email)
+            .filter(User.email.in_([fields['email'] for _, fields in valid])).all()
+        } if valid else set()
+        for result, fields in valid:
+            if fields['email'] in taken:
+                result.update(success=False, error=f'Email "{fields["email"]}" already exists')
+        valid = [(result, fields) for result, fields in valid if fields['email'] not in taken]
+        
+        # ─── Bulk usernames, one flush, one commit ───
+        usernames = User.generate_usernames([fields['name'] for _, fields in valid])
+        created = []
+        for (result, fields), username in zip(valid, usernames):
+            password = User.generate_password()
+            employee = _build_employee(fields, username, password)
+            db.session.add(employee)
+            created.append((result, employee, password))
+        db.session.flush()
+        
+        mark_cv_jobs_done({
+            result['item_id']: employee.id for result, employee, _ in created
+        }, {
+            employee.cv_file: employee.id for _, employee, _ in created if employee.cv_file
+        })
+        db.session.commit()
+        
+        for result, employee, password in created:
+            skill_index.add_employee(employee)
+            result.update(success=True, employee=_employee_payload(employee, password))
+        
+        _send_welcome_emails([
+            (employee.name, employee.email, employee.username, password)
+            for _, employee, password in created
+        ])
+        
+        current_app.logger.info(f"✅ Batch callback: {len(created)}/{len(items)} employees created")
+        return jsonify({
+            'success': bool(created),
+            'created': len(created),
+            'failed': len(items) - len(created),
+            'results': results
+        }), 201 if created else 400
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error creating employees (batch): {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 # ─────────────────────────────────────────────
 # Employee Management — Edit
 # ─────────────────────────────────────────────
@@ -657,6 +749,7 @@ def edit_employee(employee_id):
                 flash('Invalid image format. Use PNG, JPG, GIF, or WebP.', 'error')
 
     db.session.commit()
+    skill_index.add_employee(employee)
     flash(f'Employee "{employee.name or employee.username}" updated successfully!', 'success')
     return redirect(url_for('manager.employees'))
 
@@ -679,6 +772,7 @@ def delete_employee(employee_id):
 
     db.session.delete(employee)
     db.session.commit()
+    skill_index.remove_employee(employee.id)
     flash(f'Employee "{employee.username}" deleted.', 'success')
     return redirect(url_for('manager.employees'))
 
@@ -828,7 +922,14 @@ def projects():
         'in_progress': len([p for p in all_projects if p.status == 'in_progress']),
         'completed': len([p for p in all_projects if p.status == 'completed']),
     }
-    return render_template('manager/projects.html', projects=all_projects, stats=stats)
+    
+    # Background analysis state per project (one query)
+    pipelines = {
+        pipeline.project_id: pipeline for pipeline in ProjectPipeline.query.filter(
+            ProjectPipeline.project_id.in_([p.id for p in all_projects])
+        ).all()
+    } if all_projects else {}
+    return render_template('manager/projects.html', projects=all_projects, stats=stats, pipelines=pipelines)
 
 
 # ─────────────────────────────────────────────
@@ -858,34 +959,13 @@ def add_project():
     upload_folder = os.path.join(current_app.root_path, 'uploads', 'projects', 'specs')
     os.makedirs(upload_folder, exist_ok=True)
     original_filename = specs_file.filename
-    specs_filename = secure_filename(f"{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{original_filename}")
-    specs_path = os.path.join(upload_folder, specs_filename)
-    specs_file.save(specs_path)
-    
-    # ── Step 1: Extract text from specs PDF ──
-    specs_text = ""
-    try:
-        import pdfplumber
-        with pdfplumber.open(specs_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                specs_text += page_text
-        
-        print(f"\n{'='*60}")
-        print(f"📄 EXTRACTED TEXT ({len(specs_text)} chars):")
-        print(specs_text[:500])
-        print(f"{'='*60}\n")
-        
-        if not specs_text.strip():
-            flash('Could not extract text from the PDF. The file may be scanned/image-based.', 'error')
-            return redirect(url_for('manager.projects'))
-        
-    except Exception as e:
-        current_app.logger.error(f"❌ Error extracting text from specs: {e}")
-        flash(f'Error reading the PDF file: {str(e)}', 'error')
-        return redirect(url_for('manager.projects'))
+    # Content-addressed: re-uploading the same specs reuses the stored file and cached text
+    specs_filename, specs_path, specs_hash, reused = save_upload(specs_file, upload_folder)
+    if reused:
+        current_app.logger.info(f"♻️ Specs {original_filename} already stored as {specs_filename}")
     
-    # ── Step 2: Create project in DB first (status = "analyzing") ──
+    # Create the project; extraction, the n8n request and matching run in
+    # the background pipeline (uploaded → extracted → sent → analyzed → matched)
     project_name = original_filename.rsplit('.', 1)[0].replace('_', ' ').replace('-', ' ').title()
     project = Project(
         name=project_name,
@@ -896,56 +976,12 @@ def add_project():
         specs_file=original_filename
     )
     db.session.add(project)
+    start_pipeline(project, specs_hash=specs_hash)
     db.session.commit()
+    notify_pipeline()
     
-    print(f"✅ Project created in DB with ID: {project.id}")
-    
-    # ── Step 3: Send text + project_id + callback_url to friend's n8n ──
-    n8n_url = current_app.config.get('N8N_PROJECT_WEBHOOK_URL')
-    public_url = current_app.config.get('PUBLIC_URL', '')
-    callback_url = f"{public_url}/manager/api/project/callback"
-    
-    try:
-        import requests as req_lib
-        
-        payload = {
-            'texte': specs_text,
-            'project_id': project.id,
-            'callback_url': callback_url
-        }
-        
-        print(f"\n{'='*60}")
-        print(f"📤 SENDING TO FRIEND'S n8n: {n8n_url}")
-        print(f"📦 project_id: {project.id}")
-        print(f"📦 callback_url: {callback_url}")
-        print(f"📦 texte length: {len(specs_text)} chars")
-        print(f"📦 texte preview: {specs_text[:200]}")
-        print(f"{'='*60}\n")
-        
-        response = req_lib.post(
-            n8n_url,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=30  # Just sending — don't wait for AI to finish
-        )
-        
-        print(f"📥 FRIEND RESPONSE: {response.status_code} — {response.text[:500]}")
-        
-        if response.status_code == 200:
-            flash(f'Project "{project_name}" created! AI analysis is in progress — results will appear shortly.', 'success')
-        else:
-            current_app.logger.error(f"❌ Webhook error: {response.status_code} - {response.text}")
-            flash(f'Project created but AI analysis request failed (HTTP {response.status_code}). You can check again later.', 'warning')
-            
-    except req_lib.exceptions.Timeout:
-        flash(f'Project "{project_name}" created but the AI service is slow. Results will appear when ready.', 'warning')
-    except req_lib.exceptions.ConnectionError:
-        current_app.logger.error("❌ Cannot connect to friend's n8n")
-        flash(f'Project created but cannot reach AI service. Is your friend\'s ngrok running?', 'error')
-    except Exception as e:
-        current_app.logger.error(f"❌ Error sending to n8n: {e}")
-        flash(f'Project created but AI request failed: {str(e)}', 'warning')
-    
+    print(f"✅ Project created in DB with ID: {project.id} — queued for analysis")
+    flash(f'Project "{project_name}" created! AI analysis is in progress — results will appear shortly.', 'success')
     return redirect(url_for('manager.projects'))
 
 
@@ -961,6 +997,7 @@ def delete_project(project_id):
     project_name = project.name
     db.session.delete(project)
     db.session.commit()
+    invalidate_schedule(project_id)
     
     flash(f'Project "{project_name}" deleted.', 'success')
     return redirect(url_for('manager.projects'))
@@ -1006,6 +1043,15 @@ def project_analysis_callback():
     }
     
     But we also handle the full format with taches_techniques etc.
+    
+    Idempotent: n8n retries carrying the same payload are acknowledged from
+    callback_receipts without touching the tasks (unless applying it failed:
+    the receipt is dropped then, so the retry is applied); a changed payload is
+    applied as a diff so unchanged tasks keep their assignments.
+    The payload is only stored here — the project pipeline workers apply it.
+    The answer keeps the synchronous version's shape (200, success / message /
+    matched / matches) for existing workflows, but matching has not run yet:
+    matched is 0 and matches empty; the outcome shows in /api/project-pipelines.
     """
     try:
         data = request.get_json()
@@ -1028,95 +1074,41 @@ def project_analysis_callback():
         if not project:
             return jsonify({'success': False, 'error': f'Project {project_id} not found'}), 404
         
-        # The friend's n8n may wrap results in "analysis_results" key
-        ai_data = data.get('analysis_results', data)
-        
-        # Handle case where response might be wrapped in a list
-        if isinstance(ai_data, list) and len(ai_data) > 0:
-            ai_data = ai_data[0]
-        
-        # If there's an 'output' wrapper, unwrap it
-        if isinstance(ai_data, dict) and 'output' in ai_data and isinstance(ai_data['output'], dict):
-            ai_data = ai_data['output']
-        
-        print(f"📦 PARSED AI DATA KEYS: {list(ai_data.keys()) if isinstance(ai_data, dict) else type(ai_data)}")
-        
-        # Update project with AI results
-        nom_projet = ai_data.get('nom_projet', '').strip()
-        if nom_projet:
-            project.nom_projet = nom_projet
-            project.name = nom_projet
-        
-        project.resume = ai_data.get('resume', '').strip() or None
-        project.description = ai_data.get('resume', '') or project.description
-        
-        # Handle besoins — friend sends flat keys, or nested
-        besoins = ai_data.get('besoins', {})
-        if not besoins:
-            # Friend may send besoins_fonctionnels and besoins_non_fonctionnels at top level
-            fonctionnels = ai_data.get('besoins_fonctionnels', [])
-            non_fonctionnels = ai_data.get('besoins_non_fonctionnels', [])
-            if fonctionnels or non_fonctionnels:
-                besoins = {'fonctionnels': fonctionnels, 'non_fonctionnels': non_fonctionnels}
-        project.besoins = besoins
-        
-        # Handle livrables — friend may send as "livrables" or "livrables_attendus"
-        livrables = ai_data.get('livrables_attendus', ai_data.get('livrables', []))
-        project.livrables_attendus = livrables
-        
-        # Other fields (if present in AI response)
-        project.taches_techniques = ai_data.get('taches_techniques', [])
-        project.analyse_ressources = ai_data.get('analyse_ressources', {})
-        project.estimation_globale = ai_data.get('estimation_globale', {})
-        project.specs_data = data  # Store complete callback data
-        project.status = 'pending'
-        
-        # Delete old tasks before creating new ones
-        Task.query.filter_by(project_id=project.id).delete()
-        
-        # Create Task records from taches_techniques
-        tasks_created = 0
-        taches_techniques = ai_data.get('taches_techniques', [])
-        
-        for tache_data in taches_techniques:
-            task = Task(
-                project_id=project.id,
-                task_id=tache_data.get('id_tache', f'T{tasks_created + 1}'),
-                nom=tache_data.get('nom', ''),
-                priorite=tache_data.get('priorite'),
-                dependances=tache_data.get('dependances', []),
-                duree_estimee_jours=tache_data.get('duree_estimee_jours'),
-                status='not started',
-                sous_taches=tache_data.get('sous_taches', [])
-            )
-            db.session.add(task)
-            tasks_created += 1
-        
-        db.session.commit()
-        
-        print(f"✅ Project {project_id} updated! Name: {project.name}, Tasks: {tasks_created}")
-        current_app.logger.info(f"✅ Project {project_id} updated with AI analysis. {tasks_created} tasks created.")
+        # ── Idempotency: same project + same payload → already applied ──
+        digest = payload_hash(data)
+        receipt = CallbackReceipt.query.filter_by(project_id=project.id, payload_hash=digest).first()
+        if receipt:
+            receipt.hits = (receipt.hits or 0) + 1
+            db.session.commit()
+            print(f"♻️ Duplicate callback for project {project_id} ignored ({digest[:12]})")
+            return jsonify(dict(receipt.response or {'success': True}, duplicate=True))
+        receipt = CallbackReceipt(project_id=project.id, payload_hash=digest)
+        db.session.add(receipt)
+        
+        # Only record the analysis here; a pipeline worker applies it
+        # (tasks diff + auto-matching) so n8n gets its answer right away
+        pipeline = receive_analysis(project, data, digest)
+        receipt.response = {
+            'success': True,
+            'message': f'Analysis for project {project.id} received — processing in background',
+            'matched': 0,
+            'matches': [],
+            'state': pipeline.state
+        }
         
-        # ── Auto-match tasks to employees ──
-        match_results = []
         try:
-            match_results = auto_match_tasks(project.id)
-            if match_results:
-                print(f"🤖 AUTO-MATCHING: {len(match_results)} tasks matched to employees:")
-                for m in match_results:
-                    print(f"   • {m['task_id']} → {m['employee_name']} (score: {m['score']})")
-            else:
-                print("⚠️ AUTO-MATCHING: No employees available or no skills to match.")
-        except Exception as match_err:
-            print(f"⚠️ Auto-matching error (non-fatal): {match_err}")
-            current_app.logger.warning(f"Auto-matching failed: {match_err}")
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent retry of the same payload won the race
+            db.session.rollback()
+            return jsonify({
+                'success': True, 'duplicate': True, 'message': 'Callback already being processed',
+                'matched': 0, 'matches': []
+            })
+        notify_pipeline()
         
-        return jsonify({
-            'success': True,
-            'message': f'Project "{project.name}" updated with {tasks_created} tasks',
-            'matched': len(match_results),
-            'matches': match_results
-        })
+        print(f"✅ Analysis for project {project_id} queued ({digest[:12]})")
+        return jsonify(receipt.response)
         
     except Exception as e:
         db.session.rollback()
@@ -1153,29 +1145,27 @@ def project_detail(project_id):
     # Get all employees for assignment dropdown
     employees = User.query.filter_by(role='employee', status='active').all()
     
-    # Calculate project statistics
-    total_tasks = len(tasks)
-    completed_tasks = sum(1 for t in tasks if t.status == 'completed')
-    in_progress_tasks = sum(1 for t in tasks if t.status == 'in_progress')
-    assigned_tasks = sum(1 for t in tasks if t.assigned_employee_id is not None)
-    
-    total_days = sum(t.duree_estimee_jours or 0 for t in tasks)
+    # Dependency graph: critical path + tasks ready to start
+    schedule = get_project_schedule(project.id, tasks)
     
+    # Project statistics from the task counters (utils/task_counters.py)
     stats = {
-        'total_tasks': total_tasks,
-        'completed': completed_tasks,
-        'in_progress': in_progress_tasks,
-        'not_started': total_tasks - completed_tasks - in_progress_tasks,
-        'assigned': assigned_tasks,
-        'unassigned': total_tasks - assigned_tasks,
-        'total_days': total_days
+        'total_tasks': project.task_count,
+        'completed': project.tasks_completed,
+        'in_progress': project.tasks_in_progress,
+        'not_started': project.tasks_not_started,
+        'assigned': project.tasks_assigned,
+        'unassigned': project.task_count - project.tasks_assigned,
+        'total_days': project.estimated_days,
+        'critical_days': schedule.project_duration
     }
     
     return render_template('manager/project_detail.html', 
                          project=project, 
                          tasks=tasks, 
                          employees=employees,
-                         stats=stats)
+                         stats=stats,
+                         schedule=schedule)
 
 
 @manager_bp.route('/project/<int:project_id>/auto-match', methods=['POST'])
@@ -1184,7 +1174,7 @@ def auto_match_project(project_id):
     """Manually trigger auto-matching for unassigned tasks in a project."""
     project = Project.query.get_or_404(project_id)
     try:
-        results = auto_match_tasks(project.id)
+        results = auto_match_tasks(project.id, mode=current_app.config.get('MATCHING_MODE', 'sequential'))
         if results:
             names = ', '.join(f"{r['task_id']}→{r['employee_name']}" for r in results)
             flash(f'🤖 Auto-matched {len(results)} tasks: {names}', 'success')
@@ -1244,27 +1234,17 @@ def update_task_status(project_id, task_id):
         old_status = task.status
         task.status = new_status
         db.session.commit()
+        apply_task_edit(task)
         flash(f'Task status updated to "{new_status}"', 'success')
         
-        # Auto-reassign when task is completed
+        # Auto-reassign everyone freed by the completion, in one batch
         if new_status == 'completed' and old_status != 'completed':
-            # Try to reassign the primary assignee
-            if task.assigned_employee_id:
-                result = auto_reassign_employee(task.assigned_employee_id, project_id)
-                if result:
-                    flash(
-                        f'🤖 {result["employee_name"]} finished their task and was auto-assigned to help on {result["task_id"]} ({result["task_name"]}) — {result["score"]:.0f}% match',
-                        'success'
-                    )
-            
-            # Try to reassign collaborators too
-            for collab in task.collaborators:
-                result = auto_reassign_employee(collab.employee_id, project_id)
-                if result:
-                    flash(
-                        f'🤖 {result["employee_name"]} was auto-reassigned to help on {result["task_id"]} ({result["task_name"]}) — {result["score"]:.0f}% match',
-                        'success'
-                    )
+            for result in reassign_after_completion(task):
+                if result['employee_id'] == task.assigned_employee_id:
+                    message = f'🤖 {result["employee_name"]} finished their task and was auto-assigned to help on {result["task_id"]} ({result["task_name"]}) — {result["score"]:.0f}% match'
+                else:
+                    message = f'🤖 {result["employee_name"]} was auto-reassigned to help on {result["task_id"]} ({result["task_name"]}) — {result["score"]:.0f}% match'
+                flash(message, 'success')
     else:
         flash('Invalid status', 'error')
     
@@ -1299,26 +1279,32 @@ def edit_task(project_id, task_id):
         task.status = data['status']
     if 'sous_taches' in data:
         task.sous_taches = data['sous_taches']
+        task.sync_canonical_skills()
+    if 'dependances' in data and isinstance(data['dependances'], list):
+        task.dependances = data['dependances']
     
     db.session.commit()
+    # Only this task's DAG descendants are recomputed
+    schedule = apply_task_edit(task)
     
     # Auto-reassign when task is completed via modal
-    reassignment_info = None
+    reassignments = []
     if data.get('status') == 'completed' and old_status != 'completed':
-        if task.assigned_employee_id:
-            reassignment_info = auto_reassign_employee(task.assigned_employee_id, project_id)
-        for collab in task.collaborators:
-            r = auto_reassign_employee(collab.employee_id, project_id)
-            if r and not reassignment_info:
-                reassignment_info = r
-    
-    # Calculate updated project total days
-    all_tasks = Task.query.filter_by(project_id=project_id).all()
-    total_days = sum(t.duree_estimee_jours or 0 for t in all_tasks)
-    
-    response = {'success': True, 'message': 'Task updated', 'total_days': total_days}
-    if reassignment_info:
-        response['reassignment'] = reassignment_info
+        reassignments = reassign_after_completion(task)
+    
+    # Totals from the task counters, written in the same transaction as the
+    # edit; the cached schedule (per process, may lag) only for the critical path
+    project = task.project
+    response = {
+        'success': True,
+        'message': 'Task updated',
+        'total_days': project.estimated_days,
+        'critical_days': schedule.project_duration,
+        'completed_tasks': project.tasks_completed
+    }
+    if reassignments:
+        response['reassignment'] = reassignments[0]
+        response['reassignments'] = reassignments
     
     return jsonify(response)
 
@@ -1334,8 +1320,10 @@ def delete_task(project_id, task_id):
         return redirect(url_for('manager.project_detail', project_id=project_id))
     
     task_name = task.nom
+    schedule_id = task.task_id
     db.session.delete(task)
     db.session.commit()
+    apply_task_removal(project_id, schedule_id)
     flash(f'Task "{task_name}" deleted.', 'success')
     
     return redirect(url_for('manager.project_detail', project_id=project_id))
@@ -1423,5 +1411,15 @@ def employees():
         'active': active_count,
         'inactive': inactive_count,
     }
-    return render_template('manager/employees.html', employees=all_employees, stats=stats)
+    
+    # CV uploads still in flight (or that failed recently) — polled by the page
+    since = datetime.utcnow() - timedelta(hours=24)
+    cv_jobs = (
+        CVJob.query
+        .filter(CVJob.created_at >= since, CVJob.status.in_(CVJob.ACTIVE_STATUSES + ('sent', 'failed')))
+        .order_by(CVJob.id.desc())
+        .limit(50)
+        .all()
+    )
+    return render_template('manager/employees.html', employees=all_employees, stats=stats, cv_jobs=cv_jobs)
 
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+# Importing app.py builds the default (development) app: keep it off the dev database
+os.environ['DATABASE_URL'] = 'sqlite://'
+
+from app import create_app
+from models import db as _db
+from models.user import User
+from models.project import Project
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+
+
+@pytest.fixture
+def db(app):
+    return _db
+
+
+@pytest.fixture
+def project(db):
+    manager = User(username='manager', role='manager', password_hash='x')
+    db.session.add(manager)
+    db.session.flush()
+    project = Project(name='Project', manager_id=manager.id, status='pending')
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+
+@pytest.fixture
+def employees(db):
+    employees = [
+        User(username=f'employee{i}', name=f'Employee {i}', role='employee', status='active', password_hash='x')
+        for i in range(3)
+    ]
+    db.session.add_all(employees)
+    db.session.commit()
+    return employees
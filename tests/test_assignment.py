@@ -0,0 +1,69 @@
+import random
+from itertools import combinations, product
+
+import pytest
+
+from utils.assignment import solve_assignment
+
+
+def _brute_force(candidates, demand, capacity):
+    """Best (filled slots, -cost) over every capacity-respecting assignment."""
+    choices = []
+    for key, options in candidates.items():
+        choices.append([
+            subset
+            for size in range(demand[key] + 1)
+            for subset in combinations(options, size)
+        ])
+    best = (0, 0)
+    for picked in product(*choices):
+        load = {}
+        for subset in picked:
+            for emp_id, _ in subset:
+                load[emp_id] = load.get(emp_id, 0) + 1
+        if any(count > capacity.get(emp_id, 0) for emp_id, count in load.items()):
+            continue
+        filled = sum(len(subset) for subset in picked)
+        cost = sum(c for subset in picked for _, c in subset)
+        best = max(best, (filled, -cost))
+    return best
+
+
+def _random_instance(rng):
+    employee_ids = list(range(1, rng.randint(2, 4) + 1))
+    candidates, demand = {}, {}
+    for key in range(rng.randint(1, 4)):
+        chosen = rng.sample(employee_ids, rng.randint(1, len(employee_ids)))
+        candidates[f'T{key}'] = [(emp_id, rng.randint(0, 9)) for emp_id in chosen]
+        demand[f'T{key}'] = rng.randint(0, 2)
+    capacity = {emp_id: rng.randint(0, 2) for emp_id in employee_ids}
+    return candidates, demand, capacity
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_matches_brute_force(seed):
+    candidates, demand, capacity = _random_instance(random.Random(seed))
+
+    assignment = solve_assignment(candidates, demand, capacity)
+
+    costs = {key: dict(options) for key, options in candidates.items()}
+    load = {}
+    for key, emp_ids in assignment.items():
+        assert len(emp_ids) == len(set(emp_ids)) <= demand[key]
+        for emp_id in emp_ids:
+            assert emp_id in costs[key]
+            load[emp_id] = load.get(emp_id, 0) + 1
+    assert all(count <= capacity[emp_id] for emp_id, count in load.items())
+
+    filled = sum(len(emp_ids) for emp_ids in assignment.values())
+    cost = sum(costs[key][emp_id] for key, emp_ids in assignment.items() for emp_id in emp_ids)
+    assert (filled, -cost) == _brute_force(candidates, demand, capacity)
+
+
+def test_cheapest_first():
+    assignment = solve_assignment({'T1': [(1, 5), (2, 1)]}, {'T1': 2}, {1: 1, 2: 1})
+    assert assignment == {'T1': [2, 1]}
+
+
+def test_no_capacity_leaves_task_out():
+    assert solve_assignment({'T1': [(1, 0)]}, {'T1': 1}, {1: 0}) == {}
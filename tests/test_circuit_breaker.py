@@ -0,0 +1,203 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import utils.circuit_breaker as circuit_breaker
+import utils.webhook_client as webhook_client
+from utils.circuit_breaker import BREAKER_COOLDOWN_SECONDS, BREAKER_FAILURE_THRESHOLD, EndpointHealth
+
+PRIMARY = 'https://primary.example/webhook'
+BACKUP = 'http://localhost:5678/webhook'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', clock)
+    return clock
+
+
+@pytest.fixture
+def health(monkeypatch, clock):
+    health = EndpointHealth()
+    monkeypatch.setattr(health, '_start_prober', lambda: None)  # probes are driven by hand
+    return health
+
+
+def _state(health, url):
+    return health._endpoints[url].state
+
+
+def _open(health, url):
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        health.ranked([url])
+        health.record_failure(url, 'boom')
+
+
+def test_opens_after_threshold_failures(health):
+    for _ in range(BREAKER_FAILURE_THRESHOLD - 1):
+        health.record_failure(PRIMARY, 'boom')
+    assert _state(health, PRIMARY) == 'closed'
+    assert health.ranked([PRIMARY]) == [PRIMARY]
+
+    health.record_failure(PRIMARY, 'boom')
+    assert _state(health, PRIMARY) == 'open'
+    assert health.ranked([PRIMARY]) == []
+
+
+def test_success_resets_the_failure_count(health):
+    health.record_failure(PRIMARY, 'boom')
+    health.record_failure(PRIMARY, 'boom')
+    health.record_success(PRIMARY, 0.1)
+    health.record_failure(PRIMARY, 'boom')
+    assert _state(health, PRIMARY) == 'closed'
+
+
+def test_skipped_during_cooldown(health, clock):
+    _open(health, PRIMARY)
+    clock.now += BREAKER_COOLDOWN_SECONDS - 1
+    assert health.ranked([PRIMARY, BACKUP]) == [BACKUP]
+
+
+def test_half_open_trial_after_cooldown(health, clock):
+    _open(health, PRIMARY)
+    clock.now += BREAKER_COOLDOWN_SECONDS
+
+    assert health.ranked([PRIMARY]) == [PRIMARY]
+    assert _state(health, PRIMARY) == 'half_open'
+    # One trial at a time
+    assert health.ranked([PRIMARY]) == []
+
+    health.record_success(PRIMARY, 0.2)
+    assert _state(health, PRIMARY) == 'closed'
+
+
+def test_failed_trial_reopens(health, clock):
+    _open(health, PRIMARY)
+    clock.now += BREAKER_COOLDOWN_SECONDS
+    health.ranked([PRIMARY])
+
+    health.record_failure(PRIMARY, 'still down')
+
+    assert _state(health, PRIMARY) == 'open'
+    clock.now += 1
+    assert health.ranked([PRIMARY]) == []
+
+
+def test_unused_trial_is_released(health, clock):
+    _open(health, PRIMARY)
+    clock.now += BREAKER_COOLDOWN_SECONDS
+    health.ranked([PRIMARY])
+
+    health.release(PRIMARY)
+
+    assert _state(health, PRIMARY) == 'open'
+    assert health.ranked([PRIMARY]) == [PRIMARY]
+
+
+@pytest.mark.parametrize('status, headers, closes', [
+    (200, {}, True),
+    (204, {}, True),
+    (405, {}, True),
+    (404, {}, False),
+    (500, {}, False),
+    (502, {}, False),
+    (200, {'ngrok-error-code': 'ERR_NGROK_3200'}, False),
+])
+def test_probe_closes_only_on_2xx_or_405(health, monkeypatch, status, headers, closes):
+    _open(health, PRIMARY)
+    response = SimpleNamespace(status_code=status, headers=headers)
+    monkeypatch.setattr(webhook_client, 'get_session', lambda: SimpleNamespace(get=lambda url, timeout: response))
+
+    health._probe(PRIMARY)
+
+    assert _state(health, PRIMARY) == ('closed' if closes else 'open')
+
+
+def test_probe_error_keeps_it_open_for_another_cooldown(health, clock, monkeypatch):
+    _open(health, PRIMARY)
+    clock.now += BREAKER_COOLDOWN_SECONDS
+
+    def get(url, timeout):
+        raise requests.exceptions.ConnectionError('refused')
+    monkeypatch.setattr(webhook_client, 'get_session', lambda: SimpleNamespace(get=get))
+
+    health._probe(PRIMARY)
+
+    assert _state(health, PRIMARY) == 'open'
+    assert health.ranked([PRIMARY]) == []
+
+
+class FakeEndpoints:
+    """post_json stand-in: url -> status code, or an exception to raise."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def __call__(self, url, payload, timeout=None):
+        self.calls.append((url, payload))
+        answer = self.answers[url]
+        if isinstance(answer, Exception):
+            raise answer
+        return SimpleNamespace(status_code=answer)
+
+
+@pytest.fixture
+def failover(monkeypatch, health):
+    monkeypatch.setattr(webhook_client, 'endpoint_health', health)
+
+    def install(answers):
+        fake = FakeEndpoints(answers)
+        monkeypatch.setattr(webhook_client, 'post_json', fake)
+        return fake
+    return install
+
+
+def test_failover_tries_endpoints_in_order(failover):
+    fake = failover({PRIMARY: requests.exceptions.ConnectTimeout('timeout'), BACKUP: 200})
+
+    response, errors = webhook_client.post_with_failover([PRIMARY, BACKUP], lambda attempt: {'attempt': attempt})
+
+    assert response.status_code == 200
+    assert fake.calls == [(PRIMARY, {'attempt': 1}), (BACKUP, {'attempt': 2})]
+    assert len(errors) == 1 and errors[0].startswith(PRIMARY)
+
+
+def test_failover_ranks_failing_endpoint_last(failover):
+    fake = failover({PRIMARY: 502, BACKUP: 200})
+    webhook_client.post_with_failover([PRIMARY, BACKUP], lambda attempt: {})
+    fake.calls.clear()
+
+    webhook_client.post_with_failover([PRIMARY, BACKUP], lambda attempt: {})
+
+    assert [url for url, _ in fake.calls] == [BACKUP]
+
+
+def test_failover_skips_open_endpoint(failover, health):
+    _open(health, PRIMARY)
+    fake = failover({PRIMARY: 200, BACKUP: 200})
+
+    response, _ = webhook_client.post_with_failover([PRIMARY, BACKUP], lambda attempt: {})
+
+    assert response is not None
+    assert [url for url, _ in fake.calls] == [BACKUP]
+
+
+def test_failover_all_open(failover, health):
+    _open(health, PRIMARY)
+    fake = failover({PRIMARY: 200})
+
+    response, errors = webhook_client.post_with_failover([PRIMARY], lambda attempt: {})
+
+    assert response is None and fake.calls == []
+    assert 'open-circuited' in errors[0]
@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+import utils.cv_queue as cv_queue
+from models.cv_job import CVJob
+from utils.cv_queue import (
+    CV_JOB_MAX_ATTEMPTS, _claim_jobs, enqueue_cv, mark_cv_done, mark_cv_jobs_done, process_job,
+    process_pending_jobs
+)
+
+
+@pytest.fixture
+def jobs(db):
+    jobs = [enqueue_cv(f'cv{i}.pdf', f'stored{i}.pdf', f'/nonexistent/stored{i}.pdf') for i in range(3)]
+    db.session.commit()
+    return jobs
+
+
+@pytest.fixture
+def dispatch(monkeypatch):
+    """_dispatch_to_n8n stand-in: returns `outcome` and records the jobs sent."""
+    class Dispatch:
+        def __init__(self):
+            self.outcome = (True, None)
+            self.sent = []
+
+        def __call__(self, job, cv_text):
+            self.sent.append(job.id)
+            return self.outcome
+    fake = Dispatch()
+    monkeypatch.setattr(cv_queue, '_dispatch_to_n8n', fake)
+    return fake
+
+
+@pytest.fixture
+def rival(db):
+    """Another worker claims the first candidate right after this worker has listed it."""
+    def claim_first_candidate(state):
+        statement = state.statement
+        if not state.is_select or [c['name'] for c in statement.column_descriptions] != ['id']:
+            return None
+        if statement.column_descriptions[0]['entity'] is not CVJob:
+            return None
+        frozen = state.invoke_statement().freeze()
+        candidates = [row.id for row in frozen()]
+        if candidates:
+            state.session.connection().execute(
+                CVJob.__table__.update().where(CVJob.id == candidates[0]).values(status='extracting')
+            )
+        return frozen()
+
+    event.listen(db.session, 'do_orm_execute', claim_first_candidate)
+    yield
+    event.remove(db.session, 'do_orm_execute', claim_first_candidate)
+
+
+def test_claims_are_disjoint(db, jobs):
+    first = _claim_jobs(2)
+    second = _claim_jobs(2)
+
+    assert [job.id for job in first] == [jobs[0].id, jobs[1].id]
+    assert [job.id for job in second] == [jobs[2].id]
+    assert _claim_jobs(2) == []
+    assert {job.status for job in first + second} == {'extracting'}
+
+
+def test_claim_skips_a_job_taken_meanwhile(db, jobs, rival):
+    claimed = _claim_jobs(3)
+
+    # The conditional UPDATE matched nothing for the job the rival took first
+    assert [job.id for job in claimed] == [jobs[1].id, jobs[2].id]
+
+
+def test_claim_waits_for_the_backoff(db, jobs):
+    jobs[0].next_attempt_at = datetime.utcnow() + timedelta(minutes=5)
+    db.session.commit()
+
+    assert [job.id for job in _claim_jobs(3)] == [jobs[1].id, jobs[2].id]
+
+
+def test_dispatch_failure_retries_then_fails(db, jobs, dispatch):
+    dispatch.outcome = (False, 'n8n down')
+    job = jobs[0]
+    CVJob.query.filter(CVJob.id != job.id).update({'status': 'done'})
+    db.session.commit()
+
+    for attempt in range(1, CV_JOB_MAX_ATTEMPTS):
+        assert _claim_jobs(1) == [job]
+        process_job(job, 'CV text')
+        assert (job.status, job.attempts, job.error) == ('queued', attempt, 'n8n down')
+        assert _claim_jobs(1) == []  # backing off
+        job.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+    assert _claim_jobs(1) == [job]
+    process_job(job, 'CV text')
+    assert job.status == 'failed'
+    assert job.attempts == CV_JOB_MAX_ATTEMPTS
+    assert job.finished_at is not None
+
+
+def test_unreadable_cv_fails_without_dispatch(db, jobs, dispatch):
+    _claim_jobs(1)
+    process_job(jobs[0], None)
+
+    assert jobs[0].status == 'failed'
+    assert dispatch.sent == []
+
+
+def test_pending_jobs_are_sent(db, jobs, dispatch, monkeypatch):
+    monkeypatch.setattr(cv_queue, 'extract_texts', lambda paths, hashes: {path: 'CV text' for path in paths})
+
+    assert process_pending_jobs() == 3
+    assert sorted(dispatch.sent) == [job.id for job in jobs]
+    assert {job.status for job in CVJob.query} == {'sent'}
+
+
+def test_callback_completes_the_waiting_job(db, jobs, employees):
+    jobs[0].status = 'sent'
+    db.session.commit()
+
+    job = mark_cv_done('stored0.pdf', employees[0].id)
+
+    assert job is jobs[0]
+    assert (job.status, job.employee_id) == ('done', employees[0].id)
+
+
+def test_callback_ahead_of_the_worker(db, jobs, employees):
+    jobs[0].status = 'sending'
+    db.session.commit()
+
+    assert mark_cv_done('stored0.pdf', employees[0].id) is jobs[0]
+    assert jobs[0].status == 'done'
+
+
+@pytest.mark.parametrize('status', ['done', 'failed'])
+def test_callback_leaves_finished_jobs_alone(db, jobs, employees, status):
+    jobs[0].status = status
+    jobs[0].employee_id = employees[0].id if status == 'done' else None
+    db.session.commit()
+
+    assert mark_cv_done('stored0.pdf', employees[1].id) is None
+    assert mark_cv_jobs_done({jobs[0].id: employees[1].id}) == []
+    db.session.commit()
+
+    assert jobs[0].status == status
+    assert jobs[0].employee_id == (employees[0].id if status == 'done' else None)
+
+
+def test_duplicate_uploads_complete_oldest_first(db, employees):
+    older = enqueue_cv('a.pdf', 'shared.pdf', '/nonexistent/shared.pdf')
+    newer = enqueue_cv('b.pdf', 'shared.pdf', '/nonexistent/shared.pdf')
+    older.status = newer.status = 'sent'
+    db.session.commit()
+
+    assert mark_cv_done('shared.pdf', employees[0].id) is older
+    assert mark_cv_done('shared.pdf', employees[1].id) is newer
+    assert mark_cv_done('shared.pdf', employees[2].id) is None
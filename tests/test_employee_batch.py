@@ -0,0 +1,108 @@
+import pytest
+
+from models.user import User
+from utils.cv_queue import enqueue_cv
+
+
+def _user(db, username, email=None):
+    user = User(username=username, email=email, role='employee', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _item(item_id, name, email, cv_filename=''):
+    return {
+        'item_id': item_id,
+        'metadata': {'cv_filename': cv_filename},
+        'personal_info': {'full_name': name, 'email': email},
+        'technical_skills': {'languages': ['Python']},
+    }
+
+
+def test_usernames_unique_within_the_batch(db):
+    assert User.generate_usernames(['Sara Ali', 'Sara Ali', 'sara ali', 'Omar']) == [
+        'sara_ali', 'sara_ali_1', 'sara_ali_2', 'omar'
+    ]
+
+
+def test_usernames_skip_existing_users(db):
+    _user(db, 'sara_ali')
+    _user(db, 'sara_ali_1')
+    _user(db, 'saraxali')  # matches the LIKE pattern 'sara_ali%' only
+
+    assert User.generate_usernames(['Sara Ali', 'Sara Ali', 'Sarax Ali']) == [
+        'sara_ali_2', 'sara_ali_3', 'sarax_ali'
+    ]
+
+
+def test_usernames_match_one_by_one_generation(db):
+    _user(db, 'omar')
+    _user(db, 'employee')
+    names = ['Omar', None, 'Omar', 'Lina B.', '', 'Omar']
+
+    batch = User.generate_usernames(names)
+
+    one_by_one = []
+    for name in names:
+        username = User.generate_username(name)
+        _user(db, username)
+        one_by_one.append(username)
+    assert batch == one_by_one
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def test_batch_with_collisions_and_finished_jobs(db, client):
+    existing = _user(db, 'sara_ali', 'taken@example.com')
+    waiting = enqueue_cv('a.pdf', 'a.pdf', '/nonexistent/a.pdf')
+    done = enqueue_cv('b.pdf', 'b.pdf', '/nonexistent/b.pdf')
+    failed = enqueue_cv('c.pdf', 'c.pdf', '/nonexistent/c.pdf')
+    waiting.status = 'sent'
+    done.status, done.employee_id = 'done', existing.id
+    failed.status = 'failed'
+    db.session.commit()
+
+    response = client.post('/manager/api/employee/create-batch', json={'items': [
+        _item(waiting.id, 'Sara Ali', 'sara@example.com', 'a.pdf'),
+        _item(done.id, 'Sara Ali', 'sara2@example.com', 'b.pdf'),
+        _item(failed.id, 'Omar', 'omar@example.com', 'c.pdf'),
+        _item('x1', 'Lina', 'taken@example.com'),
+        _item('x2', 'Lina', 'sara@example.com'),
+        _item('x3', 'No Email', ''),
+    ]})
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body['created'], body['failed']) == (3, 3)
+    results = {result['item_id']: result for result in body['results']}
+    assert [results[key]['success'] for key in (waiting.id, done.id, failed.id, 'x1', 'x2', 'x3')] == [
+        True, True, True, False, False, False
+    ]
+    assert 'already exists' in results['x1']['error']
+    assert 'twice' in results['x2']['error']
+
+    usernames = [results[key]['employee']['username'] for key in (waiting.id, done.id, failed.id)]
+    assert usernames == ['sara_ali_1', 'sara_ali_2', 'omar']
+
+    created = {user.username: user.id for user in User.query.filter(User.username.in_(usernames))}
+    db.session.expire_all()
+    # Only the job still waiting is completed; finished jobs keep their outcome
+    assert (waiting.status, waiting.employee_id) == ('done', created['sara_ali_1'])
+    assert (done.status, done.employee_id) == ('done', existing.id)
+    assert (failed.status, failed.employee_id) == ('failed', None)
+
+
+def test_batch_with_nothing_valid(db, client):
+    _user(db, 'lina', 'lina@example.com')
+
+    response = client.post('/manager/api/employee/create-batch', json={'items': [
+        _item(1, 'Lina', 'lina@example.com'), 'not an object'
+    ]})
+
+    assert response.status_code == 400
+    assert response.get_json()['created'] == 0
+    assert User.query.count() == 1
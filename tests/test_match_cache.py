@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+from utils.matching import _match_cache_key
+
+
+def _task(nom, skills=('Python',), priorite='Moyenne', duree=3):
+    return SimpleNamespace(
+        nom=nom, priorite=priorite, duree_estimee_jours=duree,
+        sous_taches=[{'nom': 'st', 'competences_requises': list(skills)}]
+    )
+
+
+def _employee(emp_id, skills):
+    return SimpleNamespace(id=emp_id, years_of_experience=2, get_canonical_skills=lambda: list(skills))
+
+
+ROSTER = [_employee(1, ['python']), _employee(2, ['react'])]
+
+
+def test_same_task_same_key():
+    assert _match_cache_key(_task('API'), ROSTER, {}) == _match_cache_key(_task('API'), ROSTER, {})
+
+
+def test_task_name_is_part_of_the_key():
+    # The prompts show the name, so the model's decision may depend on it
+    assert _match_cache_key(_task('API'), ROSTER, {}) != _match_cache_key(_task('Data export'), ROSTER, {})
+
+
+def test_roster_and_workload_are_part_of_the_key():
+    key = _match_cache_key(_task('API'), ROSTER, {})
+    assert key != _match_cache_key(_task('API'), ROSTER[:1], {})
+    assert key != _match_cache_key(_task('API'), ROSTER, {1: 1})
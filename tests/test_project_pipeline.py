@@ -0,0 +1,185 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import utils.project_pipeline as project_pipeline
+from models.callback_receipt import CallbackReceipt
+from models.project import Task
+from models.project_pipeline import ProjectPipeline
+from utils.project_pipeline import (
+    PIPELINE_MAX_ATTEMPTS, PipelineError, process_pending, receive_analysis, start_pipeline
+)
+
+ANALYSIS = {
+    'project_id': None,
+    'analysis_results': {
+        'nom_projet': 'Booking',
+        'resume': 'Hotel booking site',
+        'taches_techniques': [
+            {'id_tache': 'T1', 'nom': 'API', 'duree_estimee_jours': 3,
+             'sous_taches': [{'nom': 'Endpoints', 'competences_requises': ['Python']}]},
+            {'id_tache': 'T2', 'nom': 'UI', 'duree_estimee_jours': 4, 'dependances': ['T1']},
+        ],
+    },
+}
+
+
+@pytest.fixture
+def steps(monkeypatch):
+    """Stand-ins for the PDF reader, the n8n send and the matcher."""
+    calls = SimpleNamespace(extract=[], send=[], match=[], extract_result=None, send_hook=None)
+
+    def extract_pdf(path, sha256=None):
+        calls.extract.append(path)
+        if isinstance(calls.extract_result, Exception):
+            raise calls.extract_result
+        return calls.extract_result or {
+            'text': 'Specs text', 'truncated': False, 'pages_read': 1, 'page_count': 1, 'tiers': ['fast']
+        }
+
+    def post_json(url, payload, timeout=None):
+        calls.send.append(payload)
+        if calls.send_hook:
+            calls.send_hook()
+        return SimpleNamespace(status_code=200, text='')
+
+    def auto_match_tasks(project_id, mode='sequential'):
+        calls.match.append(project_id)
+        return []
+
+    monkeypatch.setattr(project_pipeline, 'extract_pdf', extract_pdf)
+    monkeypatch.setattr(project_pipeline, 'post_json', post_json)
+    monkeypatch.setattr(project_pipeline, 'auto_match_tasks', auto_match_tasks)
+    return calls
+
+
+@pytest.fixture
+def pipeline(db, project):
+    project.specs_path = '/specs/booking.pdf'
+    pipeline = start_pipeline(project, specs_hash='abc')
+    db.session.commit()
+    return pipeline
+
+
+def _receive(db, project, digest='d1'):
+    data = dict(ANALYSIS, project_id=project.id)
+    db.session.add(CallbackReceipt(project_id=project.id, payload_hash=digest))
+    receive_analysis(project, data, digest)
+    db.session.commit()
+
+
+def _states(pipeline):
+    return [entry['state'] for entry in pipeline.history]
+
+
+def test_happy_path(db, project, pipeline, steps):
+    assert process_pending(limit=1) == 1
+    assert pipeline.state == 'extracted'
+    assert pipeline.specs_text == 'Specs text'
+
+    process_pending(limit=1)
+    assert pipeline.state == 'sent'
+    assert steps.send[0]['texte'] == 'Specs text' and steps.send[0]['project_id'] == project.id
+
+    # Nothing runnable while waiting for n8n
+    assert process_pending() == 0
+
+    _receive(db, project)
+    assert pipeline.state == 'analyzed'
+
+    process_pending()
+    assert pipeline.state == 'matched'
+    assert _states(pipeline) == ['uploaded', 'extracted', 'sent', 'analyzed', 'matched']
+    assert pipeline.analysis is None
+    assert pipeline.result['tasks']['inserted'] == 2
+    assert sorted(t.task_id for t in Task.query.filter_by(project_id=project.id)) == ['T1', 'T2']
+    assert project.name == 'Booking'
+    assert steps.match == [project.id]
+    assert not pipeline.running
+
+
+def test_permanent_error_fails_at_once(db, pipeline, steps):
+    steps.extract_result = PipelineError('scanned PDF')
+
+    process_pending()
+
+    assert pipeline.state == 'failed'
+    assert pipeline.failed_step == 'uploaded'
+    assert pipeline.error == 'scanned PDF'
+    assert len(steps.extract) == 1
+
+
+def test_transient_error_retries_then_fails(db, pipeline, steps):
+    steps.extract_result = OSError('disk hiccup')
+
+    for attempt in range(1, PIPELINE_MAX_ATTEMPTS):
+        process_pending()
+        assert pipeline.state == 'uploaded'
+        assert pipeline.attempts == attempt
+        assert pipeline.next_attempt_at > datetime.utcnow()
+        assert process_pending() == 0  # backing off
+        pipeline.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+    process_pending()
+    assert pipeline.state == 'failed'
+    assert len(steps.extract) == PIPELINE_MAX_ATTEMPTS
+
+
+def test_failed_apply_drops_the_receipt(db, project, pipeline, steps, monkeypatch):
+    process_pending()
+    _receive(db, project)
+
+    def broken_sync(project_id, taches):
+        raise PipelineError('bad payload')
+    monkeypatch.setattr(project_pipeline, 'sync_project_tasks', broken_sync)
+    process_pending()
+
+    assert pipeline.state == 'failed' and pipeline.failed_step == 'analyzed'
+    assert CallbackReceipt.query.filter_by(project_id=project.id, payload_hash='d1').count() == 0
+
+
+def test_stale_step_is_discarded_after_a_newer_callback(db, project, pipeline, steps):
+    process_pending(limit=1)
+    assert pipeline.state == 'extracted'
+
+    # n8n answers before the send step has recorded 'sent'
+    steps.send_hook = lambda: _receive(db, project)
+    process_pending(limit=1)
+
+    assert pipeline.state == 'analyzed'
+    assert 'sent' not in _states(pipeline)
+    assert pipeline.analysis is not None
+    assert not pipeline.running
+
+    process_pending()
+    assert pipeline.state == 'matched'
+    assert Task.query.filter_by(project_id=project.id).count() == 2
+
+
+def test_claim_skips_a_running_row(db, pipeline, steps):
+    ProjectPipeline.query.update({'running': True})
+    db.session.commit()
+
+    assert process_pending() == 0
+    assert steps.extract == []
+
+
+@pytest.mark.parametrize('endpoint', ['/manager/api/project/callback', '/manager/api/project/update'])
+def test_callback_answer_keeps_the_workflow_contract(app, db, project, pipeline, endpoint):
+    client = app.test_client()
+    data = dict(ANALYSIS, project_id=project.id)
+
+    response = client.post(endpoint, json=data)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success'] is True
+    assert (body['matched'], body['matches']) == (0, [])
+    assert pipeline.state == 'analyzed'
+
+    # n8n retrying the same payload gets the same answer
+    retry = client.post(endpoint, json=data)
+    assert retry.status_code == 200
+    assert dict(retry.get_json(), duplicate=None) == dict(body, duplicate=None)
+    assert CallbackReceipt.query.one().hits == 1
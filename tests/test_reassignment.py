@@ -0,0 +1,137 @@
+import random
+
+import pytest
+
+from models.project import Task, TaskCollaborator
+from models.user import User
+from utils.matching import reassign_after_completion
+
+SKILLS = ['Python', 'React', 'Docker', 'Figma', 'Kubernetes', 'TypeScript']
+
+
+def _one_by_one(employee_ids, project_id):
+    """
+    The per-employee rules auto_reassign_employee() applied before batching,
+    run for each freed employee in turn. Returns [(employee_id, task_id)].
+    """
+    results = []
+    for emp_id in dict.fromkeys(employee_ids):
+        employee = TaskCollaborator.query.session.get(User, emp_id)
+        tasks = Task.query.filter_by(project_id=project_id).order_by(Task.id).all()
+        helping = {c.task_id for c in TaskCollaborator.query.filter_by(employee_id=emp_id)}
+        if any(t.assigned_employee_id == emp_id and t.status != 'completed' for t in tasks):
+            continue
+        if any(t.id in helping and t.status != 'completed' for t in tasks):
+            continue
+
+        skills = set(employee.get_canonical_skills())
+        best = None
+        for task in tasks:
+            if task.status == 'completed' or task.assigned_employee_id in (None, emp_id) or task.id in helping:
+                continue
+            required = set(task.get_canonical_skills())
+            skill_score = len(required & skills) / len(required) * 100 if required else 30
+            score = skill_score + (20 if task.status == 'in_progress' else 0)
+            score += {'Haute': 15, 'Moyenne': 5}.get(task.priorite, 0)
+            if best is None or round(score, 1) > best[0]:
+                best = (round(score, 1), task)
+        if best is None or best[0] < 15:
+            continue
+        results.append((emp_id, best[1].task_id))
+        # Committed before the next employee in the old flow
+        TaskCollaborator.query.session.add(TaskCollaborator(task_id=best[1].id, employee_id=emp_id, role='auto-reassigned'))
+        TaskCollaborator.query.session.flush()
+    return results
+
+
+def _seed(db, project, rng):
+    employees = [
+        User(username=f'dev{i}', role='employee', status='active', password_hash='x',
+             technical_skills={'main': rng.sample(SKILLS, rng.randint(0, 3))})
+        for i in range(7)
+    ]
+    db.session.add_all(employees)
+    db.session.flush()
+    tasks = []
+    for i in range(8):
+        required = rng.sample(SKILLS, rng.randint(0, 2))
+        task = Task(
+            project_id=project.id, task_id=f'T{i + 1}', nom=f'Task {i + 1}',
+            # Rare bonuses, so that skills decide most reassignments
+            priorite='Haute' if rng.random() < 0.1 else rng.choice(['Moyenne', 'Basse', None]),
+            status='in_progress' if rng.random() < 0.1 else rng.choice(['not started', 'completed']),
+            assigned_employee_id=rng.choice([None] + [e.id for e in employees]),
+            sous_taches=[{'nom': 'st', 'competences_requises': required}]
+        )
+        tasks.append(task)
+    # The task being completed: a primary and two helpers, all free once it is done
+    finishing = tasks[0]
+    finishing.status = 'in_progress'
+    finishing.assigned_employee_id = employees[0].id
+    for task in tasks[1:]:
+        if task.assigned_employee_id in (employees[0].id, employees[1].id, employees[2].id):
+            task.assigned_employee_id = employees[3].id
+    db.session.add_all(tasks)
+    db.session.flush()
+    for emp in employees[1:3]:
+        db.session.add(TaskCollaborator(task_id=finishing.id, employee_id=emp.id, role='helper'))
+    # Someone else helping elsewhere stays put
+    db.session.add(TaskCollaborator(task_id=tasks[rng.randint(1, 7)].id, employee_id=employees[4].id, role='helper'))
+    db.session.commit()
+    return finishing, employees
+
+
+@pytest.mark.parametrize('seed', range(25))
+def test_batch_matches_one_by_one(db, project, seed):
+    finishing, employees = _seed(db, project, random.Random(seed))
+    finishing.status = 'completed'
+    db.session.commit()
+    freed = [finishing.assigned_employee_id] + [c.employee_id for c in finishing.collaborators]
+
+    expected = _one_by_one(freed, project.id)
+    db.session.rollback()
+
+    results = reassign_after_completion(finishing)
+
+    assert [(r['employee_id'], r['task_id']) for r in results] == expected
+    new_rows = TaskCollaborator.query.filter_by(role='auto-reassigned').all()
+    assert len(new_rows) == len({row.employee_id for row in new_rows}) == len(results)
+    for result in results:
+        assert result['score'] >= 15
+
+
+def test_completion_frees_every_assignee(db, project):
+    python_dev, react_dev, docker_dev, busy = [
+        User(username=name, role='employee', status='active', password_hash='x', technical_skills={'main': skills})
+        for name, skills in [('py', ['Python']), ('react', ['React']), ('ops', ['Docker']), ('busy', ['Python'])]
+    ]
+    db.session.add_all([python_dev, react_dev, docker_dev, busy])
+    db.session.flush()
+
+    def task(task_id, status, assignee, skills, priorite='Moyenne'):
+        return Task(project_id=project.id, task_id=task_id, nom=task_id, status=status, priorite=priorite,
+                    assigned_employee_id=assignee.id if assignee else None,
+                    sous_taches=[{'nom': 'st', 'competences_requises': skills}])
+
+    done = task('T1', 'in_progress', python_dev, ['Python'])
+    api = task('T2', 'not started', busy, ['Python'], 'Basse')
+    ui = task('T3', 'not started', busy, ['React'], 'Basse')
+    unassigned = task('T4', 'in_progress', None, ['Docker'], 'Haute')
+    own = task('T5', 'not started', react_dev, ['React'])
+    db.session.add_all([done, api, ui, unassigned, own])
+    db.session.flush()
+    for helper in (react_dev, docker_dev):
+        db.session.add(TaskCollaborator(task_id=done.id, employee_id=helper.id, role='helper'))
+    done.status = 'completed'
+    db.session.commit()
+
+    results = reassign_after_completion(done)
+
+    # react_dev still owns T5; no skills fit docker_dev (T4 has no primary to help)
+    assert [(r['employee_id'], r['task_id']) for r in results] == [(python_dev.id, 'T2')]
+    assert {(c.task_id, c.employee_id) for c in TaskCollaborator.query.filter_by(role='auto-reassigned')} == {
+        (api.id, python_dev.id)
+    }
+
+    # Nothing new on a second call: python_dev now helps on an open task
+    assert reassign_after_completion(done) == []
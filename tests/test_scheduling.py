@@ -0,0 +1,83 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from utils.scheduling import ProjectSchedule
+
+STATUSES = ('not started', 'in_progress', 'completed')
+
+
+def _task(task_id, duration, status, dependances):
+    return SimpleNamespace(task_id=task_id, duree_estimee_jours=duration, status=status, dependances=dependances)
+
+
+def _snapshot(schedule):
+    data = schedule.to_dict()
+    return dict(
+        data,
+        # Incremental edits keep *a* valid topological order, not necessarily the one a full pass picks
+        order=sorted(data['order']),
+        ready=sorted(data['ready']),
+        status_counts={status: n for status, n in data['status_counts'].items() if n},
+    )
+
+
+def _assert_topological(schedule):
+    if schedule.cyclic:
+        return
+    position = {task_id: i for i, task_id in enumerate(schedule.order)}
+    for task_id, deps in schedule.deps.items():
+        assert all(position[dep] < position[task_id] for dep in deps)
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_incremental_edits_match_full_compute(seed):
+    rng = random.Random(seed)
+    tasks = {}
+    for i in range(1, 16):
+        deps = rng.sample([f'T{j}' for j in range(1, i)], min(i - 1, rng.randint(0, 3)))
+        tasks[f'T{i}'] = _task(f'T{i}', rng.randint(0, 8), rng.choice(STATUSES), deps)
+    schedule = ProjectSchedule(tasks.values())
+
+    for _ in range(40):
+        action = rng.random()
+        task_id = rng.choice(list(tasks)) if tasks else None
+        if action < 0.15 or task_id is None:
+            new_id = f'T{rng.randint(16, 40)}'
+            task = _task(new_id, rng.randint(0, 8), rng.choice(STATUSES), rng.sample(list(tasks), min(len(tasks), 2)))
+            tasks[new_id] = task
+            schedule.update_task(new_id, task.duree_estimee_jours, task.status, task.dependances)
+        elif action < 0.3:
+            del tasks[task_id]
+            schedule.remove_task(task_id)
+        elif action < 0.5:
+            # Usually an earlier task; sometimes a later one, which may close a cycle
+            deps = rng.sample(list(tasks), min(len(tasks), rng.randint(0, 2)))
+            tasks[task_id].dependances = deps
+            schedule.update_task(task_id, dependances=deps)
+        else:
+            tasks[task_id].duree_estimee_jours = rng.randint(0, 8)
+            tasks[task_id].status = rng.choice(STATUSES)
+            schedule.update_task(task_id, tasks[task_id].duree_estimee_jours, tasks[task_id].status)
+
+        _assert_topological(schedule)
+        assert _snapshot(schedule) == _snapshot(ProjectSchedule(tasks.values()))
+
+
+def test_remove_task_shortens_the_chain():
+    schedule = ProjectSchedule([
+        _task('T1', 3, 'completed', []),
+        _task('T2', 5, 'not started', ['T1']),
+        _task('T3', 2, 'not started', ['T2']),
+    ])
+    assert schedule.project_duration == 10
+    assert schedule.critical_path == ['T1', 'T2', 'T3']
+
+    schedule.remove_task('T2')
+
+    assert schedule.project_duration == 3
+    assert schedule.earliest_start['T3'] == 0
+    assert schedule.critical_path == ['T1']
+    assert schedule.ready_tasks() == ['T3']
+    assert schedule.total_days == 5
@@ -0,0 +1,115 @@
+from sqlalchemy import func
+
+from models.project import Project, Task
+from models.user import User
+from utils.task_counters import PROJECT_COUNTERS, refresh_task_counters
+
+
+def _counters(project):
+    return {column: getattr(project, column) for column in PROJECT_COUNTERS}
+
+
+def _expected(project):
+    """The same counters counted from the tasks table."""
+    tasks = Task.query.filter_by(project_id=project.id).all()
+    return {
+        'task_count': len(tasks),
+        'tasks_in_progress': sum(t.status == 'in_progress' for t in tasks),
+        'tasks_completed': sum(t.status == 'completed' for t in tasks),
+        'tasks_assigned': sum(t.assigned_employee_id is not None for t in tasks),
+        'estimated_days': sum(t.duree_estimee_jours or 0 for t in tasks),
+    }
+
+
+def _add_tasks(db, project, *durations):
+    tasks = [
+        Task(project_id=project.id, task_id=f'T{i}', nom=f'Task {i}', duree_estimee_jours=days)
+        for i, days in enumerate(durations, start=1)
+    ]
+    db.session.add_all(tasks)
+    db.session.commit()
+    return tasks
+
+
+def test_insert(db, project):
+    _add_tasks(db, project, 3, 5, None)
+
+    assert _counters(project) == {
+        'task_count': 3, 'tasks_in_progress': 0, 'tasks_completed': 0, 'tasks_assigned': 0, 'estimated_days': 8
+    }
+    db.session.expire_all()
+    assert _counters(db.session.get(Project, project.id)) == _expected(project)
+
+
+def test_status_change(db, project, employees):
+    t1, t2, t3 = _add_tasks(db, project, 3, 5, 2)
+    for task in (t1, t2, t3):
+        task.assigned_employee_id = employees[0].id
+    db.session.commit()
+    assert employees[0].open_task_count == 3
+
+    t1.status = 'in_progress'
+    t2.status = 'completed'
+    db.session.commit()
+
+    assert (project.tasks_in_progress, project.tasks_completed) == (1, 1)
+    assert employees[0].open_task_count == 2
+    assert _counters(project) == _expected(project)
+
+
+def test_reassign(db, project, employees):
+    t1, t2 = _add_tasks(db, project, 3, 5)
+    t1.assigned_employee_id = employees[0].id
+    t2.assigned_employee_id = employees[0].id
+    db.session.commit()
+
+    t1.assigned_employee_id = employees[1].id
+    t2.assigned_employee_id = None
+    db.session.commit()
+
+    assert project.tasks_assigned == 1
+    assert [e.open_task_count for e in employees] == [0, 1, 0]
+
+
+def test_delete(db, project, employees):
+    t1, t2 = _add_tasks(db, project, 3, 5)
+    t1.assigned_employee_id = employees[0].id
+    db.session.commit()
+
+    db.session.delete(t1)
+    db.session.commit()
+
+    assert _counters(project) == {
+        'task_count': 1, 'tasks_in_progress': 0, 'tasks_completed': 0, 'tasks_assigned': 0, 'estimated_days': 5
+    }
+    assert employees[0].open_task_count == 0
+
+
+def test_completing_the_project_frees_its_assignees(db, project, employees):
+    t1, = _add_tasks(db, project, 3)
+    t1.assigned_employee_id = employees[0].id
+    db.session.commit()
+    assert employees[0].open_task_count == 1
+
+    project.status = 'completed'
+    db.session.commit()
+    assert employees[0].open_task_count == 0
+
+    project.status = 'in_progress'
+    db.session.commit()
+    assert employees[0].open_task_count == 1
+
+
+def test_refresh_after_bulk_statement(db, project, employees):
+    _add_tasks(db, project, 3, 5)
+    db.session.execute(
+        Task.__table__.update()
+        .where(Task.project_id == project.id)
+        .values(assigned_employee_id=employees[2].id, status='in_progress')
+    )
+    refresh_task_counters([project.id], [employees[2].id])
+    db.session.commit()
+
+    assert (project.tasks_assigned, project.tasks_in_progress) == (2, 2)
+    assert employees[2].open_task_count == 2
+    assert db.session.query(func.sum(User.open_task_count)).scalar() == 2
@@ -0,0 +1,80 @@
+import pytest
+
+import utils.task_sync as task_sync
+from models.project import Task
+from utils.task_sync import sync_project_tasks
+
+PAYLOAD = [
+    {'id_tache': 'T1', 'nom': 'API', 'priorite': 'Haute', 'duree_estimee_jours': 3,
+     'sous_taches': [{'nom': 'Endpoints', 'competences_requises': ['Python', 'Flask']}]},
+    {'id_tache': 'T2', 'nom': 'UI', 'priorite': 'Moyenne', 'duree_estimee_jours': 5, 'dependances': ['T1'],
+     'sous_taches': [{'nom': 'Screens', 'competences_requises': ['React']}]},
+    {'id_tache': 'T3', 'nom': 'Deploy', 'duree_estimee_jours': 1, 'dependances': ['T1', 'T2']},
+]
+
+
+@pytest.fixture(params=['on_conflict', 'portable'])
+def upsert_path(request, monkeypatch):
+    if request.param == 'portable':
+        monkeypatch.setattr(task_sync, '_dialect_insert', lambda: None)
+    return request.param
+
+
+def test_identical_payload_is_unchanged(db, project, upsert_path):
+    first = sync_project_tasks(project.id, PAYLOAD)
+    db.session.commit()
+    assert first == {'inserted': 3, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'unassigned': 0}
+
+    second = sync_project_tasks(project.id, PAYLOAD)
+    db.session.commit()
+    assert second == {'inserted': 0, 'updated': 0, 'unchanged': 3, 'deleted': 0, 'unassigned': 0}
+    assert Task.query.filter_by(project_id=project.id).count() == 3
+
+
+def test_diff_against_existing_tasks(db, project, employees, upsert_path):
+    sync_project_tasks(project.id, PAYLOAD)
+    db.session.commit()
+    for task in Task.query.filter_by(project_id=project.id):
+        task.assigned_employee_id = employees[0].id
+    db.session.commit()
+
+    payload = [
+        dict(PAYLOAD[0], nom='REST API'),  # same skills: stays assigned
+        dict(PAYLOAD[1], sous_taches=[{'nom': 'Screens', 'competences_requises': ['Vue']}]),  # re-scoped
+        {'id_tache': 'T4', 'nom': 'Docs'},
+    ]
+    counts = sync_project_tasks(project.id, payload)
+    db.session.commit()
+
+    assert counts == {'inserted': 1, 'updated': 2, 'unchanged': 0, 'deleted': 1, 'unassigned': 1}
+    tasks = {task.task_id: task for task in Task.query.filter_by(project_id=project.id)}
+    assert sorted(tasks) == ['T1', 'T2', 'T4']
+    assert tasks['T1'].nom == 'REST API'
+    assert tasks['T1'].assigned_employee_id == employees[0].id
+    assert tasks['T2'].assigned_employee_id is None
+    assert (project.task_count, project.tasks_assigned) == (3, 1)
+    assert employees[0].open_task_count == 1
+
+
+def test_rescoped_task_starts_over(db, project, employees, upsert_path):
+    sync_project_tasks(project.id, PAYLOAD)
+    db.session.commit()
+    tasks = {task.task_id: task for task in Task.query.filter_by(project_id=project.id)}
+    tasks['T1'].assigned_employee_id = employees[0].id
+    tasks['T1'].status = 'completed'
+    tasks['T2'].assigned_employee_id = employees[1].id
+    tasks['T2'].status = 'in_progress'
+    db.session.commit()
+
+    payload = [
+        dict(PAYLOAD[0], sous_taches=[{'nom': 'Endpoints', 'competences_requises': ['Go']}]),  # re-scoped
+        dict(PAYLOAD[1], nom='Screens'),  # same skills
+        PAYLOAD[2],
+    ]
+    counts = sync_project_tasks(project.id, payload)
+    db.session.commit()
+
+    assert counts['unassigned'] == 1
+    assert (tasks['T1'].assigned_employee_id, tasks['T1'].status) == (None, 'not started')
+    assert (tasks['T2'].assigned_employee_id, tasks['T2'].status) == (employees[1].id, 'in_progress')
+    assert (project.tasks_completed, project.tasks_in_progress, project.tasks_assigned) == (0, 1, 1)
@@ -0,0 +1,122 @@
+"""
+Min-cost flow solver for the 'optimal' matching mode.
+Tasks and employees form a bipartite graph: each task asks for a number
+of slots, each employee offers a number of slots (remaining capacity),
+and every candidate (task, employee) edge has an integer cost. The solver
+fills as many slots as possible at the lowest total cost, in one global
+pass, using successive shortest paths with Dijkstra + node potentials.
+"""
+
+import heapq
+
+
+class _FlowGraph:
+    def __init__(self, size):
+        self.adj = [[] for _ in range(size)]
+        # edge = [to, capacity, cost, index of reverse edge in adj[to]]
+
+    def add_edge(self, u, v, capacity, cost):
+        self.adj[u].append([v, capacity, cost, len(self.adj[v])])
+        self.adj[v].append([u, 0, -cost, len(self.adj[u]) - 1])
+
+    def min_cost_flow(self, source, sink):
+        """Push as much flow as possible from source to sink at minimum cost."""
+        size = len(self.adj)
+        potential = [0] * size  # all initial costs are >= 0
+        total_flow = total_cost = 0
+
+        while True:
+            dist = [None] * size
+            prev = [None] * size  # (node, edge index)
+            dist[source] = 0
+            done = [False] * size
+            heap = [(0, source)]
+
+            while heap:
+                d, u = heapq.heappop(heap)
+                if done[u]:
+                    continue
+                done[u] = True
+                if u == sink:
+                    break  # potentials below stay valid for unsettled nodes
+                for i, (v, cap, cost, _) in enumerate(self.adj[u]):
+                    if cap <= 0 or done[v]:
+                        continue
+                    nd = d + cost + potential[u] - potential[v]
+                    if dist[v] is None or nd < dist[v]:
+                        dist[v] = nd
+                        prev[v] = (u, i)
+                        heapq.heappush(heap, (nd, v))
+
+            if not done[sink]:
+                break
+
+            sink_dist = dist[sink]
+            for node in range(size):
+                if done[node]:
+                    potential[node] += dist[node]
+                else:
+                    potential[node] += sink_dist
+
+            # Bottleneck along the path, then augment
+            push = None
+            node = sink
+            while node != source:
+                u, i = prev[node]
+                cap = self.adj[u][i][1]
+                push = cap if push is None else min(push, cap)
+                node = u
+
+            node = sink
+            while node != source:
+                u, i = prev[node]
+                edge = self.adj[u][i]
+                edge[1] -= push
+                self.adj[node][edge[3]][1] += push
+                total_cost += push * edge[2]
+                node = u
+            total_flow += push
+
+        return total_flow, total_cost
+
+
+def solve_assignment(candidates, demand, capacity):
+    """
+    candidates: {task_key: [(employee_id, cost), ...]} — integer costs >= 0
+    demand:     {task_key: number of employees wanted}
+    capacity:   {employee_id: number of tasks they can still take}
+    Returns {task_key: [employee_id, ...]} (cheapest first), filling as
+    many slots as possible and, among those solutions, minimizing cost.
+    """
+    task_keys = [key for key in candidates if demand.get(key, 0) > 0]
+    employee_ids = sorted({
+        emp_id for key in task_keys for emp_id, _ in candidates[key]
+        if capacity.get(emp_id, 0) > 0
+    })
+
+    task_node = {key: 1 + i for i, key in enumerate(task_keys)}
+    emp_node = {emp_id: 1 + len(task_keys) + i for i, emp_id in enumerate(employee_ids)}
+    source, sink = 0, 1 + len(task_keys) + len(employee_ids)
+
+    graph = _FlowGraph(sink + 1)
+    for key in task_keys:
+        graph.add_edge(source, task_node[key], demand[key], 0)
+        for emp_id, cost in candidates[key]:
+            if emp_id in emp_node:
+                graph.add_edge(task_node[key], emp_node[emp_id], 1, cost)
+    for emp_id in employee_ids:
+        graph.add_edge(emp_node[emp_id], sink, capacity[emp_id], 0)
+
+    graph.min_cost_flow(source, sink)
+
+    node_to_emp = {node: emp_id for emp_id, node in emp_node.items()}
+    assignment = {}
+    for key in task_keys:
+        chosen = [
+            (cost, node_to_emp[v])
+            for v, cap, cost, _ in graph.adj[task_node[key]]
+            if v in node_to_emp and cap == 0 and cost >= 0
+        ]
+        if chosen:
+            assignment[key] = [emp_id for _, emp_id in sorted(chosen)]
+    return assignment
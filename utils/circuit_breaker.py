@@ -0,0 +1,176 @@
+"""
+Circuit breakers and health ranking for the n8n webhook endpoints.
+
+Every endpoint (primary + N8N_BACKUP_URLS) has a breaker:
+- closed: used normally; BREAKER_FAILURE_THRESHOLD consecutive failures open it
+- open: skipped for BREAKER_COOLDOWN_SECONDS; a background thread probes it
+  with a GET and closes it again on a 2xx / 405 answer (a GET cannot prove
+  more: n8n also answers 404 for a POST-only webhook that is registered)
+- half-open: after the cooldown, one real request is let through as a trial;
+  success closes the breaker, failure re-opens it
+
+Usable endpoints are tried fastest / healthiest first (recent consecutive
+failures, then EWMA latency, then configured order), so a dead ngrok tunnel stops
+costing a timeout on every call. State is per process.
+"""
+
+import os
+import time
+import threading
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 3))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv('BREAKER_COOLDOWN_SECONDS', 30))
+BREAKER_PROBE_INTERVAL = float(os.getenv('BREAKER_PROBE_INTERVAL', 15))
+BREAKER_PROBE_TIMEOUT = float(os.getenv('BREAKER_PROBE_TIMEOUT', 5))
+LATENCY_EWMA_ALPHA = 0.3
+
+
+class EndpointState:
+    def __init__(self, url):
+        self.url = url
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.last_failure_at = None
+        self.trial_in_flight = False
+        self.latency = None  # EWMA, seconds
+        self.successes = 0
+        self.failures = 0
+        self.last_error = None
+
+    def to_dict(self):
+        return {
+            'url': self.url,
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'latency_ms': round(self.latency * 1000) if self.latency is not None else None,
+            'successes': self.successes,
+            'failures': self.failures,
+            'last_error': self.last_error,
+        }
+
+
+class EndpointHealth:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}  # url -> EndpointState
+        self._prober = None
+
+    def _get(self, url):
+        endpoint = self._endpoints.get(url)
+        if endpoint is None:
+            endpoint = self._endpoints[url] = EndpointState(url)
+        return endpoint
+
+    def ranked(self, urls):
+        """
+        The endpoints to try, best first. Open breakers are skipped; one whose
+        cooldown is over is let through once as a half-open trial.
+        """
+        now = time.monotonic()
+        usable = []
+        with self._lock:
+            for position, url in enumerate(dict.fromkeys(u for u in urls if u)):
+                endpoint = self._get(url)
+                if endpoint.state != 'closed':
+                    cooled_down = endpoint.opened_at is not None and now - endpoint.opened_at >= BREAKER_COOLDOWN_SECONDS
+                    if endpoint.trial_in_flight or not cooled_down:
+                        continue
+                    endpoint.state = 'half_open'
+                    endpoint.trial_in_flight = True
+                # Recent failures rank an endpoint down; after a cooldown it gets another chance
+                recent = endpoint.last_failure_at is not None and now - endpoint.last_failure_at < BREAKER_COOLDOWN_SECONDS
+                penalty = endpoint.consecutive_failures if recent else 0
+                usable.append((penalty, endpoint.latency or 0, position, url))
+        return [url for *_, url in sorted(usable)]
+
+    def release(self, url):
+        """Give back a half-open trial slot handed out by ranked() but not used."""
+        with self._lock:
+            endpoint = self._endpoints.get(url)
+            if endpoint and endpoint.state == 'half_open' and endpoint.trial_in_flight:
+                endpoint.state = 'open'
+                endpoint.trial_in_flight = False
+
+    def record_success(self, url, latency):
+        with self._lock:
+            endpoint = self._get(url)
+            endpoint.successes += 1
+            endpoint.consecutive_failures = 0
+            endpoint.latency = latency if endpoint.latency is None else (
+                LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * endpoint.latency
+            )
+            if endpoint.state != 'closed':
+                print(f"✅ Circuit closed for {url}")
+            endpoint.state = 'closed'
+            endpoint.opened_at = None
+            endpoint.trial_in_flight = False
+
+    def record_failure(self, url, error):
+        with self._lock:
+            endpoint = self._get(url)
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            endpoint.last_error = str(error)[:300]
+            endpoint.last_failure_at = time.monotonic()
+            endpoint.trial_in_flight = False
+            if endpoint.state == 'half_open' or endpoint.consecutive_failures >= BREAKER_FAILURE_THRESHOLD:
+                if endpoint.state != 'open':
+                    print(f"⚠️ Circuit opened for {url} after {endpoint.consecutive_failures} failure(s): {endpoint.last_error}")
+                endpoint.state = 'open'
+                endpoint.opened_at = time.monotonic()
+                self._start_prober()
+
+    def snapshot(self):
+        with self._lock:
+            return [endpoint.to_dict() for endpoint in self._endpoints.values()]
+
+    # ── Background probes ──
+
+    def _start_prober(self):
+        """Called with the lock held."""
+        if self._prober is None or not self._prober.is_alive():
+            self._prober = threading.Thread(target=self._probe_loop, name='webhook-prober', daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self):
+        while True:
+            time.sleep(BREAKER_PROBE_INTERVAL)
+            now = time.monotonic()
+            with self._lock:
+                due = [
+                    e.url for e in self._endpoints.values()
+                    if e.state == 'open' and not e.trial_in_flight
+                    and now - e.opened_at >= BREAKER_COOLDOWN_SECONDS
+                ]
+                if not any(e.state != 'closed' for e in self._endpoints.values()):
+                    self._prober = None
+                    return
+            for url in due:
+                self._probe(url)
+
+    def _probe(self, url):
+        """
+        Cheap GET check. Only 2xx, or 405 (method not allowed on a POST
+        webhook), closes the breaker: a 404 "webhook not registered" or an
+        ngrok error page keeps it open, and the half-open trial (a real POST)
+        decides once the cooldown is over.
+        """
+        from utils.webhook_client import get_session
+        started = time.monotonic()
+        try:
+            response = get_session().get(url, timeout=BREAKER_PROBE_TIMEOUT)
+            healthy = 200 <= response.status_code < 300 or response.status_code == 405
+            if healthy and 'ngrok-error-code' not in response.headers:
+                self.record_success(url, time.monotonic() - started)
+                return
+            error = f"probe HTTP {response.status_code}"
+        except Exception as e:
+            error = f"probe: {e}"
+        with self._lock:
+            endpoint = self._get(url)
+            endpoint.last_error = error
+            endpoint.opened_at = time.monotonic()  # stay open for another cooldown
+
+
+endpoint_health = EndpointHealth()
@@ -0,0 +1,352 @@
+"""
+Durable background queue for CV submissions.
+add_employee only saves the files and inserts one CVJob row per CV; worker
+threads then extract the text and POST it to n8n (primary + backup URLs),
+retrying with backoff. Jobs live in the database, so a restart picks up
+where it left off: rows stuck in 'extracting' / 'sending' for longer than
+CV_JOB_STALE_MINUTES are put back in the queue.
+
+Several processes (e.g. the debug reloader) may run workers at once —
+a job is claimed with a conditional UPDATE, so only one of them wins.
+
+When N8N_CV_BATCH_WEBHOOK_URL is set, every CV of a claimed batch goes to
+n8n in a single POST ({'items': [{'item_id': <job id>, ...}]}) and n8n
+answers on /manager/api/employee/create-batch.
+"""
+
+import os
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db
+from models.cv_job import CVJob
+from utils.pdf_extraction import extract_texts
+from utils.webhook_client import post_with_failover
+
+CV_QUEUE_WORKERS = int(os.getenv('CV_QUEUE_WORKERS', 2))
+CV_QUEUE_POLL_SECONDS = float(os.getenv('CV_QUEUE_POLL_SECONDS', 5))
+CV_QUEUE_BATCH_SIZE = int(os.getenv('CV_QUEUE_BATCH_SIZE', 4))  # CVs extracted together per claim
+CV_JOB_MAX_ATTEMPTS = int(os.getenv('CV_JOB_MAX_ATTEMPTS', 3))
+CV_JOB_RETRY_SECONDS = int(os.getenv('CV_JOB_RETRY_SECONDS', 30))  # doubled after each failed attempt
+CV_JOB_STALE_MINUTES = int(os.getenv('CV_JOB_STALE_MINUTES', 10))
+
+_wakeup = threading.Event()
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def enqueue_cv(original_filename, stored_filename, cv_path, created_by=None, content_hash=None):
+    """Add a saved CV to the queue. The caller commits, then calls notify_workers()."""
+    job = CVJob(
+        original_filename=original_filename,
+        stored_filename=stored_filename,
+        cv_path=cv_path,
+        content_hash=content_hash,
+        created_by=created_by,
+        status='queued'
+    )
+    db.session.add(job)
+    return job
+
+
+def notify_workers():
+    """Wake idle workers instead of waiting for the next poll."""
+    _wakeup.set()
+
+
+def mark_cv_done(stored_filename, employee_id):
+    """
+    Called by the n8n callback once the employee exists. Returns None when no
+    job for the file is waiting: a late or duplicate callback never reopens a
+    'failed' job nor re-points a 'done' one. The caller commits.
+    """
+    # Re-uploads of the same content share a stored file: take the oldest job still waiting
+    job = (
+        CVJob.query
+        .filter_by(stored_filename=stored_filename, status='sent')
+        .order_by(CVJob.id)
+        .first()
+    ) or (
+        # n8n may answer before the worker has recorded 'sent'
+        CVJob.query
+        .filter(CVJob.stored_filename == stored_filename, CVJob.status.in_(CVJob.ACTIVE_STATUSES))
+        .order_by(CVJob.id)
+        .first()
+    )
+    if job:
+        job.status = 'done'
+        job.employee_id = employee_id
+        job.finished_at = datetime.utcnow()
+    return job
+
+
+def mark_cv_jobs_done(employee_by_job_id, employee_by_filename=None):
+    """
+    Batch form of mark_cv_done: {job id: employee id}, plus {stored filename:
+    employee id} for callbacks whose item ids are not job ids. One query per
+    mapping. The caller commits.
+    """
+    now = datetime.utcnow()
+    job_ids = {int(i) for i in employee_by_job_id if str(i).isdigit()}
+    # Same rule as mark_cv_done: 'done' / 'failed' jobs are never touched again
+    jobs = CVJob.query.filter(
+        CVJob.id.in_(job_ids), CVJob.status.in_(('sent',) + CVJob.ACTIVE_STATUSES)
+    ).all() if job_ids else []
+    for job in jobs:
+        job.status = 'done'
+        job.employee_id = employee_by_job_id.get(job.id, employee_by_job_id.get(str(job.id)))
+        job.finished_at = now
+
+    matched = {job.employee_id for job in jobs}
+    remaining = {
+        filename: employee_id for filename, employee_id in (employee_by_filename or {}).items()
+        if employee_id not in matched
+    }
+    if remaining:
+        waiting = (
+            CVJob.query
+            .filter(CVJob.stored_filename.in_(list(remaining)), CVJob.status == 'sent')
+            .order_by(CVJob.id)
+            .all()
+        )
+        for job in waiting:
+            if job.stored_filename in remaining:
+                job.status = 'done'
+                job.employee_id = remaining.pop(job.stored_filename)
+                job.finished_at = now
+                jobs.append(job)
+    return jobs
+
+
+def requeue_stale_jobs():
+    """Put jobs left half-done by a crashed / restarted worker back in the queue."""
+    cutoff = datetime.utcnow() - timedelta(minutes=CV_JOB_STALE_MINUTES)
+    count = (
+        CVJob.query
+        .filter(CVJob.status.in_(('extracting', 'sending')), CVJob.updated_at < cutoff)
+        .update({'status': 'queued', 'next_attempt_at': datetime.utcnow()}, synchronize_session=False)
+    )
+    db.session.commit()
+    if count:
+        print(f"♻️ Re-queued {count} stale CV job(s)")
+    return count
+
+
+def _claim_jobs(limit):
+    """Atomically move up to `limit` due jobs from 'queued' to 'extracting'."""
+    now = datetime.utcnow()
+    candidates = (
+        db.session.query(CVJob.id)
+        .filter(CVJob.status == 'queued', CVJob.next_attempt_at <= now)
+        .order_by(CVJob.id)
+        .limit(limit * 2)
+        .all()
+    )
+    claimed_ids = []
+    for (job_id,) in candidates:
+        claimed = (
+            CVJob.query
+            .filter(CVJob.id == job_id, CVJob.status == 'queued')
+            .update({'status': 'extracting', 'updated_at': now}, synchronize_session=False)
+        )
+        db.session.commit()
+        if claimed:
+            claimed_ids.append(job_id)
+            if len(claimed_ids) == limit:
+                break
+    if not claimed_ids:
+        return []
+    return CVJob.query.filter(CVJob.id.in_(claimed_ids)).order_by(CVJob.id).all()
+
+
+def _dispatch_to_n8n(job, cv_text):
+    """POST to the primary / backup URLs, healthiest first; True on the first 200."""
+    config = current_app.config
+    n8n_url = config.get('N8N_WEBHOOK_URL')
+    backup_urls = config.get('N8N_BACKUP_URLS', [])
+    urls_to_try = [n8n_url] + backup_urls if backup_urls else [n8n_url]
+    public_url = config.get('PUBLIC_URL', 'http://localhost:5000')
+    callback_url = f"{public_url}/manager/api/employee/create"
+
+    response, errors = post_with_failover(urls_to_try, lambda attempt: {
+        'cv_text': cv_text,
+        'cv_filename': job.stored_filename,
+        'callback_url': callback_url,
+        'retry_count': attempt,
+        'job_id': job.id
+    })
+    if response is not None:
+        return True, None
+    return False, '; '.join(errors) or 'No n8n URL configured'
+
+
+def _dispatch_batch_to_n8n(jobs, texts):
+    """One POST carrying every job's CV, item_id = job id. Same outcome for the whole batch."""
+    config = current_app.config
+    public_url = config.get('PUBLIC_URL', 'http://localhost:5000')
+    callback_url = f"{public_url}/manager/api/employee/create-batch"
+    items = [
+        {'item_id': job.id, 'cv_text': texts[job.id], 'cv_filename': job.stored_filename}
+        for job in jobs
+    ]
+
+    response, errors = post_with_failover([config.get('N8N_CV_BATCH_WEBHOOK_URL')], lambda attempt: {
+        'items': items,
+        'callback_url': callback_url,
+        'retry_count': attempt
+    })
+    if response is not None:
+        return True, None
+    return False, '; '.join(errors) or 'No n8n batch URL configured'
+
+
+def _fail_unreadable(job):
+    print(f"❌ [CV job {job.id}] Could not extract text from {job.original_filename}")
+    job.status = 'failed'
+    job.error = 'Could not extract text from the PDF'
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    # Stored files are shared by re-uploads of the same content
+    shared = CVJob.query.filter(
+        CVJob.cv_path == job.cv_path,
+        CVJob.id != job.id,
+        CVJob.status != 'failed'
+    ).count()
+    if not shared and os.path.exists(job.cv_path):
+        os.remove(job.cv_path)
+    return job
+
+
+def _record_outcome(job, sent, error):
+    """sent → 'sent'; otherwise back to the queue with backoff, or 'failed' after the last attempt."""
+    if sent:
+        job.status = 'sent'
+        job.error = None
+    elif job.attempts < CV_JOB_MAX_ATTEMPTS:
+        delay = CV_JOB_RETRY_SECONDS * 2 ** (job.attempts - 1)
+        print(f"⚠️ [CV job {job.id}] n8n attempt {job.attempts} failed, retrying in {delay}s: {error}")
+        job.status = 'queued'
+        job.error = error
+        job.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+    else:
+        print(f"❌ [CV job {job.id}] All n8n attempts failed for {job.original_filename}: {error}")
+        job.status = 'failed'
+        job.error = error
+        job.finished_at = datetime.utcnow()
+
+
+def process_job(job, cv_text):
+    """Dispatch one claimed job's extracted text and record the outcome."""
+    if not cv_text:
+        return _fail_unreadable(job)
+
+    job.status = 'sending'
+    job.attempts = (job.attempts or 0) + 1
+    db.session.commit()
+
+    sent, error = _dispatch_to_n8n(job, cv_text)
+    _record_outcome(job, sent, error)
+    db.session.commit()
+    return job
+
+
+def process_batch(jobs, texts):
+    """
+    Dispatch several claimed jobs in one n8n call. texts: {job id: text}.
+    Unreadable CVs fail on their own; the others share the call's outcome.
+    """
+    readable = []
+    for job in jobs:
+        if texts.get(job.id):
+            readable.append(job)
+        else:
+            _fail_unreadable(job)
+    if not readable:
+        return jobs
+
+    for job in readable:
+        job.status = 'sending'
+        job.attempts = (job.attempts or 0) + 1
+    db.session.commit()
+
+    sent, error = _dispatch_batch_to_n8n(readable, texts)
+    for job in readable:
+        _record_outcome(job, sent, error)
+    db.session.commit()
+    print(f"{'✅' if sent else '⚠️'} [CV batch] {len(readable)} CV(s) in one n8n call")
+    return jobs
+
+
+def process_pending_jobs(limit=None):
+    """Drain due jobs in the current thread. Returns how many were processed."""
+    processed = 0
+    while limit is None or processed < limit:
+        batch_size = CV_QUEUE_BATCH_SIZE if limit is None else min(CV_QUEUE_BATCH_SIZE, limit - processed)
+        jobs = _claim_jobs(batch_size)
+        if not jobs:
+            break
+
+        # The batch's files are extracted together over the PDF process pool
+        texts = extract_texts(
+            [job.cv_path for job in jobs],
+            {job.cv_path: job.content_hash for job in jobs if job.content_hash}
+        )
+        if current_app.config.get('N8N_CV_BATCH_WEBHOOK_URL') and len(jobs) > 1:
+            try:
+                process_batch(jobs, {job.id: texts.get(job.cv_path) for job in jobs})
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ [CV batch] Unexpected error: {e}")
+                for job in jobs:
+                    job = db.session.get(CVJob, job.id)
+                    if job.status in CVJob.ACTIVE_STATUSES:
+                        job.status = 'failed'
+                        job.error = str(e)
+                        job.finished_at = datetime.utcnow()
+                db.session.commit()
+            processed += len(jobs)
+            continue
+
+        for job in jobs:
+            try:
+                process_job(job, texts.get(job.cv_path))
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ [CV job {job.id}] Unexpected error: {e}")
+                job = db.session.get(CVJob, job.id)
+                job.status = 'failed'
+                job.error = str(e)
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+            processed += 1
+    return processed
+
+
+def _worker_loop(app):
+    while True:
+        with app.app_context():
+            try:
+                processed = process_pending_jobs()
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ CV queue worker error: {e}")
+                processed = 0
+            finally:
+                db.session.remove()
+        if not processed:
+            _wakeup.wait(CV_QUEUE_POLL_SECONDS)
+            _wakeup.clear()
+
+
+def start_cv_workers(app):
+    """Start the worker threads once per process (no-op when CV_QUEUE_WORKERS is 0)."""
+    workers = app.config.get('CV_QUEUE_WORKERS', CV_QUEUE_WORKERS)
+    with _workers_lock:
+        if _workers or workers <= 0:
+            return
+        with app.app_context():
+            requeue_stale_jobs()
+        for i in range(workers):
+            thread = threading.Thread(target=_worker_loop, args=(app,), name=f'cv-worker-{i}', daemon=True)
+            thread.start()
+            _workers.append(thread)
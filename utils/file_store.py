@@ -0,0 +1,89 @@
+"""
+Content-addressed storage for uploaded PDFs.
+Files are identified by the SHA-256 of their bytes: re-uploading the same
+CV or specs (typically a retry after n8n failed) reuses the file already
+on disk instead of writing a new timestamped copy, and the extracted text
+is cached on disk under the same hash so pdfplumber never runs twice on
+the same content.
+"""
+
+import os
+import glob
+import hashlib
+import tempfile
+from werkzeug.utils import secure_filename
+from config import Config
+
+PDF_TEXT_CACHE_FOLDER = os.getenv('PDF_TEXT_CACHE_FOLDER', os.path.join(Config.UPLOAD_FOLDER, 'text_cache'))
+HASH_PREFIX_LEN = 16  # hex chars of the digest used in stored file names
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_of_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_upload(file_storage, folder):
+    """
+    Save an uploaded file as "<hash prefix>_<secure name>" in `folder`,
+    unless a file with the same content is already there.
+    Returns (stored_filename, path, sha256, reused).
+    """
+    os.makedirs(folder, exist_ok=True)
+
+    # Hash while spooling to a temp file in the same folder (same filesystem → atomic rename)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            for chunk in iter(lambda: file_storage.stream.read(_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                tmp.write(chunk)
+        sha = digest.hexdigest()
+
+        existing = sorted(glob.glob(os.path.join(glob.escape(folder), f'{sha[:HASH_PREFIX_LEN]}_*')))
+        existing = [p for p in existing if not p.endswith('.part')]
+        if existing:
+            os.remove(tmp_path)
+            path = existing[0]
+            return os.path.basename(path), path, sha, True
+
+        stored_filename = f'{sha[:HASH_PREFIX_LEN]}_{secure_filename(file_storage.filename) or "upload.pdf"}'
+        path = os.path.join(folder, stored_filename)
+        os.replace(tmp_path, path)
+        return stored_filename, path, sha, False
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _text_path(sha):
+    return os.path.join(PDF_TEXT_CACHE_FOLDER, sha[:2], f'{sha}.txt')
+
+
+def get_cached_text(sha):
+    """Previously extracted text for this content hash, or None."""
+    try:
+        with open(_text_path(sha), encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def store_cached_text(sha, text):
+    """Cache extracted text (written atomically; failures are only logged)."""
+    path = _text_path(sha)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not cache extracted text {sha[:12]}: {e}")
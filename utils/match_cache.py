@@ -0,0 +1,99 @@
+"""
+Persistent cache for AI match decisions.
+A decision is reused only when the task requirements AND the candidate
+roster (ids, skills, experience, current load) are exactly the same,
+so re-running auto-match on an unchanged project costs no API call.
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime, timedelta
+from models import db
+from models.match_cache import MatchCache
+from utils.skills import canonicalize_skills
+
+MATCH_CACHE_TTL_HOURS = int(os.getenv('MATCH_CACHE_TTL_HOURS', 24))
+MATCH_CACHE_MAX_ENTRIES = int(os.getenv('MATCH_CACHE_MAX_ENTRIES', 5000))
+
+
+def match_cache_key(task_requirements, available_employees, workload):
+    """
+    SHA-256 of the normalized task requirements + candidate roster snapshot.
+    `task_requirements` is a dict whose 'skills' list gets canonicalized;
+    every other value is hashed as-is.
+    """
+    task_part = dict(task_requirements)
+    task_part['skills'] = canonicalize_skills(task_requirements.get('skills', []))
+
+    fingerprint = {
+        'task': task_part,
+        'roster': sorted(
+            [
+                emp.id,
+                sorted(emp.get_canonical_skills()),
+                emp.years_of_experience or 0,
+                workload.get(emp.id, 0),
+            ]
+            for emp in available_employees
+        ),
+    }
+    raw = json.dumps(fingerprint, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def get_cached_matches(keys):
+    """
+    Look up several cache keys in one query.
+    Returns {key: matches} for fresh hits and marks them as recently used.
+    The caller commits.
+    """
+    keys = [k for k in keys if k]
+    if not keys:
+        return {}
+
+    cutoff = datetime.utcnow() - timedelta(hours=MATCH_CACHE_TTL_HOURS)
+    now = datetime.utcnow()
+    hits = {}
+
+    for entry in MatchCache.query.filter(MatchCache.cache_key.in_(keys)).all():
+        if entry.created_at and entry.created_at < cutoff:
+            continue  # expired — prune_match_cache() will delete it
+        entry.last_used_at = now
+        entry.hits = (entry.hits or 0) + 1
+        hits[entry.cache_key] = entry.matches
+
+    return hits
+
+
+def store_matches(key, matches):
+    """Save (or refresh) an AI decision. The caller commits."""
+    if not key or not matches:
+        return
+
+    now = datetime.utcnow()
+    entry = MatchCache.query.filter_by(cache_key=key).first()
+    if entry:
+        entry.matches = matches
+        entry.created_at = now
+        entry.last_used_at = now
+    else:
+        db.session.add(MatchCache(cache_key=key, matches=matches, hits=0,
+                                  created_at=now, last_used_at=now))
+
+
+def prune_match_cache():
+    """Delete expired entries, then the least recently used ones above the size cap."""
+    cutoff = datetime.utcnow() - timedelta(hours=MATCH_CACHE_TTL_HOURS)
+    MatchCache.query.filter(MatchCache.created_at < cutoff).delete(synchronize_session=False)
+
+    overflow = MatchCache.query.count() - MATCH_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        stale_ids = [
+            row.id for row in
+            MatchCache.query.with_entities(MatchCache.id)
+            .order_by(MatchCache.last_used_at.asc())
+            .limit(overflow)
+            .all()
+        ]
+        MatchCache.query.filter(MatchCache.id.in_(stale_ids)).delete(synchronize_session=False)
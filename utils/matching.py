@@ -6,10 +6,17 @@ Also handles auto-reassignment when employees complete their tasks.
 
 import os
 import json
+import heapq
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from models import db
 from models.user import User
 from models.project import Project, Task, TaskCollaborator
+from utils.match_cache import match_cache_key, get_cached_matches, store_matches, prune_match_cache
+from utils.skill_scoring import skill_overlap_matrix
+from utils.skill_index import skill_index
+from utils.assignment import solve_assignment
+from utils.scheduling import get_project_schedule
 
 # Configure DeepSeek API (new OpenAI client format)
 from openai import OpenAI
@@ -20,43 +27,52 @@ client = OpenAI(
 )
 
 MAX_TASKS_PER_EMPLOYEE = 2
+MATCH_MAX_WORKERS = int(os.getenv('MATCH_MAX_WORKERS', 8))  # concurrent DeepSeek calls in 'parallel' mode
+MATCH_PROMPT_TOKEN_BUDGET = int(os.getenv('MATCH_PROMPT_TOKEN_BUDGET', 12000))  # per prompt in 'batch' mode
+MATCH_SHORTLIST_SIZE = int(os.getenv('MATCH_SHORTLIST_SIZE', 15))  # candidates per task sent to AI / fallback
+OPTIMAL_MAX_SCORE = 120  # skill overlap (100) + max experience bonus (20)
 
 
 def _current_task_count(employee_id):
-    """Count how many non-completed tasks this employee already has."""
-    return (
-        Task.query
-        .join(Project)
-        .filter(
-            Task.assigned_employee_id == employee_id,
-            Task.status != 'completed',
-            Project.status != 'completed',
-        )
-        .count()
+    """Open tasks this employee already has (denormalized counter, see utils/task_counters.py)."""
+    return db.session.query(User.open_task_count).filter(User.id == employee_id).scalar() or 0
+
+
+def _workload_snapshot():
+    """
+    Everyone's open-task count, read from the users.open_task_count
+    counters (no scan of tasks). Returns a dict {employee_id: open_task_count};
+    employees without open tasks are simply absent (use .get(emp_id, 0)).
+    """
+    rows = (
+        db.session.query(User.id, User.open_task_count)
+        .filter(User.role == 'employee', User.open_task_count > 0)
+        .all()
     )
+    return {emp_id: count for emp_id, count in rows}
 
 
-def _get_available_employees():
-    """Get employees who are not at max capacity."""
-    employees = User.query.filter_by(role='employee', status='active').all()
-    available = []
-    
-    for emp in employees:
-        current_load = _current_task_count(emp.id)
-        if current_load < MAX_TASKS_PER_EMPLOYEE:
-            available.append(emp)
+def _get_available_employees(employees=None, workload=None):
+    """
+    Get employees who are not at max capacity.
+    Pass a preloaded roster and workload snapshot to avoid hitting the DB.
+    """
+    if employees is None:
+        employees = User.query.filter_by(role='employee', status='active').all()
+    if workload is None:
+        workload = _workload_snapshot()
     
-    return available
+    return [
+        emp for emp in employees
+        if workload.get(emp.id, 0) < MAX_TASKS_PER_EMPLOYEE
+    ]
 
 
-def ai_match_task_to_employees(task_data, available_employees):
+def _task_match_profile(task_data):
     """
-    Use DeepSeek AI to match employees to a task.
-    Returns up to 2 employees for complex tasks.
+    Return (required_skills, is_complex, max_assignees) for a task.
+    A complex task gets up to 2 assignees.
     """
-    if not available_employees:
-        return []
-    
     # Extract required skills from sous_taches
     required_skills = []
     if task_data.sous_taches:
@@ -66,7 +82,7 @@ def ai_match_task_to_employees(task_data, available_employees):
     required_skills = list(set(required_skills))  # Remove duplicates
     
     # Determine if task is complex (needs 2 people)
-    is_complex = (
+    is_complex = bool((
         task_data.duree_estimee_jours and task_data.duree_estimee_jours >= 7
     ) or (
         task_data.priorite == 'Haute'
@@ -74,11 +90,51 @@ def ai_match_task_to_employees(task_data, available_employees):
         len(required_skills) >= 4
     ) or (
         task_data.sous_taches and len(task_data.sous_taches) >= 5
-    )
+    ))
     
     max_assignees = 2 if is_complex else 1
+    return required_skills, is_complex, max_assignees
+
+
+def _shortlist_candidates(task_data, available_employees, workload):
+    """
+    Keep the MATCH_SHORTLIST_SIZE most relevant available employees for a task.
+    Employees covering more required skills (per the inverted skill index)
+    come first; the rest of the slots go to the least busy employees so the
+    AI still gets options when few people share the task's skills.
+    """
+    if len(available_employees) <= MATCH_SHORTLIST_SIZE:
+        return available_employees
+    
+    counts = skill_index.matching_counts(
+        task_data.get_canonical_skills(), [emp.id for emp in available_employees]
+    )
     
-    prompt = f"""
+    ranked = sorted(
+        available_employees,
+        key=lambda emp: (-counts.get(emp.id, 0), workload.get(emp.id, 0), emp.id)
+    )
+    return ranked[:MATCH_SHORTLIST_SIZE]
+
+
+def _match_cache_key(task_data, available_employees, workload):
+    """Cache key for an AI decision on this task against this roster (everything the prompts show)."""
+    required_skills, _, max_assignees = _task_match_profile(task_data)
+    return match_cache_key({
+        'name': task_data.nom,
+        'skills': required_skills,
+        'priority': task_data.priorite,
+        'duration': task_data.duree_estimee_jours,
+        'sub_tasks': len(task_data.sous_taches or []),
+        'max_assignees': max_assignees,
+    }, available_employees, workload)
+
+
+def _build_match_prompt(task_data, available_employees, workload):
+    """Build the single-task matching prompt sent to DeepSeek."""
+    required_skills, is_complex, max_assignees = _task_match_profile(task_data)
+    
+    return f"""
 You are an expert HR AI. Match the best employee(s) for this task.
 
 TASK:
@@ -95,7 +151,7 @@ AVAILABLE EMPLOYEES:
     'name': emp.full_name,
     'skills': emp.get_all_skills(),
     'experience_years': emp.years_of_experience or 0,
-    'current_tasks': _current_task_count(emp.id)
+    'current_tasks': workload.get(emp.id, 0)
 } for emp in available_employees], indent=2)}
 
 INSTRUCTIONS:
@@ -123,36 +179,78 @@ Return ONLY valid JSON:
 }}
 """
 
+
+def _parse_ai_json(ai_response):
+    """Extract and parse the JSON object from a raw model answer."""
+    ai_response = ai_response.strip()
+    
+    # Extract JSON from response (in case AI adds extra text)
+    if "```json" in ai_response:
+        ai_response = ai_response.split("```json")[1].split("```")[0]
+    elif "```" in ai_response:
+        ai_response = ai_response.split("```")[1].split("```")[0]
+    
+    return json.loads(ai_response)
+
+
+def _request_ai_matches(prompt, max_tokens=1000):
+    """
+    Send one matching prompt to DeepSeek and return the parsed JSON.
+    Raises on API or parsing errors. Does not touch the database, so it
+    is safe to call from worker threads.
+    """
+    response = client.chat.completions.create(
+        model="deepseek-chat",
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.2,
+        max_tokens=max_tokens
+    )
+    return _parse_ai_json(response.choices[0].message.content)
+
+
+def ai_match_task_to_employees(task_data, available_employees, workload=None):
+    """
+    Use DeepSeek AI to match employees to a task.
+    Returns up to 2 employees for complex tasks.
+    `workload` is an optional {employee_id: open_task_count} snapshot.
+    """
+    if not available_employees:
+        return []
+    
+    if workload is None:
+        workload = _workload_snapshot()
+    
+    _, _, max_assignees = _task_match_profile(task_data)
+    
+    # Same task + same roster/loads as a previous run → reuse that decision
+    cache_key = _match_cache_key(task_data, available_employees, workload)
+    cached = get_cached_matches([cache_key]).get(cache_key)
+    if cached is not None:
+        print(f"♻️ Match cache hit for task {task_data.task_id}")
+        return cached[:max_assignees]
+    
+    prompt = _build_match_prompt(task_data, available_employees, workload)
+
     try:
-        response = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-            max_tokens=1000
-        )
-        
-        ai_response = response.choices[0].message.content.strip()
-        
-        # Extract JSON from response (in case AI adds extra text)
-        if "```json" in ai_response:
-            ai_response = ai_response.split("```json")[1].split("```")[0]
-        elif "```" in ai_response:
-            ai_response = ai_response.split("```")[1].split("```")[0]
-        
-        result = json.loads(ai_response)
+        result = _request_ai_matches(prompt)
         matches = result.get('matches', [])
         
         # Limit to max_assignees
-        return matches[:max_assignees]
+        matches = matches[:max_assignees]
+        store_matches(cache_key, matches)
+        return matches
         
     except Exception as e:
         print(f"❌ AI Matching failed: {e}")
         # Fallback to simple rule-based matching
-        return _fallback_match(task_data, available_employees, max_assignees)
+        return _fallback_match(task_data, available_employees, max_assignees, workload)
 
 
-def _fallback_match(task_data, employees, max_assignees):
+def _fallback_match(task_data, employees, max_assignees, workload=None):
     """Simple fallback matching if AI fails."""
+    if workload is None:
+        workload = _workload_snapshot()
+    
     required_skills = []
     if task_data.sous_taches:
         for st in task_data.sous_taches:
@@ -161,21 +259,22 @@ def _fallback_match(task_data, employees, max_assignees):
     
     if not required_skills:
         # No skills required, just pick least busy
-        employees.sort(key=lambda emp: _current_task_count(emp.id))
+        employees.sort(key=lambda emp: workload.get(emp.id, 0))
         return [{
             'employee_id': employees[0].id,
             'confidence_score': 50,
             'reasoning': 'Fallback assignment - least busy employee'
         }] if employees else []
     
-    # Score employees by skill overlap
+    # Score employees by canonical skill overlap (one bitset pass over the roster)
+    overlap = skill_overlap_matrix(
+        {task_data.id: task_data.get_canonical_skills()},
+        {emp.id: emp.get_canonical_skills() for emp in employees}
+    )[task_data.id]
+    
     scored = []
     for emp in employees:
-        emp_skills = [s.lower() for s in emp.get_all_skills()]
-        req_skills = [s.lower() for s in required_skills]
-        
-        matched = sum(1 for req in req_skills if any(req in skill or skill in req for skill in emp_skills))
-        score = (matched / len(req_skills)) * 100 if req_skills else 0
+        score = overlap.get(emp.id, 0)
         
         # Add experience bonus
         exp_bonus = min((emp.years_of_experience or 0) * 2, 20)
@@ -184,7 +283,7 @@ def _fallback_match(task_data, employees, max_assignees):
         scored.append({
             'employee': emp,
             'score': final_score,
-            'current_load': _current_task_count(emp.id)
+            'current_load': workload.get(emp.id, 0)
         })
     
     # Sort by score, then by current load
@@ -202,10 +301,411 @@ def _fallback_match(task_data, employees, max_assignees):
     return results
 
 
-def auto_match_tasks(project_id):
+def _apply_matches(task, matches, employees_by_id, workload):
+    """
+    Write matches onto a task: first match is the primary assignee,
+    the others become helpers. Bumps the in-memory workload for the
+    primary and returns the result rows for the caller.
+    """
+    results = []
+    
+    for i, match in enumerate(matches):
+        emp = employees_by_id[match['employee_id']]
+        
+        if i == 0:
+            # Primary assignee
+            task.assigned_employee_id = match['employee_id']
+            task.assigned_at = datetime.utcnow()
+            task.match_score = match['confidence_score']
+            workload[emp.id] = workload.get(emp.id, 0) + 1
+            role = 'Primary'
+            
+        else:
+            # Secondary assignee → add as collaborator
+            # Check if already a collaborator
+            existing = TaskCollaborator.query.filter_by(
+                task_id=task.id, employee_id=match['employee_id']
+            ).first()
+            if not existing:
+                collab = TaskCollaborator(
+                    task_id=task.id,
+                    employee_id=match['employee_id'],
+                    role='helper',
+                    match_score=match['confidence_score'],
+                    reason=match.get('reasoning', 'AI-matched as secondary assignee')
+                )
+                db.session.add(collab)
+            role = 'Helper'
+        
+        results.append({
+            'task_id': task.task_id,
+            'task_name': task.nom,
+            'employee_id': match['employee_id'],
+            'employee_name': emp.full_name,
+            'score': match['confidence_score'],
+            'reasoning': match.get('reasoning', ''),
+            'role': role
+        })
+    
+    return results
+
+
+def _match_sequentially(tasks, employees, employees_by_id, workload):
+    """One blocking AI call per task, availability recomputed after each."""
+    results = []
+    
+    for task in tasks:
+        # Get currently available employees
+        available_employees = _get_available_employees(employees, workload)
+        
+        if not available_employees:
+            print(f"⚠️ No available employees for task {task.task_id}")
+            continue
+        
+        # Get AI matches for this task, among the employees worth asking about
+        candidates = _shortlist_candidates(task, available_employees, workload)
+        matches = ai_match_task_to_employees(task, candidates, workload)
+        # Ignore ids the AI invented that are not in the active roster
+        matches = [m for m in matches if m.get('employee_id') in employees_by_id]
+        
+        results.extend(_apply_matches(task, matches, employees_by_id, workload))
+    
+    return results
+
+
+def _match_concurrently(tasks, employees, employees_by_id, workload):
+    """
+    Send every task's AI request at once through a bounded thread pool,
+    then reconcile the proposals so MAX_TASKS_PER_EMPLOYEE still holds.
+    Prompts are built here, in the request thread: workers only talk
+    to DeepSeek and never touch the DB session.
+    """
+    available_employees = _get_available_employees(employees, workload)
+    if not available_employees:
+        print("⚠️ No available employees for this project")
+        return []
+    
+    shortlists = {task.id: _shortlist_candidates(task, available_employees, workload) for task in tasks}
+    cache_keys = {task.id: _match_cache_key(task, shortlists[task.id], workload) for task in tasks}
+    cached = get_cached_matches(cache_keys.values())
+    proposals = {
+        task_id: cached[key] for task_id, key in cache_keys.items() if key in cached
+    }
+    
+    prompts = {
+        task.id: _build_match_prompt(task, shortlists[task.id], workload)
+        for task in tasks if task.id not in proposals
+    }
+    print(f"♻️ Match cache: {len(proposals)} hit(s), {len(prompts)} AI call(s)")
+    
+    workers = max(1, min(MATCH_MAX_WORKERS, len(prompts)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_request_ai_matches, prompt): task_id
+            for task_id, prompt in prompts.items()
+        }
+        for future in as_completed(futures):
+            task_id = futures[future]
+            try:
+                proposals[task_id] = future.result().get('matches', [])
+                store_matches(cache_keys[task_id], proposals[task_id])
+            except Exception as e:
+                print(f"❌ AI Matching failed for task #{task_id}: {e}")
+                proposals[task_id] = None  # → fallback during reconciliation
+    
+    return _reconcile_proposals(tasks, proposals, employees, employees_by_id, workload, shortlists)
+
+
+def _estimate_tokens(text):
+    """Rough token count for budgeting prompts (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _roster_json(available_employees, workload):
+    """Serialize the candidate roster once for a batched prompt."""
+    return json.dumps([{
+        'id': emp.id,
+        'name': emp.full_name,
+        'skills': emp.get_all_skills(),
+        'experience_years': emp.years_of_experience or 0,
+        'current_tasks': workload.get(emp.id, 0)
+    } for emp in available_employees], indent=1)
+
+
+def _task_json(task_data):
+    """Compact description of one task for a batched prompt."""
+    required_skills, is_complex, max_assignees = _task_match_profile(task_data)
+    return json.dumps({
+        'ref': task_data.id,
+        'name': task_data.nom,
+        'required_skills': required_skills,
+        'priority': task_data.priorite,
+        'duration_days': task_data.duree_estimee_jours,
+        'sub_tasks': len(task_data.sous_taches or []),
+        'max_assignees': max_assignees
+    }, ensure_ascii=False)
+
+
+def _build_batch_prompt(roster, task_entries):
+    """Build one prompt that asks for assignments for several tasks at once."""
+    return f"""
+You are an expert HR AI. Match the best employee(s) for EACH task below.
+
+AVAILABLE EMPLOYEES:
+{roster}
+
+TASKS:
+{chr(10).join(task_entries)}
+
+INSTRUCTIONS:
+- Return at most `max_assignees` employees per task (1 or 2)
+- Consider skill overlap, experience, and current workload
+- Spread the work: an employee can hold at most {MAX_TASKS_PER_EMPLOYEE} tasks in total
+- Score each match 0-100
+- Answer for EVERY task, using its "ref"
+
+Return ONLY valid JSON:
+{{
+    "assignments": [
+        {{
+            "ref": 12,
+            "matches": [
+                {{
+                    "employee_id": 123,
+                    "confidence_score": 92,
+                    "reasoning": "Strong React experience, perfect for frontend work"
+                }}
+            ]
+        }}
+    ]
+}}
+"""
+
+
+def _chunk_tasks_for_prompt(tasks, roster):
+    """
+    Split tasks into chunks whose prompt stays under MATCH_PROMPT_TOKEN_BUDGET.
+    Returns a list of (tasks, prompt). A chunk always holds at least one task.
+    """
+    base_tokens = _estimate_tokens(_build_batch_prompt(roster, []))
+    chunks = []
+    current_tasks, current_entries, current_tokens = [], [], base_tokens
+    
+    for task in tasks:
+        entry = _task_json(task)
+        entry_tokens = _estimate_tokens(entry)
+        if current_tasks and current_tokens + entry_tokens > MATCH_PROMPT_TOKEN_BUDGET:
+            chunks.append((current_tasks, _build_batch_prompt(roster, current_entries)))
+            current_tasks, current_entries, current_tokens = [], [], base_tokens
+        current_tasks.append(task)
+        current_entries.append(entry)
+        current_tokens += entry_tokens
+    
+    if current_tasks:
+        chunks.append((current_tasks, _build_batch_prompt(roster, current_entries)))
+    return chunks
+
+
+def _request_batch_matches(prompt, chunk_size):
+    """Send one batched prompt; returns {task_db_id: [matches]}."""
+    # ~150 output tokens per task, within DeepSeek's 8K output limit
+    result = _request_ai_matches(prompt, max_tokens=min(8000, 300 + 150 * chunk_size))
+    
+    proposals = {}
+    for item in result.get('assignments', []):
+        try:
+            ref = int(item.get('ref'))
+        except (TypeError, ValueError):
+            continue
+        proposals[ref] = item.get('matches', [])
+    return proposals
+
+
+def _match_in_batches(tasks, employees, employees_by_id, workload):
+    """
+    Send the roster ONCE with all unassigned tasks (split into chunks if
+    the prompt gets too big), then reconcile the combined assignment map.
+    Tasks the model skipped get a regular per-task call.
+    """
+    available_employees = _get_available_employees(employees, workload)
+    if not available_employees:
+        print("⚠️ No available employees for this project")
+        return []
+    
+    # The roster sent once is the union of every task's shortlist
+    shortlists = {task.id: _shortlist_candidates(task, available_employees, workload) for task in tasks}
+    roster_ids = {emp.id for candidates in shortlists.values() for emp in candidates}
+    roster_employees = [emp for emp in available_employees if emp.id in roster_ids]
+    
+    cache_keys = {task.id: _match_cache_key(task, roster_employees, workload) for task in tasks}
+    cached = get_cached_matches(cache_keys.values())
+    proposals = {
+        task_id: cached[key] for task_id, key in cache_keys.items() if key in cached
+    }
+    pending = [task for task in tasks if task.id not in proposals]
+    
+    roster = _roster_json(roster_employees, workload)
+    chunks = _chunk_tasks_for_prompt(pending, roster) if pending else []
+    print(f"🧮 Batch matching: {len(proposals)} cached, {len(pending)} tasks in {len(chunks)} prompt(s)")
+    
+    batch_proposals = {}
+    workers = max(1, min(MATCH_MAX_WORKERS, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_request_batch_matches, prompt, len(chunk_tasks))
+            for chunk_tasks, prompt in chunks
+        ]
+        for future in as_completed(futures):
+            try:
+                batch_proposals.update(future.result())
+            except Exception as e:
+                print(f"❌ Batch AI Matching failed: {e}")
+    
+    # Keep only refs we actually asked about
+    for task in pending:
+        if task.id in batch_proposals:
+            proposals[task.id] = batch_proposals[task.id]
+            store_matches(cache_keys[task.id], proposals[task.id])
+    
+    # Per-task calls for anything the model left out (or a failed chunk)
+    for task in tasks:
+        if task.id not in proposals:
+            print(f"↪️ Task {task.task_id} missing from batch answer — matching it alone")
+            proposals[task.id] = ai_match_task_to_employees(task, shortlists[task.id], workload)
+    
+    return _reconcile_proposals(tasks, proposals, employees, employees_by_id, workload, shortlists)
+
+
+def _match_optimally(tasks, employees, employees_by_id, workload):
+    """
+    Global assignment with no AI calls: build a task × employee cost
+    matrix from the skill scores and solve it as a min-cost flow.
+    Phase 1 gives every task a primary under MAX_TASKS_PER_EMPLOYEE;
+    phase 2 gives complex tasks a helper, where each employee can help
+    on at most as many tasks as they still had free slots after phase 1.
+    """
+    available_employees = _get_available_employees(employees, workload)
+    if not available_employees:
+        print("⚠️ No available employees for this project")
+        return []
+    
+    # Whole task × employee score matrix in one bitset pass
+    overlap = skill_overlap_matrix(
+        {task.id: task.get_canonical_skills() for task in tasks},
+        {emp.id: emp.get_canonical_skills() for emp in available_employees}
+    )
+    
+    exp_bonus = {emp.id: min((emp.years_of_experience or 0) * 2, 20) for emp in available_employees}
+    
+    scores = {}
+    candidates = {}
+    for task in tasks:
+        task_overlap = overlap[task.id]
+        if task.get_canonical_skills():
+            task_scores = {emp.id: task_overlap.get(emp.id, 0) + exp_bonus[emp.id] for emp in available_employees}
+        else:
+            # No skills required → anyone, least busy first
+            task_scores = {emp.id: 50 for emp in available_employees}
+        scores[task.id] = task_scores
+        
+        # Keep the best few edges per task so the graph stays sparse
+        ranked = heapq.nsmallest(
+            MATCH_SHORTLIST_SIZE, available_employees,
+            key=lambda emp: (-task_scores[emp.id], workload.get(emp.id, 0), emp.id)
+        )
+        candidates[task.id] = [
+            # Integer cost: lower for better scores, ties broken by current load
+            (emp.id, int(round((OPTIMAL_MAX_SCORE - task_scores[emp.id]) * 10)) + workload.get(emp.id, 0))
+            for emp in ranked
+        ]
+    
+    capacity = {
+        emp.id: MAX_TASKS_PER_EMPLOYEE - workload.get(emp.id, 0)
+        for emp in available_employees
+    }
+    primaries = solve_assignment(candidates, {task.id: 1 for task in tasks}, capacity)
+    
+    # Phase 2: helpers for complex tasks that got a primary
+    helper_capacity = dict(capacity)
+    for assigned in primaries.values():
+        helper_capacity[assigned[0]] -= 1
+    helper_demand = {}
+    helper_candidates = {}
+    for task in tasks:
+        _, _, max_assignees = _task_match_profile(task)
+        if task.id in primaries and max_assignees > 1:
+            primary_id = primaries[task.id][0]
+            helper_demand[task.id] = max_assignees - 1
+            helper_candidates[task.id] = [
+                (emp_id, cost) for emp_id, cost in candidates[task.id] if emp_id != primary_id
+            ]
+    helpers = solve_assignment(helper_candidates, helper_demand, helper_capacity)
+    
+    results = []
+    for task in tasks:
+        if task.id not in primaries:
+            print(f"⚠️ No capacity left for task {task.task_id}")
+            continue
+        matches = [
+            {
+                'employee_id': emp_id,
+                'confidence_score': round(scores[task.id][emp_id], 1),
+                'reasoning': f'Optimal assignment - skill score {scores[task.id][emp_id]:.1f}'
+            }
+            for emp_id in primaries[task.id] + helpers.get(task.id, [])
+        ]
+        results.extend(_apply_matches(task, matches, employees_by_id, workload))
+    
+    return results
+
+
+def _reconcile_proposals(tasks, proposals, employees, employees_by_id, workload, shortlists=None):
+    """
+    Deterministic assignment pass over AI proposals made in parallel.
+    Tasks are walked in priority order; proposed employees that are now
+    full (or unknown) are dropped, and a task left with nobody falls
+    back to rule-based matching among employees who still have room.
+    """
+    results = []
+    
+    for task in tasks:
+        available_employees = _get_available_employees(employees, workload)
+        if not available_employees:
+            print(f"⚠️ No available employees for task {task.task_id}")
+            continue
+        
+        _, _, max_assignees = _task_match_profile(task)
+        available_ids = {emp.id for emp in available_employees}
+        
+        matches = []
+        seen = set()
+        for match in proposals.get(task.id) or []:
+            emp_id = match.get('employee_id')
+            if emp_id in available_ids and emp_id not in seen:
+                seen.add(emp_id)
+                matches.append(match)
+        
+        if not matches:
+            # Prefer the task's shortlisted employees that still have room
+            shortlist_ids = {emp.id for emp in (shortlists or {}).get(task.id, [])}
+            pool = [emp for emp in available_employees if emp.id in shortlist_ids] or available_employees
+            matches = _fallback_match(task, pool, max_assignees, workload)
+        
+        results.extend(_apply_matches(task, matches[:max_assignees], employees_by_id, workload))
+    
+    return results
+
+
+def auto_match_tasks(project_id, mode='sequential'):
     """
     Main function: Auto-assign employees to all unassigned tasks in a project.
     Called by Flask routes after project analysis.
+    
+    mode:
+    - 'sequential': one AI call per task, in priority order
+    - 'parallel':   all AI calls at once, then a reconciliation pass
+    - 'batch':      one prompt (or a few chunks) for all tasks, then reconciliation
+    - 'optimal':    no AI — global min-cost assignment over skill scores
     """
     try:
         # Get unassigned tasks
@@ -220,66 +720,30 @@ def auto_match_tasks(project_id):
         if not tasks:
             return []
         
-        results = []
+        # Tasks whose dependencies are all completed go first, then by
+        # earliest start in the dependency graph (priority order kept on ties)
+        schedule = get_project_schedule(project_id)
+        tasks.sort(key=lambda t: (
+            not schedule.is_ready(t.task_id),
+            schedule.earliest_start.get(t.task_id, 0)
+        ))
         
-        for task in tasks:
-            # Get currently available employees
-            available_employees = _get_available_employees()
-            
-            if not available_employees:
-                print(f"⚠️ No available employees for task {task.task_id}")
-                continue
-            
-            # Get AI matches for this task
-            matches = ai_match_task_to_employees(task, available_employees)
-            
-            # Assign the matches
-            for i, match in enumerate(matches):
-                if i == 0:
-                    # Primary assignee
-                    task.assigned_employee_id = match['employee_id']
-                    task.assigned_at = datetime.utcnow()
-                    task.match_score = match['confidence_score']
-                    
-                    emp_name = User.query.get(match['employee_id']).full_name
-                    results.append({
-                        'task_id': task.task_id,
-                        'task_name': task.nom,
-                        'employee_id': match['employee_id'],
-                        'employee_name': emp_name,
-                        'score': match['confidence_score'],
-                        'reasoning': match['reasoning'],
-                        'role': 'Primary'
-                    })
-                    
-                else:
-                    # Secondary assignee → add as collaborator
-                    emp = User.query.get(match['employee_id'])
-                    if emp:
-                        # Check if already a collaborator
-                        existing = TaskCollaborator.query.filter_by(
-                            task_id=task.id, employee_id=match['employee_id']
-                        ).first()
-                        if not existing:
-                            collab = TaskCollaborator(
-                                task_id=task.id,
-                                employee_id=match['employee_id'],
-                                role='helper',
-                                match_score=match['confidence_score'],
-                                reason=match.get('reasoning', 'AI-matched as secondary assignee')
-                            )
-                            db.session.add(collab)
-                        
-                        results.append({
-                            'task_id': task.task_id,
-                            'task_name': task.nom,
-                            'employee_id': match['employee_id'],
-                            'employee_name': emp.full_name,
-                            'score': match['confidence_score'],
-                            'reasoning': match['reasoning'],
-                            'role': 'Helper'
-                        })
+        # Load the roster and everyone's open-task count once; the workload
+        # dict is kept up to date in memory as tasks get assigned.
+        employees = User.query.filter_by(role='employee', status='active').all()
+        employees_by_id = {emp.id: emp for emp in employees}
+        workload = _workload_snapshot()
+        
+        if mode == 'parallel':
+            results = _match_concurrently(tasks, employees, employees_by_id, workload)
+        elif mode == 'batch':
+            results = _match_in_batches(tasks, employees, employees_by_id, workload)
+        elif mode == 'optimal':
+            results = _match_optimally(tasks, employees, employees_by_id, workload)
+        else:
+            results = _match_sequentially(tasks, employees, employees_by_id, workload)
         
+        prune_match_cache()
         db.session.commit()
         return results
         
@@ -295,133 +759,147 @@ def ai_match_employee_to_task(task, employees):
     return ai_match_task_to_employees(task, employees)
 
 
-def auto_reassign_employee(employee_id, project_id):
+def _reassignment_score(skill_score, task):
+    # Bonus for in_progress tasks (more urgent, employee can contribute immediately)
+    status_bonus = 20 if task.status == 'in_progress' else 0
+    
+    # Bonus for high priority
+    priority_bonus = 0
+    if task.priorite == 'Haute':
+        priority_bonus = 15
+    elif task.priorite == 'Moyenne':
+        priority_bonus = 5
+    
+    return skill_score + status_bonus + priority_bonus
+
+
+def auto_reassign_employees(employee_ids, project_id):
     """
-    When an employee finishes all their tasks in a project, 
-    auto-reassign them to help on another unfinished task in the SAME project.
+    Batched auto-reassignment for everyone freed by a status change.
     
-    Logic:
-    1. Check if the employee still has unfinished tasks in this project → if yes, do nothing
-    2. Find unfinished tasks in the project that the employee is NOT already on
-    3. Score by skill match (prefer in_progress tasks over not-started)
-    4. Add the employee as a collaborator (helper) on the best-matching task
+    One snapshot of the project (tasks + collaborator rows + employees, three
+    queries) is shared by all employees; each one that has no unfinished work
+    left in the project is added as a helper on their best-scoring open task
+    (same rules as before: skill overlap + status/priority bonus, score >= 15).
+    All TaskCollaborator rows are written in a single transaction.
     
-    Returns: dict with reassignment info, or None if no reassignment made.
+    Returns: list of reassignment info dicts, in the order of employee_ids.
     """
+    employee_ids = list(dict.fromkeys(e for e in employee_ids if e))
+    if not employee_ids:
+        return []
+    
     try:
-        employee = User.query.get(employee_id)
-        if not employee:
-            return None
-        
-        # 1. Check if employee still has UNFINISHED tasks (as primary) in this project
-        remaining = Task.query.filter(
-            Task.project_id == project_id,
-            Task.assigned_employee_id == employee_id,
-            Task.status != 'completed'
-        ).count()
-        
-        if remaining > 0:
-            return None  # Still has work to do
-        
-        # Also check if they're collaborating on any unfinished task in this project
-        remaining_collab = (
-            db.session.query(TaskCollaborator)
+        # Shared snapshot
+        tasks = Task.query.filter_by(project_id=project_id).order_by(Task.id).all()
+        tasks_by_id = {task.id: task for task in tasks}
+        collab_rows = (
+            db.session.query(TaskCollaborator.task_id, TaskCollaborator.employee_id)
             .join(Task)
-            .filter(
-                Task.project_id == project_id,
-                TaskCollaborator.employee_id == employee_id,
-                Task.status != 'completed'
-            ).count()
+            .filter(Task.project_id == project_id)
+            .all()
         )
+        employees = {u.id: u for u in User.query.filter(User.id.in_(employee_ids)).all()}
         
-        if remaining_collab > 0:
-            return None  # Still helping on another task
-        
-        # 2. Find unfinished tasks in this project that this employee is NOT assigned to
-        candidate_tasks = Task.query.filter(
-            Task.project_id == project_id,
-            Task.status != 'completed',
-            Task.assigned_employee_id != employee_id  # Not already the primary
-        ).all()
+        open_tasks = [task for task in tasks if task.status != 'completed']
+        helping = {}  # employee_id -> task ids they collaborate on (in this project)
+        for task_id, emp_id in collab_rows:
+            helping.setdefault(emp_id, set()).add(task_id)
         
-        # Filter out tasks where employee is already a collaborator
-        existing_collab_task_ids = set(
-            tc.task_id for tc in TaskCollaborator.query.filter_by(employee_id=employee_id).all()
-        )
-        candidate_tasks = [t for t in candidate_tasks if t.id not in existing_collab_task_ids]
+        freed = []
+        for emp_id in employee_ids:
+            if emp_id not in employees:
+                continue
+            # Still has unfinished work (as primary or helper) → nothing to do
+            if any(task.assigned_employee_id == emp_id for task in open_tasks):
+                continue
+            if any(tasks_by_id[t].status != 'completed' for t in helping.get(emp_id, ())):
+                continue
+            freed.append(emp_id)
         
-        if not candidate_tasks:
-            return None  # No available tasks to help on
+        if not freed or not open_tasks:
+            return []
         
-        # 3. Score each candidate task by skill match
-        employee_skills = [s.lower() for s in employee.get_all_skills()]
+        # Score every freed employee against every open task in one pass
+        task_requirements = {task.id: task.get_canonical_skills() for task in open_tasks}
+        overlap = skill_overlap_matrix(
+            task_requirements,
+            {emp_id: employees[emp_id].get_canonical_skills() for emp_id in freed}
+        )
         
-        scored_tasks = []
-        for task in candidate_tasks:
-            required_skills = [s.lower() for s in task.get_required_skills()]
-            
-            if required_skills and employee_skills:
-                matched = sum(
-                    1 for req in required_skills 
-                    if any(req in skill or skill in req for skill in employee_skills)
-                )
-                skill_score = (matched / len(required_skills)) * 100
-            elif not required_skills:
-                skill_score = 30  # No skills required → anyone can help
-            else:
-                skill_score = 0
-            
-            # Bonus for in_progress tasks (more urgent, employee can contribute immediately)
-            status_bonus = 20 if task.status == 'in_progress' else 0
+        results = []
+        now = datetime.utcnow()
+        for emp_id in freed:
+            employee = employees[emp_id]
+            best = None
+            for task in open_tasks:
+                # Only tasks with a primary that isn't this employee, and not already helping
+                if task.assigned_employee_id is None or task.assigned_employee_id == emp_id:
+                    continue
+                if task.id in helping.get(emp_id, ()):
+                    continue
+                
+                if task_requirements[task.id]:
+                    skill_score = overlap[task.id].get(emp_id, 0)
+                else:
+                    skill_score = 30  # No skills required → anyone can help
+                
+                score = round(_reassignment_score(skill_score, task), 1)
+                if best is None or score > best[0]:
+                    best = (score, round(skill_score, 1), task)
             
-            # Bonus for high priority
-            priority_bonus = 0
-            if task.priorite == 'Haute':
-                priority_bonus = 15
-            elif task.priorite == 'Moyenne':
-                priority_bonus = 5
+            # Only reassign if there's a reasonable match (score > 15)
+            if best is None or best[0] < 15:
+                continue
             
-            total_score = skill_score + status_bonus + priority_bonus
+            score, skill_score, best_task = best
+            collab = TaskCollaborator(
+                task_id=best_task.id,
+                employee_id=emp_id,
+                role='auto-reassigned',
+                match_score=score,
+                reason=f"{employee.full_name} finished their tasks and was auto-reassigned to help (skill match: {skill_score}%)",
+                assigned_at=now
+            )
+            db.session.add(collab)
+            helping.setdefault(emp_id, set()).add(best_task.id)
             
-            scored_tasks.append({
-                'task': task,
-                'score': round(total_score, 1),
-                'skill_score': round(skill_score, 1)
+            results.append({
+                'employee_id': emp_id,
+                'employee_name': employee.full_name,
+                'task_id': best_task.task_id,
+                'task_name': best_task.nom,
+                'score': score,
+                'reason': collab.reason,
+                'primary_assignee': best_task.assigned_employee.full_name if best_task.assigned_employee else 'Unassigned'
             })
         
-        # Sort: highest score first
-        scored_tasks.sort(key=lambda x: -x['score'])
-        
-        # Only reassign if there's a reasonable match (score > 15)
-        best = scored_tasks[0]
-        if best['score'] < 15:
-            return None  # No good match found
-        
-        best_task = best['task']
-        
-        # 4. Add as a collaborator
-        collab = TaskCollaborator(
-            task_id=best_task.id,
-            employee_id=employee_id,
-            role='auto-reassigned',
-            match_score=best['score'],
-            reason=f"{employee.full_name} finished their tasks and was auto-reassigned to help (skill match: {best['skill_score']}%)",
-            assigned_at=datetime.utcnow()
-        )
-        db.session.add(collab)
-        db.session.commit()
-        
-        return {
-            'employee_id': employee_id,
-            'employee_name': employee.full_name,
-            'task_id': best_task.task_id,
-            'task_name': best_task.nom,
-            'score': best['score'],
-            'reason': collab.reason,
-            'primary_assignee': best_task.assigned_employee.full_name if best_task.assigned_employee else 'Unassigned'
-        }
+        if results:
+            db.session.commit()
+        return results
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Auto-reassign error for employee {employee_id}: {e}")
-        return None
\ No newline at end of file
+        print(f"❌ Auto-reassign error for employees {employee_ids}: {e}")
+        return []
+
+
+def reassign_after_completion(task):
+    """
+    Called when `task` moves to completed: frees its primary assignee and
+    collaborators and reassigns them in one batch.
+    """
+    freed = [task.assigned_employee_id] + [collab.employee_id for collab in task.collaborators]
+    return auto_reassign_employees(freed, task.project_id)
+
+
+def auto_reassign_employee(employee_id, project_id):
+    """
+    When an employee finishes all their tasks in a project, 
+    auto-reassign them to help on another unfinished task in the SAME project.
+    Single-employee form of auto_reassign_employees().
+    
+    Returns: dict with reassignment info, or None if no reassignment made.
+    """
+    results = auto_reassign_employees([employee_id], project_id)
+    return results[0] if results else None
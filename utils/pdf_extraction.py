@@ -0,0 +1,326 @@
+"""
+PDF text extraction for uploaded CVs and project specs.
+
+Each page goes through a tiered extractor chain (iter_pdf_pages, in
+utils/pdf_pages.py with the rest of the pool worker side): a fast
+text pass (pypdfium2 or PyPDF2) whose output is quality-checked, and
+pdfplumber only for the pages that fail the check. The tier used for each
+page is returned with the text and counted in extraction_stats().
+
+Pages are read one at a time from a generator into a list-join buffer
+that enforces a page budget (PDF_MAX_PAGES) and a character budget
+(PDF_MAX_CHARS): parsing stops as soon as a budget is hit and the caller
+is told the text was truncated, so a 300-page annex costs no more than
+its first pages.
+
+Extraction is CPU-bound and holds the GIL, so
+documents with at least PDF_PARALLEL_MIN_PAGES pages are split into page
+ranges and spread over a shared ProcessPoolExecutor; results are joined
+back in page order. Several files (a multi-CV upload) go through the same
+pool at once with extract_texts(). Small documents stay in-process, where
+spawning work costs more than it saves. Pool workers are spawned and only
+import utils.pdf_pages, never the app.
+
+Complete (untruncated) results are cached on disk by the SHA-256 of the
+file (utils/file_store.py), so the same bytes are never parsed twice.
+
+Runs outside the request (CV queue workers) as well as inside it, so it
+logs with print instead of current_app.logger.
+"""
+
+import os
+import time
+import threading
+from collections import Counter
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils.file_store import sha256_of_file, get_cached_text, store_cached_text
+from utils import pdf_pages
+from utils.pdf_pages import iter_pdf_pages, extract_page_range, init_worker
+
+PDF_EXTRACT_WORKERS = int(os.getenv('PDF_EXTRACT_WORKERS', os.cpu_count() or 1))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', 8))
+PDF_PAGES_PER_CHUNK = int(os.getenv('PDF_PAGES_PER_CHUNK', 4))
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', 150))      # 0 = no limit
+PDF_MAX_CHARS = int(os.getenv('PDF_MAX_CHARS', 300000))   # 0 = no limit
+
+_pool = None
+_pool_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {
+    'files': 0, 'pages': 0, 'seconds': 0.0, 'parallel_files': 0,
+    'failures': 0, 'cache_hits': 0, 'truncated_files': 0,
+    'tiers': Counter()  # pages extracted per tier
+}
+
+
+class TextBuffer:
+    """List-join text buffer with a character budget (0 = unlimited)."""
+
+    def __init__(self, max_chars=0):
+        self.max_chars = max_chars
+        self.parts = []
+        self.chars = 0
+        self.truncated = False
+
+    def add(self, text):
+        """Append one page; False once the budget is used up (stop reading)."""
+        if self.truncated:
+            return False
+        if not text:
+            return True
+        sep = 1 if self.parts else 0  # the "\n" join
+        if self.max_chars and self.chars + sep + len(text) > self.max_chars:
+            text = text[:max(self.max_chars - self.chars - sep, 0)]
+            self.truncated = True
+        if text:
+            self.parts.append(text)
+            self.chars += sep + len(text)
+        return not self.truncated
+
+    def text(self):
+        return "\n".join(self.parts).strip()
+
+
+# ── Pool ──
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that already runs request / queue threads is unsafe.
+            # Workers only need utils.pdf_pages (no app, no DB connection).
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker
+            )
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _page_ranges(page_count):
+    return [
+        (start, min(start + PDF_PAGES_PER_CHUNK, page_count))
+        for start in range(0, page_count, PDF_PAGES_PER_CHUNK)
+    ]
+
+
+def _record(pages, seconds, parallel, failed=False, truncated=False, tiers=()):
+    with _stats_lock:
+        _stats['tiers'].update(tiers)
+        _stats['files'] += 1
+        _stats['pages'] += pages
+        _stats['seconds'] += seconds
+        _stats['parallel_files'] += int(parallel)
+        _stats['failures'] += int(failed)
+        _stats['truncated_files'] += int(truncated)
+
+
+def extraction_stats():
+    """Cumulative timing stats for this process."""
+    with _stats_lock:
+        stats = dict(_stats)
+        stats['tiers'] = dict(_stats['tiers'])
+    stats['workers'] = PDF_EXTRACT_WORKERS
+    stats['avg_ms_per_page'] = round(stats['seconds'] * 1000 / stats['pages'], 1) if stats['pages'] else None
+    stats['seconds'] = round(stats['seconds'], 3)
+    return stats
+
+
+# ── Extraction ──
+
+def iter_pypdf2_pages(pdf_path, start=0, stop=None):
+    """Same contract as iter_pdf_pages(), PyPDF2 only (last-resort fallback)."""
+    import PyPDF2
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page in pdf_reader.pages[start:stop]:
+            yield page.extract_text() or "", 'pypdf2'
+
+
+def _submit_ranges(pdf_path, ranges, count, max_chars):
+    pool = _get_pool()
+    futures = []
+    for start, stop in ranges:
+        futures.append(pool.submit(extract_page_range, pdf_path, start, stop, max_chars))
+        if len(futures) == count:
+            break
+    return futures
+
+
+def _budgets(max_pages, max_chars):
+    return (
+        PDF_MAX_PAGES if max_pages is None else max_pages,
+        PDF_MAX_CHARS if max_chars is None else max_chars
+    )
+
+
+def _result(buffer, tiers, page_count, page_limit_hit=False, cached=False):
+    """
+    {'text', 'pages_read', 'page_count', 'truncated', 'tiers', 'cached'} for
+    one document; 'tiers' lists the extractor used for each page read.
+    """
+    return {
+        'text': buffer.text() if buffer is not None else None,
+        'pages_read': None if cached else len(tiers),
+        'page_count': page_count,
+        'truncated': bool(page_limit_hit or (buffer is not None and buffer.truncated)),
+        'tiers': tiers,
+        'cached': cached,
+    }
+
+
+def _read_into(buffer, pages, tiers):
+    """Consume a (text, tier) iterator into the buffer, appending to `tiers`. Stops at the budget."""
+    try:
+        for text, tier in pages:
+            tiers.append(tier)
+            if not buffer.add(text):
+                break
+    finally:
+        if hasattr(pages, 'close'):
+            pages.close()
+
+
+def extract_documents(pdf_paths, known_hashes=None, max_pages=None, max_chars=None, use_cache=True):
+    """
+    Extract several PDFs at once, within the page / character budgets
+    (None = module defaults, 0 = unlimited). Page ranges of every large
+    file are submitted to the pool together; small files are streamed
+    in-process while the pool works. `known_hashes` ({pdf_path: sha256})
+    skips re-hashing files whose digest was computed on upload.
+    Returns {pdf_path: result} — see _result(); 'text' is None on failure.
+    """
+    max_pages, max_chars = _budgets(max_pages, max_chars)
+    started = time.perf_counter()
+    results = {}
+    pending = {}  # pdf_path -> (start time, page count, pages to read, ranges iterator, [futures in page order])
+    hashes = dict(known_hashes or {})  # pdf_path -> sha256, for the text cache
+
+    use_pool = PDF_EXTRACT_WORKERS > 1
+    for pdf_path in dict.fromkeys(pdf_paths):
+        file_started = time.perf_counter()
+        try:
+            if pdf_path not in hashes and use_cache:
+                hashes[pdf_path] = sha256_of_file(pdf_path)
+            cached = get_cached_text(hashes[pdf_path]) if use_cache else None
+            if cached is not None:
+                buffer = TextBuffer(max_chars)
+                buffer.add(cached)
+                results[pdf_path] = _result(buffer, [], None, cached=True)
+                with _stats_lock:
+                    _stats['cache_hits'] += 1
+                continue
+
+            page_count = pdf_pages.page_count(pdf_path)
+            to_read = min(page_count, max_pages) if max_pages else page_count
+            if use_pool and to_read >= PDF_PARALLEL_MIN_PAGES:
+                # A window of ranges in flight, refilled as results are consumed,
+                # so a character budget hit early doesn't leave the rest parsing
+                ranges = iter(_page_ranges(to_read))
+                futures = _submit_ranges(pdf_path, ranges, PDF_EXTRACT_WORKERS, max_chars)
+                pending[pdf_path] = (file_started, page_count, to_read, ranges, futures)
+                continue
+
+            buffer, tiers = TextBuffer(max_chars), []
+            _read_into(buffer, iter_pdf_pages(pdf_path, 0, to_read), tiers)
+            results[pdf_path] = _result(buffer, tiers, page_count, to_read < page_count)
+            _record(len(tiers), time.perf_counter() - file_started, parallel=False,
+                    truncated=results[pdf_path]['truncated'], tiers=tiers)
+        except Exception as e:
+            print(f"❌ Error extracting PDF text: {e}")
+            results[pdf_path] = _fallback(pdf_path, file_started, max_pages, max_chars)
+
+    for pdf_path, (file_started, page_count, to_read, ranges, futures) in pending.items():
+        try:
+            buffer, tiers = TextBuffer(max_chars), []
+            while futures:
+                future = futures.pop(0)
+                _read_into(buffer, iter(future.result()), tiers)
+                if buffer.truncated:
+                    for rest in futures:
+                        rest.cancel()  # budget hit: don't parse the remaining ranges
+                    break
+                futures.extend(_submit_ranges(pdf_path, ranges, 1, max_chars))
+            results[pdf_path] = _result(buffer, tiers, page_count, to_read < page_count)
+            _record(len(tiers), time.perf_counter() - file_started, parallel=True,
+                    truncated=results[pdf_path]['truncated'], tiers=tiers)
+        except BrokenProcessPool as e:
+            print(f"⚠️ PDF process pool broke, recreating it: {e}")
+            _reset_pool()
+            results[pdf_path] = _extract_inline(pdf_path, file_started, max_pages, max_chars)
+        except Exception as e:
+            print(f"❌ Error extracting PDF text: {e}")
+            results[pdf_path] = _fallback(pdf_path, file_started, max_pages, max_chars)
+
+    for pdf_path, result in results.items():
+        # Only complete texts are cached: a truncated one depends on the budgets
+        if use_cache and result['text'] and not result['truncated'] and not result['cached']:
+            store_cached_text(hashes[pdf_path], result['text'])
+
+    if len(results) > 1:
+        print(f"📄 Extracted {len(results)} PDFs in {time.perf_counter() - started:.2f}s")
+    return results
+
+
+def _extract_inline(pdf_path, file_started, max_pages, max_chars):
+    try:
+        page_count = pdf_pages.page_count(pdf_path)
+        to_read = min(page_count, max_pages) if max_pages else page_count
+        buffer, tiers = TextBuffer(max_chars), []
+        _read_into(buffer, iter_pdf_pages(pdf_path, 0, to_read), tiers)
+        result = _result(buffer, tiers, page_count, to_read < page_count)
+        _record(len(tiers), time.perf_counter() - file_started, parallel=False,
+                truncated=result['truncated'], tiers=tiers)
+        return result
+    except Exception as e:
+        print(f"❌ Error extracting PDF text: {e}")
+        return _fallback(pdf_path, file_started, max_pages, max_chars)
+
+
+def _fallback(pdf_path, file_started, max_pages, max_chars):
+    """PyPDF2 alone when the tiered chain fails; 'text' is None when nothing works."""
+    try:
+        import PyPDF2
+        with open(pdf_path, 'rb') as file:
+            page_count = len(PyPDF2.PdfReader(file).pages)
+        to_read = min(page_count, max_pages) if max_pages else page_count
+        buffer, tiers = TextBuffer(max_chars), []
+        _read_into(buffer, iter_pypdf2_pages(pdf_path, 0, to_read), tiers)
+        result = _result(buffer, tiers, page_count, to_read < page_count)
+        _record(len(tiers), time.perf_counter() - file_started, parallel=False,
+                truncated=result['truncated'], tiers=tiers)
+        return result
+    except Exception as e2:
+        print(f"❌ Error extracting PDF text with PyPDF2: {e2}")
+        _record(0, time.perf_counter() - file_started, parallel=False, failed=True)
+        return _result(None, [], None)
+
+
+def extract_pdf(pdf_path, sha256=None, max_pages=None, max_chars=None, use_cache=True):
+    """One PDF within the budgets → see _result()."""
+    known = {pdf_path: sha256} if sha256 else None
+    return extract_documents([pdf_path], known, max_pages, max_chars, use_cache)[pdf_path]
+
+
+def extract_texts(pdf_paths, known_hashes=None):
+    """{pdf_path: text or None} with the default budgets."""
+    return {
+        pdf_path: result['text']
+        for pdf_path, result in extract_documents(pdf_paths, known_hashes).items()
+    }
+
+
+def extract_text_from_pdf(pdf_path, sha256=None):
+    """Extract text from one PDF (pages in order, one per line block); None on failure."""
+    return extract_pdf(pdf_path, sha256)['text']
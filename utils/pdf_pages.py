@@ -0,0 +1,166 @@
+"""
+Page-level PDF text extraction: the tiered extractor chain and the
+functions run by utils/pdf_extraction.py's process pool.
+
+Kept free of Flask, config and database imports: every pool worker is a
+spawned interpreter that imports this module, so importing it must be
+cheap and have no side effects.
+"""
+
+import os
+import signal
+import unicodedata
+
+# Quality check for the fast tier (see _page_passes)
+PDF_FAST_MIN_CHARS = int(os.getenv('PDF_FAST_MIN_CHARS', 40))                  # non-blank chars per page
+PDF_FAST_MAX_BAD_RATIO = float(os.getenv('PDF_FAST_MAX_BAD_RATIO', 0.05))      # replacement / control chars
+PDF_FAST_MIN_SPACE_RATIO = float(os.getenv('PDF_FAST_MIN_SPACE_RATIO', 0.05))  # words glued together
+PDF_FAST_MAX_FAIL_SHARE = float(os.getenv('PDF_FAST_MAX_FAIL_SHARE', 0.5))     # give up on the fast tier (after 4+ pages)
+
+
+# ── Extractor tiers ──
+#
+# Tier 1 is a fast text pass (pypdfium2 when installed, else PyPDF2).
+# Each fast page goes through _page_passes(); only pages that fail it are
+# re-extracted with pdfplumber (tier 2, slow but layout-aware). If most of
+# a document's pages fail, the fast pass is skipped for the rest of it.
+
+class _FastReader:
+    """Tier-1 text reader over pypdfium2 or PyPDF2 (None when neither is installed)."""
+
+    def __init__(self, pdf_path):
+        self.name = None
+        self._doc = self._file = None
+        try:
+            import pypdfium2
+            self._doc = pypdfium2.PdfDocument(pdf_path)
+            self.name = 'pypdfium2'
+            return
+        except ImportError:
+            pass
+        try:
+            import PyPDF2
+            self._file = open(pdf_path, 'rb')
+            self._doc = PyPDF2.PdfReader(self._file)
+            self.name = 'pypdf2'
+        except ImportError:
+            pass
+
+    def __len__(self):
+        if self.name == 'pypdfium2':
+            return len(self._doc)
+        return len(self._doc.pages)
+
+    def text(self, index):
+        if self.name == 'pypdfium2':
+            page = self._doc[index]
+            textpage = page.get_textpage()
+            try:
+                return textpage.get_text_range() or ""
+            finally:
+                textpage.close()
+                page.close()
+        return self._doc.pages[index].extract_text() or ""
+
+    def close(self):
+        if self.name == 'pypdfium2':
+            self._doc.close()
+        if self._file:
+            self._file.close()
+
+
+def _page_passes(text):
+    """Quality check for a fast-tier page: enough text, not garbled, words not glued."""
+    stripped = ''.join(text.split())
+    if len(stripped) < PDF_FAST_MIN_CHARS:
+        return False
+    bad = sum(
+        1 for ch in stripped
+        if ch == '\ufffd' or (ord(ch) < 32) or unicodedata.category(ch) in ('Co', 'Cn', 'Cc')
+    )
+    if bad / len(stripped) > PDF_FAST_MAX_BAD_RATIO:
+        return False
+    spaces = len(text) - len(stripped)
+    return spaces / len(text) >= PDF_FAST_MIN_SPACE_RATIO
+
+
+def page_count(pdf_path):
+    """Number of pages, from the fast reader when it can open the file."""
+    fast = _FastReader(pdf_path)
+    try:
+        if fast.name:
+            return len(fast)
+    finally:
+        fast.close()
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def iter_pdf_pages(pdf_path, start=0, stop=None):
+    """
+    Yield (text, tier) for pages [start, stop) one at a time, tier being
+    'pypdfium2' / 'pypdf2' (fast pass accepted) or 'pdfplumber'. Pages are
+    only parsed when consumed, so closing the generator early stops work.
+    """
+    fast = _FastReader(pdf_path)
+    plumber = None  # opened on the first page that needs it
+    tried = failed = 0
+    try:
+        count = len(fast) if fast.name else None
+        if count is None:
+            import pdfplumber
+            plumber = pdfplumber.open(pdf_path)
+            count = len(plumber.pages)
+        stop = count if stop is None else min(stop, count)
+
+        for index in range(start, stop):
+            use_fast = fast.name and not (tried >= 4 and failed / tried > PDF_FAST_MAX_FAIL_SHARE)
+            if use_fast:
+                text = fast.text(index)
+                tried += 1
+                if _page_passes(text):
+                    yield text, fast.name
+                    continue
+                failed += 1
+
+            try:
+                if plumber is None:
+                    import pdfplumber
+                    plumber = pdfplumber.open(pdf_path)
+                page = plumber.pages[index]
+                text = page.extract_text() or ""
+                tier = 'pdfplumber'
+                # Drop the page's cached layout objects — keeps memory flat on long documents
+                if hasattr(page, 'close'):
+                    page.close()
+            except ImportError:
+                if not fast.name:
+                    raise
+                # No tier 2 installed: keep the fast text rather than nothing
+                if not use_fast:
+                    text = fast.text(index)
+                tier = fast.name
+            yield text, tier
+    finally:
+        fast.close()
+        if plumber is not None:
+            plumber.close()
+
+
+# ── Pool worker side (top-level so they are picklable) ──
+
+def init_worker():
+    """Pool initializer: Ctrl-C is handled by the parent, which shuts the pool down."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def extract_page_range(pdf_path, start, stop, max_chars=0):
+    """(text, tier) of pages [start, stop) — opens the file once per range, stops at max_chars."""
+    pages, chars = [], 0
+    for text, tier in iter_pdf_pages(pdf_path, start, stop):
+        pages.append((text, tier))
+        chars += len(text)
+        if max_chars and chars >= max_chars:
+            break
+    return pages
@@ -0,0 +1,326 @@
+"""
+Background pipeline for project specifications.
+
+    uploaded → extracted → sent → analyzed → matched
+
+add_project only stores the PDF and a ProjectPipeline row; the n8n callback
+only stores the analysis and moves the row to 'analyzed'. Worker threads
+run the slow steps — PDF extraction, the n8n POST, applying the analysis
+to the tasks + AI auto-matching — so neither request waits on them.
+Every transition is timestamped in ProjectPipeline.history with the time
+spent in the previous state and the step's own run time.
+
+Like the CV queue, steps are claimed with a conditional UPDATE (safe across
+processes), retried with backoff, and rows left claimed by a crashed worker
+are released after PIPELINE_STALE_MINUTES.
+
+A step returns its next state and the columns it produced instead of
+writing the row: n8n may call back while _send is still running, so the
+outcome is written on the row re-read under a lock (_lock_row), and only
+if it is still in the state the step started from — a newer 'analyzed'
+is never overwritten by 'sent' or 'failed'.
+"""
+
+import os
+import time
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db
+from models.callback_receipt import CallbackReceipt
+from models.project_pipeline import ProjectPipeline
+from utils.matching import auto_match_tasks
+from utils.pdf_extraction import extract_pdf
+from utils.scheduling import invalidate_schedule
+from utils.task_sync import sync_project_tasks
+from utils.webhook_client import post_json, WEBHOOK_CONNECT_TIMEOUT
+
+PROJECT_PIPELINE_WORKERS = int(os.getenv('PROJECT_PIPELINE_WORKERS', 1))
+PIPELINE_POLL_SECONDS = float(os.getenv('PIPELINE_POLL_SECONDS', 5))
+PIPELINE_MAX_ATTEMPTS = int(os.getenv('PIPELINE_MAX_ATTEMPTS', 3))
+PIPELINE_RETRY_SECONDS = int(os.getenv('PIPELINE_RETRY_SECONDS', 30))  # doubled after each failed attempt
+PIPELINE_STALE_MINUTES = int(os.getenv('PIPELINE_STALE_MINUTES', 10))
+PIPELINE_SEND_READ_TIMEOUT = float(os.getenv('PIPELINE_SEND_READ_TIMEOUT', 30))  # n8n acknowledges the whole PDF text
+
+_wakeup = threading.Event()
+_workers = []
+_workers_lock = threading.Lock()
+
+
+class PipelineError(Exception):
+    """A step failure that retrying cannot fix (unreadable PDF...)."""
+
+
+def start_pipeline(project, specs_hash=None):
+    """Queue a freshly uploaded project. The caller commits, then calls notify_workers()."""
+    pipeline = ProjectPipeline(
+        project=project,
+        specs_hash=specs_hash,
+        state='uploaded',
+        history=[{'state': 'uploaded', 'at': datetime.utcnow().isoformat(), 'seconds': None}]
+    )
+    db.session.add(pipeline)
+    return pipeline
+
+
+def receive_analysis(project, data, digest):
+    """
+    Store an n8n callback payload for the workers (state → 'analyzed').
+    Projects created before the pipeline get a row on the fly. The caller commits.
+    """
+    pipeline = _lock_row(ProjectPipeline.project_id == project.id)
+    if pipeline is None:
+        pipeline = ProjectPipeline(project=project, state='sent', history=[])
+        db.session.add(pipeline)
+    pipeline.analysis = data
+    pipeline.payload_hash = digest
+    pipeline.transition('analyzed')
+    return pipeline
+
+
+def notify_workers():
+    """Wake idle workers instead of waiting for the next poll."""
+    _wakeup.set()
+
+
+def release_stale_claims():
+    """Un-claim rows left 'running' by a crashed / restarted worker."""
+    cutoff = datetime.utcnow() - timedelta(minutes=PIPELINE_STALE_MINUTES)
+    count = (
+        ProjectPipeline.query
+        .filter(ProjectPipeline.running.is_(True), ProjectPipeline.claimed_at < cutoff)
+        .update({'running': False}, synchronize_session=False)
+    )
+    db.session.commit()
+    if count:
+        print(f"♻️ Released {count} stale project pipeline step(s)")
+    return count
+
+
+def _lock_row(*criteria):
+    """Current version of a pipeline row, locked until commit (SELECT ... FOR UPDATE on PostgreSQL)."""
+    return ProjectPipeline.query.filter(*criteria).with_for_update().populate_existing().first()
+
+
+def _claim_next():
+    """Atomically claim the oldest due runnable row."""
+    now = datetime.utcnow()
+    candidates = (
+        db.session.query(ProjectPipeline.id)
+        .filter(
+            ProjectPipeline.state.in_(ProjectPipeline.RUNNABLE_STATES),
+            ProjectPipeline.running.is_(False),
+            ProjectPipeline.next_attempt_at <= now
+        )
+        .order_by(ProjectPipeline.next_attempt_at, ProjectPipeline.id)
+        .limit(5)
+        .all()
+    )
+    for (pipeline_id,) in candidates:
+        claimed = (
+            ProjectPipeline.query
+            .filter(ProjectPipeline.id == pipeline_id, ProjectPipeline.running.is_(False))
+            .update({'running': True, 'claimed_at': now}, synchronize_session=False)
+        )
+        db.session.commit()
+        if claimed:
+            return db.session.get(ProjectPipeline, pipeline_id)
+    return None
+
+
+# ── Steps ──
+
+def _extract(pipeline):
+    """uploaded → extracted"""
+    project = pipeline.project
+    extraction = extract_pdf(project.specs_path, sha256=pipeline.specs_hash)
+    specs_text = extraction['text']
+    if specs_text is None:
+        raise PipelineError('Error reading the PDF file. It may be corrupted.')
+    if not specs_text.strip():
+        raise PipelineError('Could not extract text from the PDF. The file may be scanned/image-based.')
+
+    print(f"📄 [Project {project.id}] Extracted {len(specs_text)} chars, "
+          f"{extraction['pages_read']}/{extraction['page_count']} pages, tiers: {dict(Counter(extraction['tiers']))}")
+    return 'extracted', {'specs_text': specs_text, 'text_truncated': extraction['truncated']}
+
+
+def _send(pipeline):
+    """extracted → sent (n8n answers later on /manager/api/project/callback)"""
+    config = current_app.config
+    n8n_url = config.get('N8N_PROJECT_WEBHOOK_URL')
+    callback_url = f"{config.get('PUBLIC_URL', '')}/manager/api/project/callback"
+    response = post_json(n8n_url, {
+        'texte': pipeline.specs_text,
+        'project_id': pipeline.project_id,
+        'callback_url': callback_url,
+        'texte_tronque': bool(pipeline.text_truncated)
+    }, timeout=(WEBHOOK_CONNECT_TIMEOUT, PIPELINE_SEND_READ_TIMEOUT))
+    print(f"📤 [Project {pipeline.project_id}] n8n answered {response.status_code}")
+    if response.status_code != 200:
+        raise RuntimeError(f"n8n HTTP {response.status_code}: {response.text[:200]}")
+    return 'sent', {}
+
+
+def apply_analysis_to_project(project, ai_data, raw_data):
+    """Copy n8n's analysis onto the Project row (name, résumé, besoins...)."""
+    nom_projet = (ai_data.get('nom_projet') or '').strip()
+    if nom_projet:
+        project.nom_projet = nom_projet
+        project.name = nom_projet
+
+    project.resume = (ai_data.get('resume') or '').strip() or None
+    project.description = ai_data.get('resume', '') or project.description
+
+    # besoins — flat keys or nested
+    besoins = ai_data.get('besoins', {})
+    if not besoins:
+        fonctionnels = ai_data.get('besoins_fonctionnels', [])
+        non_fonctionnels = ai_data.get('besoins_non_fonctionnels', [])
+        if fonctionnels or non_fonctionnels:
+            besoins = {'fonctionnels': fonctionnels, 'non_fonctionnels': non_fonctionnels}
+    project.besoins = besoins
+
+    # livrables — "livrables" or "livrables_attendus"
+    project.livrables_attendus = ai_data.get('livrables_attendus', ai_data.get('livrables', []))
+
+    project.taches_techniques = ai_data.get('taches_techniques', [])
+    project.analyse_ressources = ai_data.get('analyse_ressources', {})
+    project.estimation_globale = ai_data.get('estimation_globale', {})
+    project.specs_data = raw_data  # Store complete callback data
+    project.status = 'pending'
+
+
+def unwrap_analysis(data):
+    """n8n may wrap the results in "analysis_results", a list, and/or "output"."""
+    ai_data = data.get('analysis_results', data)
+    if isinstance(ai_data, list) and len(ai_data) > 0:
+        ai_data = ai_data[0]
+    if isinstance(ai_data, dict) and 'output' in ai_data and isinstance(ai_data['output'], dict):
+        ai_data = ai_data['output']
+    return ai_data if isinstance(ai_data, dict) else {}
+
+
+def _apply(pipeline):
+    """analyzed → matched: diff the tasks, then auto-match the new / re-scoped ones."""
+    project = pipeline.project
+    ai_data = unwrap_analysis(pipeline.analysis or {})
+
+    apply_analysis_to_project(project, ai_data, pipeline.analysis)
+    changes = sync_project_tasks(project.id, ai_data.get('taches_techniques', []))
+    db.session.commit()
+    invalidate_schedule(project.id)
+    print(f"✅ [Project {project.id}] Analysis applied: {changes}")
+
+    # Any unassigned task, not only the ones this diff touched: tasks left
+    # unassigned by an earlier pass come back 'unchanged' (O(1) counters)
+    match_results = []
+    if project.tasks_assigned < project.task_count:
+        try:
+            match_results = auto_match_tasks(project.id, mode=current_app.config.get('MATCHING_MODE', 'sequential'))
+            print(f"🤖 [Project {project.id}] {len(match_results)} task(s) auto-matched")
+        except Exception as match_err:
+            print(f"⚠️ [Project {project.id}] Auto-matching error (non-fatal): {match_err}")
+
+    # analysis cleared: applied, the project row holds it now (specs_data)
+    return 'matched', {
+        'result': {'tasks': changes, 'matched': len(match_results), 'matches': match_results},
+        'analysis': None
+    }
+
+
+_STEPS = {'uploaded': _extract, 'extracted': _send, 'analyzed': _apply}
+
+
+def _superseded(pipeline, state, digest):
+    """A callback (or a delete) changed the row while the step ran: its outcome no longer applies."""
+    if pipeline is not None and pipeline.state == state and pipeline.payload_hash == digest:
+        return False
+    if pipeline is not None:
+        print(f"↪️ [Project {pipeline.project_id}] '{state}' step outcome dropped: "
+              f"the pipeline moved to '{pipeline.state}' meanwhile")
+    return True
+
+
+def run_step(pipeline):
+    """Run the step for the pipeline's current state and record the outcome."""
+    pipeline_id = pipeline.id
+    state = pipeline.state
+    digest = pipeline.payload_hash
+    started = time.perf_counter()
+    try:
+        next_state, values = _STEPS[state](pipeline)
+        elapsed = time.perf_counter() - started
+        pipeline = _lock_row(ProjectPipeline.id == pipeline_id)
+        if not _superseded(pipeline, state, digest):
+            for column, value in values.items():
+                setattr(pipeline, column, value)
+            if next_state != state:
+                pipeline.transition(next_state, step_seconds=elapsed)
+    except Exception as e:
+        db.session.rollback()
+        pipeline = _lock_row(ProjectPipeline.id == pipeline_id)
+        elapsed = time.perf_counter() - started
+        error = str(e) or e.__class__.__name__
+        if not _superseded(pipeline, state, digest):
+            pipeline.attempts = (pipeline.attempts or 0) + 1
+            if isinstance(e, PipelineError) or pipeline.attempts >= PIPELINE_MAX_ATTEMPTS:
+                print(f"❌ [Project {pipeline.project_id}] '{state}' step failed: {error}")
+                pipeline.transition('failed', step_seconds=elapsed, error=error)
+                if state == 'analyzed':
+                    # Forget the payload so n8n's retry of it is applied, not acknowledged as a duplicate
+                    CallbackReceipt.query.filter_by(
+                        project_id=pipeline.project_id, payload_hash=digest
+                    ).delete(synchronize_session=False)
+            else:
+                delay = PIPELINE_RETRY_SECONDS * 2 ** (pipeline.attempts - 1)
+                print(f"⚠️ [Project {pipeline.project_id}] '{state}' attempt {pipeline.attempts} failed, retrying in {delay}s: {error}")
+                pipeline.error = error
+                pipeline.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+    if pipeline is not None:
+        pipeline.running = False
+    db.session.commit()
+    return pipeline
+
+
+def process_pending(limit=None):
+    """Run due steps in the current thread. Returns how many were run."""
+    processed = 0
+    while limit is None or processed < limit:
+        pipeline = _claim_next()
+        if pipeline is None:
+            break
+        run_step(pipeline)
+        processed += 1
+    return processed
+
+
+def _worker_loop(app):
+    while True:
+        with app.app_context():
+            try:
+                processed = process_pending()
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Project pipeline worker error: {e}")
+                processed = 0
+            finally:
+                db.session.remove()
+        if not processed:
+            _wakeup.wait(PIPELINE_POLL_SECONDS)
+            _wakeup.clear()
+
+
+def start_project_workers(app):
+    """Start the worker threads once per process (no-op when PROJECT_PIPELINE_WORKERS is 0)."""
+    workers = app.config.get('PROJECT_PIPELINE_WORKERS', PROJECT_PIPELINE_WORKERS)
+    with _workers_lock:
+        if _workers or workers <= 0:
+            return
+        with app.app_context():
+            release_stale_claims()
+        for i in range(workers):
+            thread = threading.Thread(target=_worker_loop, args=(app,), name=f'project-worker-{i}', daemon=True)
+            thread.start()
+            _workers.append(thread)
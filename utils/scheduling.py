@@ -0,0 +1,346 @@
+"""
+Dependency-aware scheduling over Task.dependances.
+Builds each project's task DAG and computes topological order, earliest
+start / finish (from duree_estimee_jours) and the critical path, plus
+project aggregates (total days, status counts, longest path).
+
+Schedules are cached per project. Editing or deleting one task updates
+the cached schedule incrementally — only that task's DAG descendants are
+recomputed — instead of reloading the whole project.
+
+The cache lives in each process: an edit made through one process is only
+seen by the others once their entry expires (SCHEDULE_CACHE_MAX_AGE
+seconds). With several web processes, the schedule another one serves may
+be that old.
+"""
+
+import os
+import time
+import heapq
+import threading
+from collections import Counter
+from models.project import Task
+
+SCHEDULE_CACHE_MAX_AGE = int(os.getenv('SCHEDULE_CACHE_MAX_AGE', 60))
+
+_cache = {}  # project_id -> (built_at, ProjectSchedule)
+_cache_lock = threading.Lock()
+
+
+def _natural_key(task_id):
+    """T2 before T10."""
+    digits = ''.join(filter(str.isdigit, task_id))
+    return (int(digits) if digits else 0, task_id)
+
+
+def _normalize_deps(dependances):
+    """Task.dependances as a list of task_id strings ("T1", 1, " t1 " → "T1")."""
+    deps = []
+    for dep in dependances or []:
+        if isinstance(dep, dict):
+            dep = dep.get('id_tache') or dep.get('task_id')
+        if dep is None:
+            continue
+        dep = str(dep).strip().upper()
+        if dep.isdigit():
+            dep = f'T{dep}'
+        if dep:
+            deps.append(dep)
+    return deps
+
+
+class ProjectSchedule:
+    """Task DAG of one project with CPM (critical path method) timings."""
+
+    def __init__(self, tasks):
+        """tasks: iterable of Task rows (or objects with the same attributes)."""
+        self.duration = {}
+        self.status = {}
+        self.raw_deps = {}
+        for task in tasks:
+            self.duration[task.task_id] = task.duree_estimee_jours or 0
+            self.status[task.task_id] = task.status
+            self.raw_deps[task.task_id] = _normalize_deps(task.dependances)
+
+        self.total_days = sum(self.duration.values())
+        self.status_counts = Counter(self.status.values())
+        self._compute()
+
+    # ── Full computation ──
+
+    def _compute(self):
+        # Only keep edges between tasks that exist in the project
+        self.deps = {
+            task_id: [d for d in dict.fromkeys(deps) if d in self.duration and d != task_id]
+            for task_id, deps in self.raw_deps.items()
+        }
+        self.children = {task_id: [] for task_id in self.duration}
+        for task_id, deps in self.deps.items():
+            for dep in deps:
+                self.children[dep].append(task_id)
+
+        # Kahn's algorithm, smallest task id first for a stable order
+        indegree = {task_id: len(deps) for task_id, deps in self.deps.items()}
+        heap = [(_natural_key(t), t) for t, d in indegree.items() if d == 0]
+        heapq.heapify(heap)
+        order = []
+        while heap:
+            _, task_id = heapq.heappop(heap)
+            order.append(task_id)
+            for child in self.children[task_id]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    heapq.heappush(heap, (_natural_key(child), child))
+
+        # Tasks left over sit on a dependency cycle: schedule them last,
+        # ignoring the edges that could not be resolved.
+        placed = set(order)
+        self.cyclic = sorted((t for t in self.duration if t not in placed), key=_natural_key)
+        self.order = order + self.cyclic
+        self._position = {task_id: i for i, task_id in enumerate(self.order)}
+
+        self.earliest_start = {}
+        self.earliest_finish = {}
+        for task_id in self.order:
+            start = self._start_of(task_id)
+            self.earliest_start[task_id] = start
+            self.earliest_finish[task_id] = start + self.duration[task_id]
+
+        self._finish_counts = Counter(self.earliest_finish.values())
+        self._max_finish = max(self._finish_counts, default=0)
+        self._critical_path = None
+
+    def _start_of(self, task_id):
+        return max(
+            (self.earliest_finish[d] for d in self.deps[task_id] if d in self.earliest_finish),
+            default=0
+        )
+
+    # ── Incremental updates ──
+
+    def _set_finish(self, task_id, finish):
+        old = self.earliest_finish[task_id]
+        if old == finish:
+            return
+        self.earliest_finish[task_id] = finish
+        self._finish_counts[old] -= 1
+        if not self._finish_counts[old]:
+            del self._finish_counts[old]
+        self._finish_counts[finish] += 1
+        if finish > self._max_finish:
+            self._max_finish = finish
+        elif old == self._max_finish and old not in self._finish_counts:
+            self._max_finish = max(self._finish_counts, default=0)
+
+    def _propagate(self, changed):
+        """Recompute timings of `changed` tasks and of the descendants they actually move."""
+        heap = [(self._position[t], t) for t in changed]
+        heapq.heapify(heap)
+        queued = set(changed)
+        while heap:
+            _, task_id = heapq.heappop(heap)
+            start = self._start_of(task_id)
+            finish = start + self.duration[task_id]
+            if (task_id not in changed and start == self.earliest_start[task_id]
+                    and finish == self.earliest_finish[task_id]):
+                continue  # unchanged → its descendants are unchanged too
+            self.earliest_start[task_id] = start
+            self._set_finish(task_id, finish)
+            for child in self.children[task_id]:
+                if child not in queued:
+                    queued.add(child)
+                    heapq.heappush(heap, (self._position[child], child))
+        self._critical_path = None
+
+    def update_task(self, task_id, duration=None, status=None, dependances=None):
+        """
+        Apply one task's edit. Cost is proportional to the descendants whose
+        timings move, not to the project size. Falls back to a full
+        recomputation for new tasks, cycles and dependency edits that break
+        the current topological order.
+        """
+        if task_id not in self.duration:
+            self.duration[task_id] = duration or 0
+            self.status[task_id] = status
+            self.raw_deps[task_id] = _normalize_deps(dependances)
+            self.total_days += self.duration[task_id]
+            self.status_counts[status] += 1
+            self._compute()
+            return
+
+        if status is not None and status != self.status[task_id]:
+            self.status_counts[self.status[task_id]] -= 1
+            self.status_counts[status] += 1
+            self.status[task_id] = status
+
+        changed = False
+        if duration is not None and duration != self.duration[task_id]:
+            self.total_days += duration - self.duration[task_id]
+            self.duration[task_id] = duration
+            changed = True
+
+        if dependances is not None:
+            new_deps = _normalize_deps(dependances)
+            if new_deps != self.raw_deps[task_id]:
+                self.raw_deps[task_id] = new_deps
+                kept = [d for d in dict.fromkeys(new_deps) if d in self.duration and d != task_id]
+                # A dependency placed after this task breaks the current order
+                # (and may close a cycle): recompute from scratch.
+                if any(self._position[d] > self._position[task_id] for d in kept):
+                    self._compute()
+                    return
+                for old in self.deps[task_id]:
+                    self.children[old].remove(task_id)
+                for dep in kept:
+                    self.children[dep].append(task_id)
+                self.deps[task_id] = kept
+                changed = True
+
+        if changed and self.cyclic:
+            self._compute()  # cycle timings depend on the full pass order
+        elif changed:
+            self._propagate({task_id})
+
+    def remove_task(self, task_id):
+        """
+        Drop a deleted task: its dependents lose that edge and only they
+        (and the descendants they move) are recomputed. Removing a task
+        keeps the topological order valid, so no full pass is needed —
+        unless the project has a cycle the task may have been part of.
+        """
+        if task_id not in self.duration:
+            return
+        self.total_days -= self.duration.pop(task_id)
+        self.status_counts[self.status.pop(task_id)] -= 1
+        self.raw_deps.pop(task_id, None)
+        if self.cyclic:
+            self._compute()
+            return
+
+        dependents = self.children.pop(task_id)
+        for dep in self.deps.pop(task_id):
+            self.children[dep].remove(task_id)
+        for child in dependents:
+            self.deps[child].remove(task_id)
+
+        self.order.remove(task_id)
+        del self._position[task_id]  # gaps are fine: only the relative order matters
+        del self.earliest_start[task_id]
+        finish = self.earliest_finish.pop(task_id)
+        self._finish_counts[finish] -= 1
+        if not self._finish_counts[finish]:
+            del self._finish_counts[finish]
+            if finish == self._max_finish:
+                self._max_finish = max(self._finish_counts, default=0)
+
+        self._critical_path = None
+        if dependents:
+            self._propagate(set(dependents))
+
+    # ── Read side ──
+
+    @property
+    def project_duration(self):
+        """Longest path through the DAG, in days."""
+        return self._max_finish
+
+    @property
+    def critical_path(self):
+        if self._critical_path is None:
+            self._critical_path = self._trace_critical_path()
+        return self._critical_path
+
+    def _trace_critical_path(self):
+        """Walk back from the latest-finishing task through the predecessors that drive it."""
+        if not self.earliest_finish:
+            return []
+        # Latest finish wins; on ties the smallest task id
+        current = min(self.earliest_finish, key=lambda t: (-self.earliest_finish[t], _natural_key(t)))
+        path = [current]
+        seen = {current}
+        while True:
+            start = self.earliest_start[current]
+            drivers = [
+                d for d in self.deps[current]
+                if d not in seen and self.earliest_finish.get(d) == start
+            ]
+            if not drivers:
+                break
+            current = min(drivers, key=_natural_key)
+            seen.add(current)
+            path.append(current)
+        return list(reversed(path))
+
+    def is_ready(self, task_id):
+        """A task is ready when every task it depends on is completed."""
+        return all(self.status.get(dep) == 'completed' for dep in self.deps.get(task_id, []))
+
+    def ready_tasks(self):
+        return [t for t in self.order if self.status.get(t) != 'completed' and self.is_ready(t)]
+
+    def to_dict(self):
+        return {
+            'order': self.order,
+            'earliest_start': self.earliest_start,
+            'earliest_finish': self.earliest_finish,
+            'critical_path': self.critical_path,
+            'project_duration': self.project_duration,
+            'total_days': self.total_days,
+            'status_counts': dict(self.status_counts),
+            'ready': self.ready_tasks(),
+            'cyclic': self.cyclic,
+        }
+
+
+def get_project_schedule(project_id, tasks=None):
+    """
+    Cached schedule for a project. Pass already-loaded tasks to avoid a
+    query when the cache is cold.
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(project_id)
+        if entry and now - entry[0] <= SCHEDULE_CACHE_MAX_AGE:
+            return entry[1]
+
+    if tasks is None:
+        tasks = Task.query.filter_by(project_id=project_id).all()
+    schedule = ProjectSchedule(tasks)
+
+    with _cache_lock:
+        _cache[project_id] = (now, schedule)
+    return schedule
+
+
+def apply_task_edit(task):
+    """
+    Push one edited task into its project's cached schedule (incremental).
+    Builds the schedule from the DB only when nothing is cached yet.
+    Returns the up-to-date schedule.
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(task.project_id)
+        if entry and now - entry[0] <= SCHEDULE_CACHE_MAX_AGE:
+            entry[1].update_task(
+                task.task_id,
+                duration=task.duree_estimee_jours or 0,
+                status=task.status,
+                dependances=task.dependances or []
+            )
+            return entry[1]
+    return get_project_schedule(task.project_id)
+
+
+def apply_task_removal(project_id, task_id):
+    """Remove a deleted task from the cached schedule, if any."""
+    with _cache_lock:
+        entry = _cache.get(project_id)
+        if entry:
+            entry[1].remove_task(task_id)
+
+
+def invalidate_schedule(project_id):
+    """Drop a project's cached schedule — call after editing its tasks."""
+    with _cache_lock:
+        _cache.pop(project_id, None)
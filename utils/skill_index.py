@@ -0,0 +1,97 @@
+"""
+In-process inverted index: canonical skill id -> employee ids.
+Used to shortlist the employees worth sending to the AI / fallback
+scorer for a task, instead of the whole active roster.
+
+The index is built lazily from User.canonical_skills and kept up to
+date by the employee create / edit / delete routes. Other worker
+processes don't see those calls, so it is also rebuilt from the DB
+once it is older than SKILL_INDEX_MAX_AGE seconds.
+"""
+
+import os
+import time
+import threading
+from sqlalchemy.orm import load_only
+from models.user import User
+from utils.skills import canonicalize_skills
+
+SKILL_INDEX_MAX_AGE = int(os.getenv('SKILL_INDEX_MAX_AGE', 300))
+
+
+class SkillIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}        # canonical skill id -> set of employee ids
+        self._employee_terms = {}  # employee id -> set of canonical skill ids
+        self._built_at = None
+
+    @staticmethod
+    def _terms(employee):
+        return set(employee.get_canonical_skills())
+
+    def _add(self, employee_id, terms):
+        self._employee_terms[employee_id] = terms
+        for term in terms:
+            self._postings.setdefault(term, set()).add(employee_id)
+
+    def _remove(self, employee_id):
+        for term in self._employee_terms.pop(employee_id, ()):
+            ids = self._postings.get(term)
+            if ids:
+                ids.discard(employee_id)
+                if not ids:
+                    del self._postings[term]
+
+    def rebuild(self):
+        """Reload every employee's skills from the DB (one query)."""
+        employees = (
+            User.query
+            .options(load_only(User.id, User.technical_skills, User.canonical_skills))
+            .filter_by(role='employee')
+            .all()
+        )
+        with self._lock:
+            self._postings = {}
+            self._employee_terms = {}
+            for emp in employees:
+                self._add(emp.id, self._terms(emp))
+            self._built_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        if self._built_at is None or time.monotonic() - self._built_at > SKILL_INDEX_MAX_AGE:
+            self.rebuild()
+
+    def add_employee(self, employee):
+        """Insert or refresh one employee's postings."""
+        if self._built_at is None:
+            return  # not built yet — the first lookup will load everyone
+        with self._lock:
+            self._remove(employee.id)
+            self._add(employee.id, self._terms(employee))
+
+    def remove_employee(self, employee_id):
+        if self._built_at is None:
+            return
+        with self._lock:
+            self._remove(employee_id)
+
+    def matching_counts(self, required_skills, candidate_ids):
+        """
+        {employee_id: number of distinct required skills they cover} for the
+        given candidates. `required_skills` may be raw names or canonical
+        ids; either way they are canonicalized and looked up exactly.
+        """
+        self._ensure_fresh()
+        candidate_ids = set(candidate_ids)
+        counts = {}
+
+        with self._lock:
+            for skill_id in canonicalize_skills(required_skills):
+                for emp_id in self._postings.get(skill_id, set()) & candidate_ids:
+                    counts[emp_id] = counts.get(emp_id, 0) + 1
+
+        return counts
+
+
+skill_index = SkillIndex()
@@ -0,0 +1,55 @@
+"""
+Bitset skill-overlap scoring for the rule-based matchers.
+Works on canonical skill ids (utils/skills.py): ids are interned into a
+vocabulary and each id keeps a bitset (Python int) of the employees who
+have it, so a requirement matches by exact id and a whole task × employee
+score matrix comes out of a few bit operations per required skill.
+"""
+
+
+class SkillScorer:
+    """Task × employee skill-overlap scores over a fixed employee roster."""
+
+    def __init__(self, employee_skills):
+        """employee_skills: {employee_id: [canonical skill id, ...]}."""
+        self.employee_ids = list(employee_skills)
+        self._holders = {}  # canonical skill id -> bitset of employee positions
+
+        for pos, emp_id in enumerate(self.employee_ids):
+            for skill_id in set(employee_skills[emp_id] or []):
+                self._holders[skill_id] = self._holders.get(skill_id, 0) | (1 << pos)
+
+    def overlap_matrix(self, task_skills):
+        """
+        task_skills: {task_key: [canonical skill id, ...]}.
+        Returns {task_key: {employee_id: overlap_pct}}; employees with no
+        overlap are left out (treat as 0). Tasks without requirements map
+        to an empty dict.
+        """
+        matrix = {}
+        for task_key, required_skills in task_skills.items():
+            required = set(required_skills or [])
+            if not required:
+                matrix[task_key] = {}
+                continue
+
+            matched = {}
+            for skill_id in required:
+                bits = self._holders.get(skill_id, 0)
+                while bits:
+                    low = bits & -bits
+                    pos = low.bit_length() - 1
+                    matched[pos] = matched.get(pos, 0) + 1
+                    bits ^= low
+
+            total = len(required)
+            matrix[task_key] = {
+                self.employee_ids[pos]: (count / total) * 100
+                for pos, count in matched.items()
+            }
+        return matrix
+
+
+def skill_overlap_matrix(task_skills, employee_skills):
+    """Convenience wrapper: build a SkillScorer and score all tasks in one pass."""
+    return SkillScorer(employee_skills).overlap_matrix(task_skills)
@@ -0,0 +1,94 @@
+"""
+Skill normalization: maps the many spellings found in CVs and CDC
+analyses ("ReactJS", "React.js", "react") to one canonical skill id.
+Canonical ids are computed when skills are written (CV callback, task
+creation) and stored next to the raw data, so matching is a plain set
+intersection.
+"""
+
+import re
+
+# canonical id -> known aliases (compared after normalization)
+SKILL_ALIASES = {
+    'react': ['reactjs', 'react.js', 'react js'],
+    'react native': ['reactnative', 'react-native'],
+    'angular': ['angularjs', 'angular.js', 'angular 2+'],
+    'vue': ['vuejs', 'vue.js', 'vue js'],
+    'next.js': ['nextjs', 'next js', 'next'],
+    'node.js': ['nodejs', 'node js', 'node'],
+    'express': ['expressjs', 'express.js'],
+    'javascript': ['js', 'es6', 'ecmascript', 'vanilla js'],
+    'typescript': ['ts'],
+    'python': ['python3', 'python 3', 'py'],
+    'c#': ['csharp', 'c sharp'],
+    'c++': ['cpp', 'cplusplus'],
+    '.net': ['dotnet', 'dot net', 'asp.net', 'asp.net core', '.net core'],
+    'java': ['java 8', 'java 11', 'java 17', 'jdk'],
+    'spring boot': ['springboot', 'spring-boot'],
+    'postgresql': ['postgres', 'postgre sql', 'psql', 'pgsql'],
+    'mysql': ['my sql'],
+    'mongodb': ['mongo', 'mongo db'],
+    'sql server': ['mssql', 'ms sql', 'microsoft sql server'],
+    'html': ['html5'],
+    'css': ['css3'],
+    'tailwind css': ['tailwind', 'tailwindcss'],
+    'rest api': ['rest', 'restful', 'restful api', 'api rest', 'rest apis'],
+    'kubernetes': ['k8s'],
+    'docker': ['docker compose', 'docker-compose'],
+    'ci/cd': ['cicd', 'ci cd', 'ci-cd'],
+    'aws': ['amazon web services'],
+    'gcp': ['google cloud', 'google cloud platform'],
+    'azure': ['microsoft azure'],
+    'machine learning': ['ml'],
+    'deep learning': ['dl'],
+    'ui/ux': ['ux/ui', 'ui ux', 'ux ui', 'ui/ux design'],
+    'power bi': ['powerbi'],
+}
+
+_ALIAS_LOOKUP = {}
+
+
+def _compact(key):
+    """Spelling-insensitive form: drop spaces, dots, dashes and underscores."""
+    return re.sub(r'[\s.\-_]+', '', key)
+
+
+def normalize_token(raw):
+    """Lowercase, trim and collapse whitespace/punctuation runs."""
+    key = str(raw).strip().lower()
+    key = re.sub(r'[\s_]+', ' ', key)
+    key = re.sub(r'\s*([/+#])\s*', r'\1', key)
+    return key.strip(' .,;:-')
+
+
+for _canonical, _aliases in SKILL_ALIASES.items():
+    for _alias in [_canonical] + _aliases:
+        _ALIAS_LOOKUP[normalize_token(_alias)] = _canonical
+        _ALIAS_LOOKUP.setdefault(_compact(normalize_token(_alias)), _canonical)
+
+
+def canonical_skill(raw):
+    """Return the canonical id for one skill name (None for blanks)."""
+    if raw is None:
+        return None
+    key = normalize_token(raw)
+    if not key:
+        return None
+
+    canonical = _ALIAS_LOOKUP.get(key) or _ALIAS_LOOKUP.get(_compact(key))
+    if canonical:
+        return canonical
+
+    # "Something.js" / "SomethingJS" → "something" when that is a known skill
+    compact = _compact(key)
+    if compact.endswith('js'):
+        canonical = _ALIAS_LOOKUP.get(compact[:-2])
+        if canonical:
+            return canonical
+
+    return key
+
+
+def canonicalize_skills(raw_skills):
+    """Canonical ids for a list of skill names, deduplicated and sorted."""
+    return sorted({c for c in (canonical_skill(s) for s in raw_skills or []) if c})
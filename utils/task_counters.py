@@ -0,0 +1,164 @@
+"""
+Denormalized task counters, written in the same transaction as the task
+changes they summarize:
+
+    projects.task_count, tasks_in_progress, tasks_completed,
+             tasks_assigned, estimated_days
+    users.open_task_count    non-completed tasks assigned to the employee
+                             outside completed projects (capacity check)
+
+Dashboards, project pages and the matching capacity check read these
+columns instead of loading or counting tasks.
+
+The counters are recomputed rather than incremented: after each flush the
+projects and employees it touched get one grouped query each over their
+own tasks (served by _project_task_uc and ix_tasks_open_by_assignee), so
+they cannot drift whatever order changes come in. ORM changes are picked
+up by the session hooks below; set-based statements bypass them and call
+refresh_task_counters() themselves (see utils/task_sync.py).
+"""
+
+from itertools import chain
+from sqlalchemy import event, select, update, case, func, bindparam, inspect
+from sqlalchemy.orm.attributes import set_committed_value
+from models import db
+from models.project import Project, Task
+from models.user import User
+
+PROJECT_COUNTERS = ('task_count', 'tasks_in_progress', 'tasks_completed', 'tasks_assigned', 'estimated_days')
+
+# Task attributes that feed a counter
+_TRACKED = ('project_id', 'assigned_employee_id', 'status', 'duree_estimee_jours')
+
+_PENDING_KEY = 'task_counters'
+
+
+def _pending(session):
+    return session.info.setdefault(_PENDING_KEY, {'projects': set(), 'employees': set(), 'project_status': set()})
+
+
+def _values(state, attr):
+    """Old and new values of a loaded attribute (never triggers a load)."""
+    history = state.attrs[attr].history
+    return [v for v in chain(history.added, history.unchanged, history.deleted) if v is not None]
+
+
+def _project_counts(conn, project_ids):
+    counts = {project_id: dict.fromkeys(PROJECT_COUNTERS, 0) for project_id in project_ids}
+    rows = conn.execute(
+        select(
+            Task.project_id,
+            func.count(Task.id),
+            func.count(case((Task.status == 'in_progress', 1))),
+            func.count(case((Task.status == 'completed', 1))),
+            func.count(Task.assigned_employee_id),
+            func.coalesce(func.sum(Task.duree_estimee_jours), 0)
+        )
+        .where(Task.project_id.in_(project_ids))
+        .group_by(Task.project_id)
+    )
+    for project_id, *values in rows:
+        counts[project_id] = dict(zip(PROJECT_COUNTERS, values))
+    return counts
+
+
+def _employee_counts(conn, employee_ids):
+    counts = dict.fromkeys(employee_ids, 0)
+    rows = conn.execute(
+        select(Task.assigned_employee_id, func.count(Task.id))
+        .join(Project, Project.id == Task.project_id)
+        .where(
+            Task.assigned_employee_id.in_(employee_ids),
+            Task.status != 'completed',
+            Project.status != 'completed'
+        )
+        .group_by(Task.assigned_employee_id)
+    )
+    counts.update({employee_id: count for employee_id, count in rows})
+    return counts
+
+
+def _write(session, conn, model, counts):
+    """One executemany UPDATE, then the same values on the loaded objects."""
+    table = model.__table__
+    columns = next(iter(counts.values())).keys()
+    conn.execute(
+        update(table)
+        .where(table.c.id == bindparam('_id'))
+        # updated_at is about the row's own data, not its counters
+        .values(dict({column: bindparam(column) for column in columns}, updated_at=table.c.updated_at)),
+        [dict(values, _id=key) for key, values in counts.items()]
+    )
+    for key, values in counts.items():
+        obj = session.identity_map.get(session.identity_key(model, key))
+        if obj is not None:
+            for column, value in values.items():
+                set_committed_value(obj, column, value)
+
+
+def _refresh(session, project_ids, employee_ids):
+    project_ids = {pid for pid in project_ids if pid is not None}
+    employee_ids = {eid for eid in employee_ids if eid is not None}
+    conn = session.connection()
+    if project_ids:
+        _write(session, conn, Project, _project_counts(conn, project_ids))
+    if employee_ids:
+        counts = _employee_counts(conn, employee_ids)
+        _write(session, conn, User, {eid: {'open_task_count': count} for eid, count in counts.items()})
+
+
+def refresh_task_counters(project_ids=(), employee_ids=()):
+    """
+    Recompute the counters of these projects / employees in the current
+    transaction. For changes made with bulk INSERT / UPDATE / DELETE
+    statements; ORM changes are handled on flush. Does not commit.
+    """
+    _refresh(db.session, project_ids, employee_ids)
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    """No-op: registered with active_history so a reassignment still knows the previous assignee."""
+
+
+for _attr in ('project_id', 'assigned_employee_id'):
+    event.listen(getattr(Task, _attr), 'set', _keep_old_value, active_history=True)
+
+
+@event.listens_for(db.session, 'before_flush')
+def _collect_deleted(session, flush_context, instances):
+    """Read deleted tasks while their rows still exist (they may be expired)."""
+    pending = _pending(session)
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            pending['projects'].add(obj.project_id)
+            pending['employees'].add(obj.assigned_employee_id)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_touched(session, flush_context):
+    """new / dirty / deleted and attribute history still show the flushed changes here."""
+    pending = _pending(session)
+    for obj in chain(session.new, session.dirty, session.deleted):
+        state = inspect(obj)
+        if isinstance(obj, Task):
+            if obj in session.dirty and not any(state.attrs[attr].history.has_changes() for attr in _TRACKED):
+                continue
+            pending['projects'].update(_values(state, 'project_id'))
+            pending['employees'].update(_values(state, 'assigned_employee_id'))
+        elif isinstance(obj, Project) and obj in session.dirty and state.attrs.status.history.has_changes():
+            # Completing / reopening a project changes its assignees' open-task load
+            pending['project_status'].add(obj.id)
+
+
+@event.listens_for(db.session, 'after_flush_postexec')
+def _refresh_touched(session, flush_context):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    employees = pending['employees']
+    if pending['project_status']:
+        employees |= set(session.connection().execute(
+            select(Task.assigned_employee_id).distinct()
+            .where(Task.project_id.in_(pending['project_status']), Task.assigned_employee_id.isnot(None))
+        ).scalars())
+    _refresh(session, pending['projects'], employees)
@@ -0,0 +1,181 @@
+"""
+Apply an n8n project analysis to the project's Task rows as a diff.
+Tasks are matched on id_tache: unchanged ones are left alone (assignment,
+status and collaborators included), changed ones are updated in place,
+missing ones deleted and new ones inserted. Only tasks whose required
+skills changed lose their assignment (and go back to 'not started'), so
+auto-matching afterwards only has the new / re-scoped tasks to place.
+
+The writes are set-based whatever the project size: a multi-row
+INSERT ... VALUES (...), (...) ON CONFLICT (project_id, task_id) DO UPDATE
+for the new and changed tasks (TASK_UPSERT_CHUNK rows per statement), one
+DELETE for the removed ones and one UPDATE for the re-scoped ones — no
+per-task ORM flush. Databases without ON CONFLICT get the same result from
+an executemany UPDATE (by primary key) plus an executemany INSERT. These
+statements bypass the flush hooks of utils/task_counters.py, so the
+counters are refreshed explicitly.
+"""
+
+import json
+import hashlib
+from datetime import datetime
+from sqlalchemy import delete, insert, update
+from models import db
+from models.project import Task, TaskCollaborator
+from utils.skills import canonicalize_skills
+from utils.task_counters import refresh_task_counters
+
+# Task attribute ← id_tache payload key
+_FIELDS = (
+    ('nom', 'nom'),
+    ('priorite', 'priorite'),
+    ('dependances', 'dependances'),
+    ('duree_estimee_jours', 'duree_estimee_jours'),
+    ('sous_taches', 'sous_taches'),
+)
+_DEFAULTS = {'nom': '', 'dependances': [], 'sous_taches': []}
+
+TASK_UPSERT_CHUNK = 500  # rows per INSERT statement (keeps bind parameters well under driver limits)
+
+# Written by the analysis; status, assignment and created_at are left alone on conflict
+_UPSERT_COLUMNS = [attr for attr, _ in _FIELDS] + ['canonical_skills']
+
+
+def payload_hash(data):
+    """SHA-256 of the canonical JSON (key order and whitespace don't matter)."""
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _task_values(tache_data):
+    return {
+        attr: tache_data.get(key, _DEFAULTS.get(attr))
+        for attr, key in _FIELDS
+    }
+
+
+def _required_skills(sous_taches):
+    skills = set()
+    for st in sous_taches or []:
+        if isinstance(st, dict):
+            skills.update(st.get('competences_requises', []))
+    return skills
+
+
+def _dialect_insert():
+    """INSERT construct with ON CONFLICT support for the session's database (None if it has none)."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+def _update_or_insert_tasks(rows, existing):
+    """
+    Portable fallback: UPDATE the rows read at the start by primary key,
+    INSERT the others (a concurrent insert of the same id_tache then fails
+    on _project_task_uc instead of being merged). Returns the task_ids written.
+    """
+    now = datetime.utcnow()
+    updates = [
+        dict({column: row[column] for column in _UPSERT_COLUMNS}, id=existing[row['task_id']].id, updated_at=now)
+        for row in rows if row['task_id'] in existing
+    ]
+    inserts = [row for row in rows if row['task_id'] not in existing]
+    if updates:
+        db.session.execute(update(Task), updates)
+    if inserts:
+        db.session.execute(insert(Task), inserts)
+    return {row['task_id'] for row in rows}
+
+
+def _upsert_tasks(rows, existing):
+    """One multi-row INSERT ... ON CONFLICT DO UPDATE where supported. Returns the task_ids written."""
+    dialect_insert = _dialect_insert()
+    if dialect_insert is None:
+        return _update_or_insert_tasks(rows, existing)
+    stmt = dialect_insert(Task).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Task.project_id, Task.task_id],
+        set_=dict(
+            {column: stmt.excluded[column] for column in _UPSERT_COLUMNS},
+            updated_at=datetime.utcnow()
+        )
+    ).returning(Task.task_id)
+    return {row[0] for row in db.session.execute(stmt)}
+
+
+def sync_project_tasks(project_id, taches_techniques):
+    """
+    Bring the project's tasks in line with taches_techniques. Does not commit.
+    Returns {'inserted', 'updated', 'unchanged', 'deleted', 'unassigned'} counts.
+    """
+    # id_tache → values, first occurrence wins; missing ids numbered like before
+    incoming = {}
+    for position, tache_data in enumerate(taches_techniques or []):
+        if not isinstance(tache_data, dict):
+            continue
+        task_id = str(tache_data.get('id_tache') or f'T{position + 1}')
+        incoming.setdefault(task_id, _task_values(tache_data))
+
+    db.session.flush()  # the statements below bypass the unit of work
+
+    # Current state of the project's tasks, plain columns only
+    existing = {
+        row.task_id: row for row in db.session.query(
+            Task.id, Task.task_id, Task.canonical_skills, Task.assigned_employee_id,
+            *[getattr(Task, attr) for attr, _ in _FIELDS]
+        ).filter(Task.project_id == project_id)
+    }
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'unassigned': 0}
+
+    rows = []
+    rescoped = []
+    for task_id, values in incoming.items():
+        canonical = canonicalize_skills(list(_required_skills(values['sous_taches'])))
+        current = existing.get(task_id)
+        if current is not None:
+            if all(getattr(current, attr) == value for attr, value in values.items()):
+                counts['unchanged'] += 1
+                continue
+            # The current assignee was picked for other skills: re-match this one
+            # (from scratch: its progress was the old assignee's)
+            if current.assigned_employee_id is not None and set(canonical) != set(current.canonical_skills or []):
+                rescoped.append(current.id)
+        rows.append(dict(values, project_id=project_id, task_id=task_id, status='not started', canonical_skills=canonical))
+
+    if rows:
+        written = set()
+        for start in range(0, len(rows), TASK_UPSERT_CHUNK):
+            written |= _upsert_tasks(rows[start:start + TASK_UPSERT_CHUNK], existing)
+        counts['updated'] = sum(1 for task_id in written if task_id in existing)
+        counts['inserted'] = len(written) - counts['updated']
+
+    removed = [row.id for task_id, row in existing.items() if task_id not in incoming]
+    if removed:
+        db.session.execute(delete(TaskCollaborator).where(TaskCollaborator.task_id.in_(removed)))
+        db.session.execute(delete(Task).where(Task.id.in_(removed)))
+        counts['deleted'] = len(removed)
+
+    if rescoped:
+        db.session.execute(delete(TaskCollaborator).where(TaskCollaborator.task_id.in_(rescoped)))
+        db.session.execute(
+            update(Task).where(Task.id.in_(rescoped))
+            .values(assigned_employee_id=None, assigned_at=None, match_score=None, status='not started')
+        )
+        counts['unassigned'] = len(rescoped)
+
+    # Same transaction: the project's counters and the load of everyone who lost a task
+    if rows or removed:
+        freed = {row.assigned_employee_id for row in existing.values() if row.id in set(removed) | set(rescoped)}
+        refresh_task_counters([project_id], freed)
+
+    # Task objects already loaded in this session are stale now
+    for obj in list(db.session.identity_map.values()):
+        if isinstance(obj, (Task, TaskCollaborator)):
+            db.session.expire(obj)
+    return counts
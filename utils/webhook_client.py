@@ -0,0 +1,90 @@
+"""
+Shared HTTP client for the n8n webhooks.
+One requests.Session per process with keep-alive connection pooling, so
+repeated calls to the same ngrok / n8n host reuse the TLS connection
+instead of paying a new handshake each time. Each host gets at most
+WEBHOOK_MAX_PER_HOST concurrent connections (extra callers wait for a
+free one). Calls use the same (connect, read) timeout unless they pass
+their own.
+
+post_with_failover() goes through a list of equivalent endpoints (primary
++ backups) best-first, behind per-endpoint circuit breakers
+(utils/circuit_breaker.py).
+"""
+
+import os
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from utils.circuit_breaker import endpoint_health
+
+WEBHOOK_CONNECT_TIMEOUT = float(os.getenv('WEBHOOK_CONNECT_TIMEOUT', 5))
+WEBHOOK_READ_TIMEOUT = float(os.getenv('WEBHOOK_READ_TIMEOUT', 10))   # short: failover moves on after it
+WEBHOOK_MAX_HOSTS = int(os.getenv('WEBHOOK_MAX_HOSTS', 10))         # hosts kept in the pool
+WEBHOOK_MAX_PER_HOST = int(os.getenv('WEBHOOK_MAX_PER_HOST', 4))    # concurrent connections per host
+
+WEBHOOK_TIMEOUT = (WEBHOOK_CONNECT_TIMEOUT, WEBHOOK_READ_TIMEOUT)
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=WEBHOOK_MAX_HOSTS,
+        pool_maxsize=WEBHOOK_MAX_PER_HOST,
+        pool_block=True  # wait for a pooled connection instead of opening more
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """The process-wide session (rebuilt after a fork — sockets can't be shared)."""
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            _session = _build_session()
+            _session_pid = os.getpid()
+        return _session
+
+
+def post_json(url, payload, timeout=None):
+    """POST a JSON payload. Raises requests.exceptions.RequestException on failure."""
+    return get_session().post(url, json=payload, timeout=timeout or WEBHOOK_TIMEOUT)
+
+
+def post_with_failover(urls, build_payload, timeout=None):
+    """
+    POST to the healthiest usable endpoint, falling over to the next one on
+    error or non-200. `build_payload(attempt)` returns the JSON body for the
+    n-th attempt (1-based). Returns (response, errors): response is the
+    first 200, or None when every endpoint failed or was open-circuited.
+    """
+    ranked = endpoint_health.ranked(urls)
+    errors = []
+    for attempt, url in enumerate(ranked, 1):
+        started = time.monotonic()
+        try:
+            response = post_json(url, build_payload(attempt), timeout)
+        except requests.exceptions.RequestException as e:
+            endpoint_health.record_failure(url, e)
+            errors.append(f"{url}: {e}")
+            continue
+
+        if response.status_code == 200:
+            endpoint_health.record_success(url, time.monotonic() - started)
+            for unused in ranked[attempt:]:
+                endpoint_health.release(unused)
+            return response, errors
+
+        endpoint_health.record_failure(url, f"HTTP {response.status_code}")
+        errors.append(f"{url}: HTTP {response.status_code}")
+
+    if not ranked:
+        errors.append('Every n8n endpoint is open-circuited — waiting for them to recover')
+    return None, errors